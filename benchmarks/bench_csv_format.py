@@ -0,0 +1,112 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+"""Compares the single pass probability formatters against the previous per FSID json_normalize and concat.
+
+Synthetic Probability Depth objects shaped like the API response (3 years of 5 return periods each, one invalid
+FSID in a hundred) are formatted at each size. The previous formatter is slow enough that it only runs up to
+--legacy-max objects by default. The 1M size makes 15M rows and needs more than 5 GB of memory.
+
+    python benchmarks/bench_csv_format.py --sizes 10000 100000 1000000 --legacy-max 100000
+"""
+
+# Standard Imports
+import argparse
+import random
+import time
+
+# External Imports
+import pandas as pd
+
+# Internal Imports
+from firststreet.api import csv_format
+from firststreet.models.probability import ProbabilityDepth
+
+
+def make_data(size):
+    data = []
+
+    for fsid in range(size):
+        if fsid % 100 == 99:
+            data.append(ProbabilityDepth({'fsid': fsid, 'valid_id': False, 'error': "Invalid FSID"}))
+            continue
+
+        depth = [{'year': year, 'data': [{'returnPeriod': return_period,
+                                          'data': {'low': random.randint(0, 50), 'mid': random.randint(50, 100),
+                                                   'high': random.randint(100, 150)}}
+                                         for return_period in (500, 100, 20, 5, 2)]}
+                 for year in (2020, 2035, 2050)]
+        data.append(ProbabilityDepth({'fsid': fsid, 'depth': depth}))
+
+    return data
+
+
+def legacy_format_probability_depth(data):
+    """The previous formatter, one json_normalize per FSID and one concat at the end"""
+
+    depth_list = list()
+
+    for d in data:
+
+        try:
+            if d.depth is None:
+                raise TypeError
+
+            row_df = pd.json_normalize(d.depth, record_path='data', meta=['year'])
+            row_df['fsid'] = d.fsid
+            row_df['valid_id'] = d.valid_id
+            row_df['error'] = d.error
+            depth_list.append(row_df)
+
+        except TypeError:
+            row_df = pd.DataFrame([[str(d.fsid), d.valid_id, d.error]], columns=['fsid', 'valid_id', 'error'])
+            row_df['year'] = pd.NA
+            row_df['returnPeriod'] = pd.NA
+            row_df['data.low'] = pd.NA
+            row_df['data.mid'] = pd.NA
+            row_df['data.high'] = pd.NA
+            depth_list.append(row_df)
+
+    df = pd.concat(depth_list, axis=0).reset_index(drop=True)
+    df.rename(columns={'data.low': 'low', 'data.mid': 'mid', 'data.high': 'high'}, inplace=True)
+    df['fsid'] = df['fsid'].apply(str)
+    df['year'] = df['year'].astype('Int64').apply(str)
+    df['returnPeriod'] = df['returnPeriod'].astype('Int64').apply(str)
+    df['low'] = df['low'].astype('Int64').apply(str)
+    df['mid'] = df['mid'].astype('Int64').apply(str)
+    df['high'] = df['high'].astype('Int64').apply(str)
+
+    return df[['fsid', 'valid_id', 'year', 'returnPeriod', 'low', 'mid', 'high', 'error']]
+
+
+def timed(formatter, data):
+    start = time.perf_counter()
+    df = formatter(data)
+    return time.perf_counter() - start, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probability formatter benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=100000)
+    args = parser.parse_args()
+
+    random.seed(0)
+
+    print("{:>10} {:>10} {:>12} {:>12} {:>8}".format("objects", "rows", "legacy (s)", "single (s)", "speedup"))
+
+    for size in args.sizes:
+        data = make_data(size)
+        elapsed, df = timed(csv_format.format_probability_depth, data)
+
+        if size <= args.legacy_max:
+            legacy_elapsed, legacy_df = timed(legacy_format_probability_depth, data)
+            assert legacy_df.to_csv(index=False) == df.to_csv(index=False)
+            legacy, speedup = "{:.3f}".format(legacy_elapsed), "{:.1f}x".format(legacy_elapsed / elapsed)
+        else:
+            legacy, speedup = "-", "-"
+
+        print("{:>10} {:>10} {:>12} {:>12.3f} {:>8}".format(size, len(df), legacy, elapsed, speedup))
+
+
+if __name__ == "__main__":
+    main()
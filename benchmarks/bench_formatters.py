@@ -0,0 +1,198 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+"""Times every format_* function of csv_format and measures its peak memory, against a stored baseline.
+
+The model objects are built from the synthetic bodies of the FakeApi, in the schema of each product and location
+type, with one invalid search item in a hundred. Each formatter is run once under tracemalloc for its peak memory, then
+timed as the best of --repeat runs. The results are compared with the baseline and the script exits with 1
+when a formatter got slower or bigger by more than --threshold. Save a new baseline on the reference machine with
+--save-baseline. The larger sizes need several GB of memory for the location formatters.
+
+    python benchmarks/bench_formatters.py
+    python benchmarks/bench_formatters.py --sizes 1000 10000 100000 1000000 --only probability_depth avm
+    python benchmarks/bench_formatters.py --save-baseline
+"""
+
+# Standard Imports
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Internal Imports
+from firststreet.api import csv_format
+from firststreet.fake_api import PRODUCTS
+from firststreet.models.adaptation import AdaptationDetail, AdaptationSummary
+from firststreet.models.economic import AALSummaryOther, AALSummaryProperty, AVMProperty, AVMProvider, NFIPPremium
+from firststreet.models.environmental import EnvironmentalPrecipitation
+from firststreet.models.fema import FemaNfip
+from firststreet.models.historic import HistoricEvent, HistoricSummary
+from firststreet.models.location import LocationDetailCd, LocationDetailCity, LocationDetailCounty, \
+    LocationDetailNeighborhood, LocationDetailProperty, LocationDetailState, LocationDetailTract, LocationDetailZcta, \
+    LocationSummaryOther, LocationSummaryProperty
+from firststreet.models.probability import ProbabilityChance, ProbabilityCount, ProbabilityCountSummary, \
+    ProbabilityCumulative, ProbabilityDepth
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "formatters.json")
+
+# The payload of each formatter: (model, product path of the FakeApi, location type, id key of an invalid item)
+PAYLOADS = {
+    'adaptation_detail': (AdaptationDetail, 'adaptation/detail', None, 'adaptationId'),
+    'adaptation_summary': (AdaptationSummary, 'adaptation/summary', 'property', 'fsid'),
+    'probability_chance': (ProbabilityChance, 'probability/chance', 'property', 'fsid'),
+    'probability_count': (ProbabilityCount, 'probability/count', 'county', 'fsid'),
+    'probability_count_summary': (ProbabilityCountSummary, 'probability/count-summary', 'property', 'fsid'),
+    'probability_cumulative': (ProbabilityCumulative, 'probability/cumulative', 'property', 'fsid'),
+    'probability_depth': (ProbabilityDepth, 'probability/depth', 'property', 'fsid'),
+    'environmental_precipitation': (EnvironmentalPrecipitation, 'environmental/precipitation', 'county', 'fsid'),
+    'historic_event': (HistoricEvent, 'historic/event', None, 'eventId'),
+    'historic_summary_property': (HistoricSummary, 'historic/summary', 'property', 'fsid'),
+    'historic_summary': (HistoricSummary, 'historic/summary', 'county', 'fsid'),
+    'location_detail_property': (LocationDetailProperty, 'location/detail', 'property', 'fsid'),
+    'location_detail_neighborhood': (LocationDetailNeighborhood, 'location/detail', 'neighborhood', 'fsid'),
+    'location_detail_city': (LocationDetailCity, 'location/detail', 'city', 'fsid'),
+    'location_detail_zcta': (LocationDetailZcta, 'location/detail', 'zcta', 'fsid'),
+    'location_detail_tract': (LocationDetailTract, 'location/detail', 'tract', 'fsid'),
+    'location_detail_county': (LocationDetailCounty, 'location/detail', 'county', 'fsid'),
+    'location_detail_cd': (LocationDetailCd, 'location/detail', 'cd', 'fsid'),
+    'location_detail_state': (LocationDetailState, 'location/detail', 'state', 'fsid'),
+    'location_summary_property': (LocationSummaryProperty, 'location/summary', 'property', 'fsid'),
+    'location_summary': (LocationSummaryOther, 'location/summary', 'county', 'fsid'),
+    'fema_nfip': (FemaNfip, 'fema/nfip', 'property', 'fsid'),
+    'aal_summary_property': (AALSummaryProperty, 'economic/aal/summary', 'property', 'fsid'),
+    'aal_summary': (AALSummaryOther, 'economic/aal/summary', 'county', 'fsid'),
+    'avm': (AVMProperty, 'economic/avm', 'property', 'fsid'),
+    'avm_provider': (AVMProvider, 'economic/avm/provider', None, 'providerID'),
+    'economic_nfip_premium': (NFIPPremium, 'economic/nfip', 'property', 'fsid'),
+}
+
+# The formatters that merge a summary with its details: (summary payload, detail payload)
+COMBINED = {
+    'adaptation_summary_detail': ('adaptation_summary', 'adaptation_detail'),
+    'historic_summary_event_property': ('historic_summary_property', 'historic_event'),
+    'historic_summary_event': ('historic_summary', 'historic_event'),
+}
+
+
+def make_data(name, size, seed=0):
+    """Builds the model objects passed to a formatter
+
+    Args:
+        name (str): The formatter, without its format_ prefix
+        size (int): The number of search items
+        seed (int): The seed of the synthetic bodies
+    Returns:
+        The list of model objects, or the pair of lists for a combined formatter
+    """
+
+    if name in COMBINED:
+        return [make_data(payload, size, seed) for payload in COMBINED[name]]
+
+    model, product, location, key = PAYLOADS[name]
+    rng = random.Random(seed)
+
+    data = []
+    for item in range(1, size + 1):
+        if item % 100 == 0:
+            data.append(model({key: item, 'valid_id': False, 'error': "Invalid ID"}))
+        else:
+            data.append(model(PRODUCTS[product](item, location, rng)))
+
+    return data
+
+
+def measure(formatter, data, repeat):
+    """Returns the best time in seconds, the peak memory in MB and the rows of a formatter"""
+
+    # The traced run also warms up the lazy imports and caches of pandas before the timed runs
+    gc.collect()
+    tracemalloc.start()
+    rows = len(formatter(data))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    elapsed = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        formatter(data)
+        elapsed.append(time.perf_counter() - start)
+
+    return min(elapsed), peak / (1024 * 1024), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Formatter benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000])
+    parser.add_argument("--only", nargs="+", default=None, help="The formatters to run, such as probability_depth")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.25, help="The allowed slowdown or growth, 0.25 is 25%%")
+    parser.add_argument("--min-delta", type=float, default=0.02,
+                        help="The slowdown in seconds below which a formatter is not failed, to absorb timer noise")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    names = args.only or list(PAYLOADS) + list(COMBINED)
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+
+    results = {}
+    regressions = []
+
+    print("{:<34} {:>9} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "formatter", "items", "rows", "time (s)", "baseline", "peak (MB)", "baseline"))
+
+    for name in names:
+        formatter = getattr(csv_format, "format_" + name)
+
+        for size in args.sizes:
+            key = "{}:{}".format(name, size)
+            elapsed, peak, rows = measure(formatter, make_data(name, size), args.repeat)
+            results[key] = {'seconds': elapsed, 'peak_mb': peak, 'rows': rows}
+
+            base = baseline.get(key)
+            status = ""
+            if base:
+                slower = elapsed > base['seconds'] * (1 + args.threshold) and \
+                    elapsed - base['seconds'] > args.min_delta
+                bigger = peak > base['peak_mb'] * (1 + args.threshold)
+
+                if slower or bigger:
+                    status = "REGRESSION"
+                    regressions.append(key)
+
+            print("{:<34} {:>9} {:>10} {:>10.4f} {:>10} {:>10.1f} {:>10} {}".format(
+                name, size, rows, elapsed, "{:.4f}".format(base['seconds']) if base else "-", peak,
+                "{:.1f}".format(base['peak_mb']) if base else "-", status))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+
+        # Keep the entries of the formatters and sizes that were not run
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as fp:
+                saved = json.load(fp)
+        saved.update(results)
+
+        with open(args.baseline, "w") as fp:
+            json.dump(saved, fp, indent=2, sort_keys=True)
+            fp.write("\n")
+
+        print("Saved the baseline to {}".format(args.baseline))
+
+    elif regressions:
+        print("{} formatters regressed by more than {:.0%}: {}".format(len(regressions), args.threshold,
+                                                                       ", ".join(regressions)))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+"""Measures the cold-start import time of the client, and fails when it is over a budget.
+
+Each run imports firststreet in a fresh interpreter with -X importtime. The report gives the best and median import
+time, the modules that took the longest, and the heavy dependencies that were loaded by the import. pandas, shapely
+and tqdm are only imported once a call writes a file, asks for a frame, builds a shape or shows a progress bar, and
+the script exits with 1 if one of them is loaded by the import or the median is over --budget.
+
+    python benchmarks/bench_import.py --runs 10 --budget 400
+"""
+
+# Standard Imports
+import argparse
+import statistics
+import subprocess
+import sys
+
+# The dependencies the import of the client must not load
+DEFERRED = ('pandas', 'numpy', 'shapely', 'tqdm')
+
+CODE = "import sys, firststreet; print(','.join(m for m in {!r} if m in sys.modules))".format(DEFERRED)
+
+
+def import_time():
+    """Imports the client in a fresh interpreter
+
+    Returns:
+        The cumulative import time in ms, the self time in ms of each module, and the deferred modules loaded
+    """
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", CODE], capture_output=True, text=True,
+                            check=True)
+
+    modules = {}
+    total = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+
+        modules[name.strip()] = int(self_us) / 1000
+        if name.strip() == "firststreet":
+            total = int(cumulative_us) / 1000
+
+    loaded = [module for module in result.stdout.strip().split(",") if module]
+
+    return total, modules, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=400, help="The median import time allowed, in ms")
+    parser.add_argument("--top", type=int, default=10, help="The number of slowest modules to list")
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        total, modules, loaded = import_time()
+        totals.append(total)
+
+    median = statistics.median(totals)
+
+    print("import firststreet: best {:.1f} ms, median {:.1f} ms over {} runs (budget {:.0f} ms)".format(
+        min(totals), median, args.runs, args.budget))
+    print()
+    print("{:<48} {:>10}".format("slowest modules (last run)", "self (ms)"))
+    for name, elapsed in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print("{:<48} {:>10.1f}".format(name, elapsed))
+    print()
+
+    failed = False
+    if loaded:
+        print("FAILED: the import loaded {}".format(", ".join(loaded)))
+        failed = True
+
+    if median > args.budget:
+        print("FAILED: the median import time is over the budget of {:.0f} ms".format(args.budget))
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+"""Measures the memory held per model object with __slots__, against the same fields in a per-instance __dict__.
+
+The objects are built from synthetic responses with tracemalloc running. The responses themselves are created before
+tracing starts, so only the model objects and their attribute storage are counted.
+
+    python benchmarks/bench_model_memory.py --count 100000
+"""
+
+# Standard Imports
+import argparse
+import gc
+import tracemalloc
+
+# Internal Imports
+from firststreet.models.economic import AVMProperty, NFIPPremium
+from firststreet.models.location import LocationDetailProperty
+from firststreet.models.probability import ProbabilityDepth
+
+
+class DictModel:
+    """Holds the fields in a per-instance __dict__, as the models did before __slots__"""
+
+    def __init__(self, fields):
+        self.__dict__.update(fields)
+
+
+RESPONSES = {
+    LocationDetailProperty: lambda i: {'fsid': i, 'streetNumber': str(i), 'route': "Main St", 'city': {'fsid': 1},
+                                       'zipCode': "02108", 'zcta': {'fsid': 2}, 'neighborhood': [], 'tract': {},
+                                       'county': {}, 'cd': {}, 'state': {}, 'footprintId': i, 'elevation': 3,
+                                       'fema': "AE", 'floorElevation': 4, 'building': {}, 'floodType': "X",
+                                       'residential': True},
+    ProbabilityDepth: lambda i: {'fsid': i, 'depth': []},
+    AVMProperty: lambda i: {'fsid': i, 'avm': {'mid': 1}, 'providerID': 2},
+    NFIPPremium: lambda i: {'fsid': i, 'data': {}},
+}
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objects
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model memory benchmark")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    print("{:<24} {:>12} {:>12} {:>8}".format("model", "dict (B/obj)", "slots (B/obj)", "saved"))
+
+    for model, response in RESPONSES.items():
+        responses = [response(i) for i in range(args.count)]
+        fields = [model(r).to_dict() for r in responses]
+
+        slots = measure(lambda i: model(responses[i]), args.count)
+        dicts = measure(lambda i: DictModel(fields[i]), args.count)
+
+        print("{:<24} {:>12.0f} {:>12.0f} {:>7.0%}".format(model.__name__, dicts / args.count, slots / args.count,
+                                                           1 - slots / dicts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+"""Measures the full pipeline of a product call, from the requests to the csv file, against the local FakeApi.
+
+The fake API runs in its own process so its CPU and memory are not counted against the client. The report gives the
+requests per second, the p50 and p99 latency of the requests as seen by the client, the time spent in each stage,
+and the peak RSS of the client process.
+
+    python benchmarks/bench_pipeline.py --product probability.get_depth --count 20000 --latency lognormal:0.02:0.5
+    python benchmarks/bench_pipeline.py --product location.get_detail --location property --items address \
+        --error-rate 0.01 --rate-limit 5000 --rate-period 10
+"""
+
+# Standard Imports
+import argparse
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where the peak RSS is not reported
+    resource = None
+
+# Internal Imports
+import firststreet
+from firststreet.tracing import Tracer
+
+
+def search_items(kind, count):
+    if kind == "fsid":
+        return list(range(1, count + 1))
+
+    if kind == "latlng":
+        return [(25 + i % 2000 / 100, -80 - i // 2000 / 100) for i in range(count)]
+
+    return ["{} Main St, New York, NY".format(i) for i in range(1, count + 1)]
+
+
+def peak_rss():
+    """Returns the peak RSS of the process in MB, or None where it cannot be read"""
+
+    if resource is None:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def start_server(args):
+    command = [sys.executable, "-m", "firststreet.fake_api", "--port", "0", "--seed", "0",
+               "--error-rate", str(args.error_rate), "--rate-period", str(args.rate_period)]
+    if args.latency:
+        command += ["--latency", args.latency]
+    if args.rate_limit:
+        command += ["--rate-limit", str(args.rate_limit)]
+
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return server, server.stdout.readline().strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full pipeline benchmark against the local fake API")
+    parser.add_argument("--product", default="probability.get_depth", help="The product method, such as avm.get_avm")
+    parser.add_argument("--location", default=None, help="The location type, for the methods that take one")
+    parser.add_argument("--items", choices=("fsid", "latlng", "address"), default="fsid")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--latency", default="lognormal:0.02:0.5", help="The latency distribution of the fake API")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="The fraction of requests failed with 503")
+    parser.add_argument("--rate-limit", type=int, default=None, help="The rate limit of the fake API")
+    parser.add_argument("--rate-period", type=float, default=60)
+    parser.add_argument("--connection-limit", type=int, default=100)
+    parser.add_argument("--client-rate-limit", type=int, default=10 ** 9)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    server, url = start_server(args)
+    tracer = Tracer()
+
+    try:
+        with firststreet.FirstStreet("key", connection_limit=args.connection_limit,
+                                     rate_limit=args.client_rate_limit, rate_period=60, log=False,
+                                     tracer=tracer) as fs, tempfile.TemporaryDirectory() as output_dir:
+            fs.http.options['url'] = url
+
+            product, method = args.product.split(".")
+            call = getattr(getattr(fs, product), method)
+            location = (args.location,) if args.location else ()
+
+            items = search_items(args.items, args.count)
+
+            start = time.perf_counter()
+            call(items, *location, csv=True, output_dir=output_dir)
+            elapsed = time.perf_counter() - start
+
+            report = fs.http.instrumentation.report()
+
+    finally:
+        server.terminate()
+        server.wait()
+
+    # Every request goes to the one host of the fake API
+    stats = next(iter(tracer.stats().values()))
+    rss = peak_rss()
+
+    print("{} of {} {} search items in {:.2f}s".format(args.product, args.count, args.items, elapsed))
+    print("{:>10.0f} requests/s ({} requests, {} connection errors)".format(
+        stats['requests'] / elapsed, stats['requests'], stats['errors']))
+    print("{:>10.2f} ms p50 latency".format(stats['total']['p50_ms']))
+    print("{:>10.2f} ms p99 latency".format(stats['total']['p99_ms']))
+    print("{:>10} peak RSS".format("{:.1f} MB".format(rss) if rss is not None else "n/a"))
+    print()
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
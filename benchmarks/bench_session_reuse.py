@@ -0,0 +1,83 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+"""Compares a fresh session per batch against the persistent session held by Http.
+
+A local aiohttp server stands in for the API and counts the TCP connections it accepts. Each batch calls
+endpoint_execute once, the same way every product call does.
+
+    python benchmarks/bench_session_reuse.py --batches 20 --batch-size 200
+"""
+
+# Standard Imports
+import argparse
+import asyncio
+import logging
+import time
+
+# External Imports
+from aiohttp import web
+
+# Internal Imports
+from firststreet.http_util import Http
+
+
+async def start_server(connections):
+
+    async def handler(request):
+        connections.add(id(request.transport))
+        return web.json_response({"fsid": int(request.match_info['fsid']), "depth": []})
+
+    app = web.Application()
+    app.router.add_get('/v1/probability/depth/property/{fsid}', handler)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    return runner, "http://127.0.0.1:{}".format(port)
+
+
+async def run(batches, batch_size, connection_limit, persistent):
+    connections = set()
+    runner, url = await start_server(connections)
+
+    endpoints = [("{}/v1/probability/depth/property/{}".format(url, i), i, "probability", "depth")
+                 for i in range(batch_size)]
+
+    http = Http("", connection_limit, 10 ** 9, 60)
+    start = time.perf_counter()
+
+    try:
+        for _ in range(batches):
+            await http.endpoint_execute(endpoints)
+
+            # Emulate the previous behaviour of one session per call
+            if not persistent:
+                await http.close()
+
+    finally:
+        await http.close()
+        await runner.cleanup()
+
+    return time.perf_counter() - start, len(connections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session reuse benchmark")
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--connection-limit", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    for name, persistent in (("session per batch", False), ("persistent session", True)):
+        elapsed, connections = asyncio.run(run(args.batches, args.batch_size, args.connection_limit, persistent))
+        print("{:<20} {:>8.3f}s total {:>8.2f}ms/batch {:>6} connections ({:.1f}/batch)".format(
+            name, elapsed, elapsed / args.batches * 1000, connections, connections / args.batches))
+
+
+if __name__ == "__main__":
+    main()
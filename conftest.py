@@ -29,4 +29,9 @@ def pytest_collection_modifyitems(config, items):
 
 @pytest.fixture(scope='session', autouse=True)
 def setup_connection(request):
-    return Http("", 100, 4950, 60)
+    http = Http("", 100, 4950, 60)
+    yield http
+
+    # Close the shared session on the loop that opened it
+    if http._loop is not None and not http._loop.is_closed():
+        http._loop.run_until_complete(http.close())
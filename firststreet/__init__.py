@@ -4,6 +4,7 @@
 
 # Standard Imports
 import logging
+import weakref
 
 # Internal Imports
 from firststreet.api.adaptation import Adaptation
@@ -14,8 +15,34 @@ from firststreet.api.location import Location
 from firststreet.api.probability import Probability
 from firststreet.api.tile import Tile
 from firststreet.api.economic import AAL, AVM, Economic
+from firststreet.cache import MemoryCache, ResponseCache
 from firststreet.errors import MissingAPIKeyError
 from firststreet.http_util import Http
+from firststreet.journal import Journal
+from firststreet.metrics import Metrics
+from firststreet.rate_limiter import AdaptiveRateLimiter, SharedRateLimiter
+from firststreet.retry import RetryBudget, RetryPolicy
+from firststreet.tracing import Tracer
+from firststreet.util import chunked, iter_search_items_from_file, run_until_complete
+
+__all__ = ['FirstStreet', 'AsyncFirstStreet', 'MemoryCache', 'ResponseCache', 'Journal', 'Metrics',
+           'AdaptiveRateLimiter', 'SharedRateLimiter', 'RetryBudget', 'RetryPolicy', 'Tracer', 'MissingAPIKeyError',
+           'chunked', 'iter_search_items_from_file', 'run_until_complete']
+
+
+def _release(http):
+    """Closes the session of a client that was not closed, once the client is garbage collected or the interpreter
+    exits. The session can only be closed on its own event loop, so it is left to close when that loop is gone or busy
+
+    Args:
+        http (Http): The Http of the client
+    """
+
+    loop = http._loop
+    if http._session is None or loop is None or loop.is_closed() or loop.is_running():
+        return
+
+    loop.run_until_complete(http.close())
 
 
 class FirstStreet:
@@ -29,19 +56,49 @@ class FirstStreet:
             rate_period (int): period of time for the limit
             version (str): The version to call the API with
             log (bool): To log the outputs on info level
+            rate_limiter (object/None): A rate limiter used in place of the static throttler, such as an
+                AdaptiveRateLimiter fed by the x-ratelimit headers of each response, or a SharedRateLimiter whose bucket
+                is shared by every process on the host
+            retry_policy (RetryPolicy/None): Decides which failures are retried and the backoff between retries.
+                Defaults to a RetryPolicy with exponential backoff and a retry budget
+            cache (ResponseCache/None): A persistent on-disk cache of the responses, keyed by endpoint url. Cached
+                responses are returned without calling the API
+            memory_cache (MemoryCache/None): An in-process LRU cache of the decoded responses for long-running
+                services. Concurrent requests for the same endpoint are coalesced into one
+            journal (Journal/None): An append-only journal of the completed requests. A job that died can be run
+                again with a Journal opened with resume=True, and the requests it completed are replayed from it
+            tracer (Tracer/None): Traces the DNS, connect, send and first byte timings of every request, and the
+                connection pool reuse rate of each host
+            metrics (Metrics/None): Counts the requests, errors by product, retries, cache hits, bytes received and
+                the last x-ratelimit-remaining header. Export them with Metrics.serve or Metrics.export
+        Methods:
+            open: Opens the connection pool that is reused by every product call
+            close: Closes the connection pool. Call it when done with a client that is not used as a context manager.
+                A client that was not closed is closed when it is garbage collected or the interpreter exits
         Example:
         ```python
             import os
             import firststreet
 
+            with firststreet.FirstStreet(os.environ['FIRSTSTREET_API_KEY']) as fs:
+                location = fs.location.get_detail([450350223646], "property")
+                depth = fs.probability.get_depth([450350223646])
+
             fs = firststreet.FirstStreet(os.environ['FIRSTSTREET_API_KEY'])
-            property_summary = fs.data_summary.get_property_by_fsid("450350223646")
+            try:
+                location = fs.location.get_detail([450350223646], "property")
+            finally:
+                fs.close()
         ```
         Raises:
             MissingAPIError: If the API is not provided
     """
 
-    def __init__(self, api_key=None, connection_limit=100, rate_limit=4990, rate_period=60, version=None, log=True):
+    _asynchronous = False
+
+    def __init__(self, api_key=None, connection_limit=100, rate_limit=4990, rate_period=60, version=None, log=True,
+                 rate_limiter=None, retry_policy=None, cache=None, memory_cache=None,
+                 journal=None, tracer=None, metrics=None):
 
         if not api_key:
             raise MissingAPIKeyError('Missing API Key.')
@@ -50,14 +107,86 @@ class FirstStreet:
             logging.basicConfig(level=logging.INFO,
                                 format='%(asctime)s %(name)-12s %(levelname)-8s %(message)s')
 
-        self.http = Http(api_key, connection_limit, rate_limit, rate_period, version)
-        self.location = Location(self.http)
-        self.probability = Probability(self.http)
-        self.historic = Historic(self.http)
-        self.adaptation = Adaptation(self.http)
-        self.environmental = Environmental(self.http)
-        self.fema = Fema(self.http)
-        self.tile = Tile(self.http)
-        self.aal = AAL(self.http)
-        self.avm = AVM(self.http)
-        self.economic = Economic(self.http)
+        self.http = Http(api_key, connection_limit, rate_limit, rate_period, version, rate_limiter=rate_limiter,
+                         retry_policy=retry_policy, cache=cache, memory_cache=memory_cache,
+                         journal=journal, tracer=tracer, metrics=metrics)
+        self.location = Location(self.http, self._asynchronous)
+        self.probability = Probability(self.http, self._asynchronous)
+        self.historic = Historic(self.http, self._asynchronous)
+        self.adaptation = Adaptation(self.http, self._asynchronous)
+        self.environmental = Environmental(self.http, self._asynchronous)
+        self.fema = Fema(self.http, self._asynchronous)
+        self.tile = Tile(self.http, self._asynchronous)
+        self.aal = AAL(self.http, self._asynchronous)
+        self.avm = AVM(self.http, self._asynchronous)
+        self.economic = Economic(self.http, self._asynchronous)
+
+        # The synchronous client owns its event loop, so a session left open can still be closed on it
+        if not self._asynchronous:
+            weakref.finalize(self, _release, self.http)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        """Opens the session and keep-alive connection pool used by every product call. Calling this is optional as
+        the session is opened on the first call, but the pool is only released by close
+        """
+        run_until_complete(self.http.open())
+
+    def close(self):
+        """Closes the session and releases the pooled connections"""
+        run_until_complete(self.http.close())
+
+
+class AsyncFirstStreet(FirstStreet):
+    """The asynchronous counterpart of FirstStreet for use inside a running event loop. Every product method returns an
+        awaitable instead of running the requests to completion, so several products can be awaited concurrently on
+        one event loop and one shared connection pool. It takes the same arguments as FirstStreet.
+
+        Methods:
+            open: Opens the connection pool that is reused by every product call
+            close: Closes the connection pool
+        Example:
+        ```python
+            import asyncio
+            import os
+            import firststreet
+
+            async def main():
+                async with firststreet.AsyncFirstStreet(os.environ['FIRSTSTREET_API_KEY']) as fs:
+                    location, depth = await asyncio.gather(fs.location.get_detail([450350223646], "property"),
+                                                           fs.probability.get_depth([450350223646]))
+
+            asyncio.run(main())
+        ```
+        Raises:
+            MissingAPIError: If the API is not provided
+    """
+
+    _asynchronous = True
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with AsyncFirstStreet")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def open(self):
+        """Opens the session and keep-alive connection pool on the running event loop"""
+        await self.http.open()
+
+    async def close(self):
+        """Closes the session and releases the pooled connections"""
+        await self.http.close()
@@ -4,6 +4,7 @@
 # Standard Imports
 import argparse
 import ast
+import itertools
 import os
 import logging
 from distutils.util import strtobool
@@ -11,8 +12,10 @@ import sys
 
 # Internal Imports
 import firststreet
+from firststreet.api.csv_format import CsvWriter
 from firststreet.errors import InvalidArgument
-from firststreet.util import read_search_items_from_file
+from firststreet.shard import run_product
+from firststreet.util import chunked, iter_search_items_from_file
 
 
 if __name__ == "__main__":
@@ -29,8 +32,21 @@ if __name__ == "__main__":
                             required=False, default="100")
         parser.add_argument("-rate_limit", "--rate_limit", help="Example: 4990", required=False, default="4990")
         parser.add_argument("-rate_period", "--rate_period", help="Example: 60", required=False, default="60")
+        parser.add_argument("-shared_rate_limit", "--shared_rate_limit", help="Example: True", required=False,
+                            default="False")
         parser.add_argument("-o", "--output_dir", help="Example: /output", required=False)
+        parser.add_argument("-fmt", "--format", help="Example: parquet", required=False, default="csv",
+                            choices=["csv", "parquet", "arrow"])
+        parser.add_argument("-cs", "--chunk_size", help="Example: 10000", required=False)
+        parser.add_argument("-proc", "--processes", help="Example: 4", required=False)
+        parser.add_argument("-j", "--journal", help="Example: ./output_data/depth.journal", required=False)
+        parser.add_argument("-r", "--resume", help="Example: True", required=False, default="False")
+        parser.add_argument("-trace", "--trace", help="Example: True", required=False, default="False")
+        parser.add_argument("-metrics_port", "--metrics_port", help="Example: 9464", required=False)
+        parser.add_argument("-metrics_file", "--metrics_file", help="Example: ./fsf.prom", required=False)
         parser.add_argument("-s", "--search_items", help="Example: 28,29", required=False,)
+        parser.add_argument("-col", "--column", help="Example: fsid, or lat,lng for a csv of coordinates",
+                            required=False)
         parser.add_argument("-l", "--location_type", help="Example: property", required=False)
         parser.add_argument("-y", "--year", required=False)
         parser.add_argument("-rp", "--return_period", required=False)
@@ -180,13 +196,20 @@ if __name__ == "__main__":
             if connection_adjust.lower() == "y":
                 argument.output_dir = input("Input new output directory location: ")
 
-        # Reads a file or converts search items into a list
+        # The csv column, or the pair of lat and lng columns, of a search item file
+        column = None
+        if argument.column:
+            column = tuple(int(col) if col.strip().isdecimal() else col.strip()
+                           for col in argument.column.split(","))
+            column = column[0] if len(column) == 1 else column
+
+        # Streams the search items of a file, or converts search items into a list
         search_items = []
         if argument.search_items:
 
-            # If file, read addresses from file
+            # If file, read the search items lazily so the requests start before the whole file is read
             if os.path.isfile(argument.search_items):
-                search_items = read_search_items_from_file(argument.search_items)
+                search_items = iter_search_items_from_file(argument.search_items, column=column)
             else:
                 items = argument.search_items.strip().split(";")
                 if len(items) == 1:
@@ -202,10 +225,14 @@ if __name__ == "__main__":
         if argument.file:
             logging.warning("'file' argument deprecated and will be removed. Use `-s path_to_file` instead. "
                             "Ex: `-s testing/sample.txt`")
-            search_items += read_search_items_from_file(argument.file)
+            search_items = itertools.chain(search_items, iter_search_items_from_file(argument.file))
+
+        # Ensure there is at least a product and search item, without reading past the first one
+        search_items = iter(search_items)
+        first_item = next(search_items, None)
 
-        # Ensure there is at least a product and search item
-        if search_items:
+        if first_item is not None:
+            search_items = itertools.chain([first_item], search_items)
 
             limit = int(argument.connection_limit)
             rate_limit = int(argument.rate_limit)
@@ -218,198 +245,291 @@ if __name__ == "__main__":
                     key, value = element.split(":")
                     formatted_params[key] = ast.literal_eval(value)
 
+            # Share one token bucket with the other processes on the host
+            rate_limiter = None
+            if strtobool(argument.shared_rate_limit):
+                rate_limiter = firststreet.SharedRateLimiter(rate_limit, rate_period, api_key=api_key)
+
+            # Journal the completed requests so a job that died can be resumed without pulling them again
+            journal = None
+            resume = bool(strtobool(argument.resume))
+            if argument.journal or resume:
+                journal_path = argument.journal
+                if not journal_path:
+                    journal_path = os.path.join(argument.output_dir or "output_data",
+                                                "{}.journal".format(argument.product.lower()))
+
+                journal = firststreet.Journal(journal_path, resume=resume)
+
+            tracer = firststreet.Tracer() if strtobool(argument.trace) else None
+
+            # Export the request, error and rate limit metrics for Prometheus
+            metrics = None
+            if argument.metrics_port or argument.metrics_file:
+                metrics = firststreet.Metrics()
+                if argument.metrics_port:
+                    metrics.serve(int(argument.metrics_port))
+                if argument.metrics_file:
+                    metrics.export(argument.metrics_file)
+
             fs = firststreet.FirstStreet(api_key,
                                          version=argument.version,
                                          connection_limit=limit,
                                          rate_limit=rate_limit,
                                          rate_period=rate_period,
-                                         log=bool(strtobool(argument.log)))
+                                         log=bool(strtobool(argument.log)),
+                                         rate_limiter=rate_limiter,
+                                         journal=journal,
+                                         tracer=tracer,
+                                         metrics=metrics)
 
             # Set to lower for case insensitive
             argument.product = argument.product.lower()
 
+            # Stream the csv in chunks of search items so the memory used is bounded by the chunk size. Without a
+            # chunk size, the search items are passed to one call, which still pulls them as requests complete
+            chunks = [search_items]
+            output = argument.format
+
+            if argument.chunk_size:
+                if argument.format == 'csv':
+                    chunks = chunked(search_items, int(argument.chunk_size))
+                    output = CsvWriter(argument.output_dir)
+                else:
+                    logging.warning("chunk_size only applies to csv output. The search items are pulled at once")
+
+            # Split the search items across worker processes, each with a share of the rate limit
+            processes = int(argument.processes) if argument.processes else 1
+            product_class, _, method_name = argument.product.partition(".")
+
+            if processes > 1 and (argument.format != 'csv' or product_class == 'tile'):
+                logging.warning("processes only applies to csv output. The search items are pulled in one process")
+                processes = 1
+
+            elif not callable(getattr(getattr(fs, product_class, None), method_name, None)):
+                # Unknown products are reported by the loop below
+                processes = 1
+
             try:
-                if argument.product == 'adaptation.get_detail':
-                    fs.adaptation.get_detail(search_items,
-                                             csv=True,
-                                             output_dir=argument.output_dir,
-                                             extra_param=formatted_params)
+                if processes > 1:
+                    # The search items are split into contiguous shards, which needs all of them up front
+                    run_product(fs.http,
+                                argument.product,
+                                list(search_items),
+                                processes,
+                                output_dir=argument.output_dir,
+                                chunk_size=int(argument.chunk_size) if argument.chunk_size else None,
+                                log=bool(strtobool(argument.log)),
+                                location_type=argument.location_type,
+                                extra_param=formatted_params)
 
-                elif argument.product == 'adaptation.get_summary':
-                    fs.adaptation.get_summary(search_items,
-                                              argument.location_type,
-                                              csv=True,
-                                              output_dir=argument.output_dir,
-                                              extra_param=formatted_params)
-
-                elif argument.product == 'adaptation.get_detail_by_location':
-                    fs.adaptation.get_detail_by_location(search_items,
-                                                         argument.location_type,
-                                                         csv=True,
-                                                         output_dir=argument.output_dir,
-                                                         extra_param=formatted_params)
-
-                elif argument.product == 'probability.get_depth':
-                    fs.probability.get_depth(search_items,
-                                             csv=True,
-                                             output_dir=argument.output_dir,
-                                             extra_param=formatted_params)
+                else:
+                    for chunk in chunks:
 
-                elif argument.product == 'probability.get_chance':
-                    fs.probability.get_chance(search_items,
-                                              csv=True,
-                                              output_dir=argument.output_dir,
-                                              extra_param=formatted_params)
+                        if argument.product == 'adaptation.get_detail':
+                            fs.adaptation.get_detail(chunk,
+                                                     csv=output,
+                                                     output_dir=argument.output_dir,
+                                                     extra_param=formatted_params)
 
-                elif argument.product == 'probability.get_count_summary':
-                    fs.probability.get_count_summary(search_items,
-                                                     csv=True,
+                        elif argument.product == 'adaptation.get_summary':
+                            fs.adaptation.get_summary(chunk,
+                                                      argument.location_type,
+                                                      csv=output,
+                                                      output_dir=argument.output_dir,
+                                                      extra_param=formatted_params)
+
+                        elif argument.product == 'adaptation.get_detail_by_location':
+                            fs.adaptation.get_detail_by_location(chunk,
+                                                                 argument.location_type,
+                                                                 csv=output,
+                                                                 output_dir=argument.output_dir,
+                                                                 extra_param=formatted_params)
+
+                        elif argument.product == 'probability.get_depth':
+                            fs.probability.get_depth(chunk,
+                                                     csv=output,
                                                      output_dir=argument.output_dir,
                                                      extra_param=formatted_params)
 
-                elif argument.product == 'probability.get_cumulative':
-                    fs.probability.get_cumulative(search_items,
-                                                  csv=True,
+                        elif argument.product == 'probability.get_chance':
+                            fs.probability.get_chance(chunk,
+                                                      csv=output,
+                                                      output_dir=argument.output_dir,
+                                                      extra_param=formatted_params)
+
+                        elif argument.product == 'probability.get_count_summary':
+                            fs.probability.get_count_summary(chunk,
+                                                             csv=output,
+                                                             output_dir=argument.output_dir,
+                                                             extra_param=formatted_params)
+
+                        elif argument.product == 'probability.get_cumulative':
+                            fs.probability.get_cumulative(chunk,
+                                                          csv=output,
+                                                          output_dir=argument.output_dir,
+                                                          extra_param=formatted_params)
+
+                        elif argument.product == 'probability.get_count':
+                            fs.probability.get_count(chunk,
+                                                     argument.location_type,
+                                                     csv=output,
+                                                     output_dir=argument.output_dir,
+                                                     extra_param=formatted_params)
+
+                        elif argument.product == 'historic.get_event':
+                            fs.historic.get_event(chunk,
+                                                  csv=output,
                                                   output_dir=argument.output_dir,
                                                   extra_param=formatted_params)
 
-                elif argument.product == 'probability.get_count':
-                    fs.probability.get_count(search_items,
+                        elif argument.product == 'historic.get_summary':
+                            fs.historic.get_summary(chunk,
+                                                    argument.location_type,
+                                                    csv=output,
+                                                    output_dir=argument.output_dir,
+                                                    extra_param=formatted_params)
+
+                        elif argument.product == 'historic.get_events_by_location':
+                            fs.historic.get_events_by_location(chunk,
+                                                               argument.location_type,
+                                                               csv=output,
+                                                               output_dir=argument.output_dir,
+                                                               extra_param=formatted_params)
+
+                        elif argument.product == 'location.get_detail':
+                            fs.location.get_detail(chunk,
+                                                   argument.location_type,
+                                                   csv=output,
+                                                   output_dir=argument.output_dir,
+                                                   extra_param=formatted_params)
+
+                        elif argument.product == 'location.get_summary':
+                            fs.location.get_summary(chunk,
+                                                    argument.location_type,
+                                                    csv=output,
+                                                    output_dir=argument.output_dir,
+                                                    extra_param=formatted_params)
+
+                        elif argument.product == 'fema.get_nfip':
+                            fs.fema.get_nfip(chunk,
                                              argument.location_type,
-                                             csv=True,
+                                             csv=output,
                                              output_dir=argument.output_dir,
                                              extra_param=formatted_params)
 
-                elif argument.product == 'historic.get_event':
-                    fs.historic.get_event(search_items,
-                                          csv=True,
-                                          output_dir=argument.output_dir,
-                                          extra_param=formatted_params)
-
-                elif argument.product == 'historic.get_summary':
-                    fs.historic.get_summary(search_items,
-                                            argument.location_type,
-                                            csv=True,
-                                            output_dir=argument.output_dir,
-                                            extra_param=formatted_params)
-
-                elif argument.product == 'historic.get_events_by_location':
-                    fs.historic.get_events_by_location(search_items,
-                                                       argument.location_type,
-                                                       csv=True,
+                        elif argument.product == 'environmental.get_precipitation':
+                            fs.environmental.get_precipitation(chunk,
+                                                               csv=output,
+                                                               output_dir=argument.output_dir,
+                                                               extra_param=formatted_params)
+
+                        elif argument.product == 'tile.get_probability_depth':
+                            if not argument.year:
+                                logging.error("get_probability_depth is missing the year argument")
+                                input("Press Enter to continue...")
+                                sys.exit()
+
+                            try:
+                                int(argument.year)
+                            except ValueError:
+                                logging.error("The year argument could not be converted to an int. "
+                                              "Provided argument: {}".format(argument.year))
+                                input("Press Enter to continue...")
+                                sys.exit()
+
+                            if not argument.return_period:
+                                logging.error("get_probability_depth is missing the return_period argument")
+                                input("Press Enter to continue...")
+                                sys.exit()
+
+                            try:
+                                int(argument.return_period)
+                            except ValueError:
+                                logging.error("The return_period argument could not be converted to an int. "
+                                              "Provided argument: {}".format(argument.return_period))
+                                input("Press Enter to continue...")
+                                sys.exit()
+
+                            fs.tile.get_probability_depth(year=int(argument.year),
+                                                          return_period=int(argument.return_period),
+                                                          search_items=chunk,
+                                                          output_dir=argument.output_dir,
+                                                          image=True)
+
+                        elif argument.product == 'tile.get_historic_event':
+
+                            if not argument.event_id:
+                                logging.error("get_probability_depth is missing the event_id argument")
+                                input("Press Enter to continue...")
+                                sys.exit()
+
+                            try:
+                                int(argument.event_id)
+                            except ValueError:
+                                logging.error("The event_id argument could not be converted to an int. "
+                                              "Provided argument: {}".format(argument.event_id))
+                                input("Press Enter to continue...")
+                                sys.exit()
+
+                            fs.tile.get_historic_event(event_id=int(argument.event_id),
+                                                       search_items=chunk,
                                                        output_dir=argument.output_dir,
-                                                       extra_param=formatted_params)
+                                                       image=True)
+
+                        elif argument.product == 'aal.get_summary':
+                            fs.aal.get_summary(chunk,
+                                               argument.location_type,
+                                               csv=output,
+                                               output_dir=argument.output_dir,
+                                               extra_param=formatted_params)
 
-                elif argument.product == 'location.get_detail':
-                    fs.location.get_detail(search_items,
-                                           argument.location_type,
-                                           csv=True,
+                        elif argument.product == 'avm.get_avm':
+                            fs.avm.get_avm(chunk,
+                                           csv=output,
                                            output_dir=argument.output_dir,
                                            extra_param=formatted_params)
 
-                elif argument.product == 'location.get_summary':
-                    fs.location.get_summary(search_items,
-                                            argument.location_type,
-                                            csv=True,
-                                            output_dir=argument.output_dir,
-                                            extra_param=formatted_params)
-
-                elif argument.product == 'fema.get_nfip':
-                    fs.fema.get_nfip(search_items,
-                                     argument.location_type,
-                                     csv=True,
-                                     output_dir=argument.output_dir,
-                                     extra_param=formatted_params)
-
-                elif argument.product == 'environmental.get_precipitation':
-                    fs.environmental.get_precipitation(search_items,
-                                                       csv=True,
-                                                       output_dir=argument.output_dir,
-                                                       extra_param=formatted_params)
+                        elif argument.product == 'avm.get_provider':
+                            fs.avm.get_provider(chunk,
+                                                csv=output,
+                                                output_dir=argument.output_dir,
+                                                extra_param=formatted_params)
 
-                elif argument.product == 'tile.get_probability_depth':
-                    if not argument.year:
-                        logging.error("get_probability_depth is missing the year argument")
-                        input("Press Enter to continue...")
-                        sys.exit()
+                        elif argument.product == 'economic.get_property_nfip':
+                            fs.economic.get_property_nfip(chunk,
+                                                          csv=output,
+                                                          output_dir=argument.output_dir,
+                                                          extra_param=formatted_params)
 
-                    try:
-                        int(argument.year)
-                    except ValueError:
-                        logging.error("The year argument could not be converted to an int. "
-                                      "Provided argument: {}".format(argument.year))
-                        input("Press Enter to continue...")
-                        sys.exit()
-
-                    if not argument.return_period:
-                        logging.error("get_probability_depth is missing the return_period argument")
-                        input("Press Enter to continue...")
-                        sys.exit()
+                        else:
+                            logging.error("Product not found. Please check that the argument"
+                                          " provided is correct: {}".format(argument.product))
+                            break
 
-                    try:
-                        int(argument.return_period)
-                    except ValueError:
-                        logging.error("The return_period argument could not be converted to an int. "
-                                      "Provided argument: {}".format(argument.return_period))
-                        input("Press Enter to continue...")
-                        sys.exit()
-
-                    fs.tile.get_probability_depth(year=int(argument.year),
-                                                  return_period=int(argument.return_period),
-                                                  search_items=search_items,
-                                                  output_dir=argument.output_dir,
-                                                  image=True)
+            finally:
+                fs.close()
 
-                elif argument.product == 'tile.get_historic_event':
+                if isinstance(output, CsvWriter):
+                    output.close()
 
-                    if not argument.event_id:
-                        logging.error("get_probability_depth is missing the event_id argument")
-                        input("Press Enter to continue...")
-                        sys.exit()
+                if journal is not None:
+                    journal.close()
 
-                    try:
-                        int(argument.event_id)
-                    except ValueError:
-                        logging.error("The event_id argument could not be converted to an int. "
-                                      "Provided argument: {}".format(argument.event_id))
-                        input("Press Enter to continue...")
-                        sys.exit()
-
-                    fs.tile.get_historic_event(event_id=int(argument.event_id),
-                                               search_items=search_items,
-                                               output_dir=argument.output_dir,
-                                               image=True)
-
-                elif argument.product == 'aal.get_summary':
-                    fs.aal.get_summary(search_items,
-                                       argument.location_type,
-                                       csv=True,
-                                       output_dir=argument.output_dir,
-                                       extra_param=formatted_params)
-
-                elif argument.product == 'avm.get_avm':
-                    fs.avm.get_avm(search_items,
-                                   csv=True,
-                                   output_dir=argument.output_dir,
-                                   extra_param=formatted_params)
-
-                elif argument.product == 'avm.get_provider':
-                    fs.avm.get_provider(search_items,
-                                        csv=True,
-                                        output_dir=argument.output_dir,
-                                        extra_param=formatted_params)
-
-                elif argument.product == 'economic.get_property_nfip':
-                    fs.economic.get_property_nfip(search_items,
-                                                  csv=True,
-                                                  output_dir=argument.output_dir,
-                                                  extra_param=formatted_params)
+                if metrics is not None:
+                    metrics.close()
 
-                else:
-                    logging.error("Product not found. Please check that the argument"
-                                  " provided is correct: {}".format(argument.product))
+                # Summarize where the time of the job went
+                logging.info("Stage latencies:\n{}".format(fs.http.instrumentation.report()))
+
+                if tracer is not None:
+                    for host, stats in tracer.stats().items():
+                        logging.info("{}: {} requests, {:.1%} on reused connections, {} new connections. Connect p50 "
+                                     "{:.1f}ms, p99 {:.1f}ms. Time to first byte p50 {:.1f}ms, p99 {:.1f}ms".format(
+                                         host, stats['requests'], stats['reuse_rate'], stats['new_connections'],
+                                         stats['connect']['p50_ms'], stats['connect']['p99_ms'],
+                                         stats['ttfb']['p50_ms'], stats['ttfb']['p99_ms']))
 
-            finally:
                 input("Press Enter to continue...")
 
         else:
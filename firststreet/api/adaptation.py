@@ -5,10 +5,10 @@
 import logging
 
 # Internal Imports
-from firststreet.api import csv_format
-from firststreet.api.api import Api
+from firststreet.api.api import Api, dual_mode
 from firststreet.errors import InvalidArgument
 from firststreet.models.adaptation import AdaptationDetail, AdaptationSummary
+from firststreet.models.frame import ProductFrame
 
 
 class Adaptation(Api):
@@ -19,40 +19,53 @@ class Adaptation(Api):
             get_summary: Retrieves a list of Adaptation Summary for the given list of IDs
         """
 
-    def get_detail(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_detail(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves adaptation detail product data from the First Street Foundation API given a list of search_items
          and returns a list of Adaptation Detail objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Adaptation Detail
+            A list of Adaptation Detail, or a ProductFrame if as_frame is set
         """
+
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "adaptation", "detail", None, extra_param=extra_param)
-        product = [AdaptationDetail(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "adaptation", "detail", None, extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "adaptation", "detail")
+
+        product = self._build_models(AdaptationDetail, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "adaptation", "detail", output_dir=output_dir)
+            self._to_file(product, "adaptation", "detail", output_dir=output_dir, file_format=csv)
 
         logging.info("Adaptation Detail Data Ready.")
 
         return product
 
-    def get_detail_by_location(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_detail_by_location(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
         """Retrieves adaptation detail product data from the First Street Foundation API given a list of location
         search_items and returns a list of Adaptation Detail objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
             location_type (str): The location lookup type
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
 
@@ -69,58 +82,72 @@ class Adaptation(Api):
             raise TypeError("location is not a string")
 
         # Get data from api and create objects
-        api_datas_summary = self.call_api(search_items, "adaptation", "summary", location_type, extra_param=extra_param)
-        summary = [AdaptationSummary(api_data) for api_data in api_datas_summary]
+        api_datas_summary = await self.call_api_async(search_items, "adaptation", "summary", location_type,
+                                                      extra_param=extra_param)
+        summary = self._build_models(AdaptationSummary, api_datas_summary)
 
         search_items = list(set([adaptation for sum_adap in summary if sum_adap.adaptation for
                                  adaptation in sum_adap.adaptation]))
 
         if search_items:
-            api_datas_detail = self.call_api(search_items, "adaptation", "detail", None, extra_param=extra_param)
+            api_datas_detail = await self.call_api_async(search_items, "adaptation", "detail", None,
+                                                         extra_param=extra_param)
 
         else:
             api_datas_detail = [{"adaptationId": None, "valid_id": False}]
 
-        detail = [AdaptationDetail(api_data) for api_data in api_datas_detail]
+        detail = self._build_models(AdaptationDetail, api_datas_detail)
 
         if csv:
-            csv_format.to_csv([summary, detail], "adaptation", "summary_detail", location_type,
-                              output_dir=output_dir)
+            self._to_file([summary, detail], "adaptation", "summary_detail", location_type,
+                          output_dir=output_dir, file_format=csv)
 
         logging.info("Adaptation Summary Detail Data Ready.")
 
         return [summary, detail]
 
-    def get_summary(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_summary(self, search_items, location_type, csv=False, output_dir=None,
+                          extra_param=None, as_frame=False):
         """Retrieves adaptation summary product data from the First Street Foundation API given a list of
         search_items and returns a list of Adaptation Summary objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
             location_type (str): The location lookup type
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Adaptation Summary
+            A list of Adaptation Summary, or a ProductFrame if as_frame is set
         Raises:
             InvalidArgument: The location provided is empty
             TypeError: The location provided is not a string
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         if not location_type:
             raise InvalidArgument(location_type)
         elif not isinstance(location_type, str):
             raise TypeError("location is not a string")
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "adaptation", "summary", location_type, extra_param=extra_param)
-        product = [AdaptationSummary(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "adaptation", "summary", location_type,
+                                              extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "adaptation", "summary", location_type)
+
+        product = self._build_models(AdaptationSummary, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "adaptation", "summary", location_type, output_dir=output_dir)
+            self._to_file(product, "adaptation", "summary", location_type, output_dir=output_dir, file_format=csv)
 
         logging.info("Adaptation Summary Data Ready.")
 
@@ -2,14 +2,32 @@
 # Copyright: This module is owned by First Street Foundation
 
 # Standard Imports
-import asyncio
+import functools
+import logging
+import os
 import urllib.parse
+from collections.abc import Iterable
 
 # Internal Imports
-import os
-
 from firststreet.errors import InvalidArgument
-from firststreet.util import read_search_items_from_file
+from firststreet.util import iter_search_items_from_file, run_until_complete
+
+
+def dual_mode(method):
+    """Turns a coroutine method of a product into a method that runs to completion for the synchronous client, and
+    that returns the awaitable coroutine for the asynchronous client
+
+    Args:
+        method (coroutine function): The product method
+    Returns:
+        The wrapped method
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self._run(method(self, *args, **kwargs))
+
+    return wrapper
 
 
 class Api:
@@ -17,22 +35,48 @@ class Api:
 
         Attributes:
             http (Http): A http class to connect to the First Street Foundation API
+            asynchronous (bool): To return awaitables from the product methods instead of running them to completion
         Methods:
-            call_api: Creates an endpoint
+            call_api: Creates an endpoint for each search item and calls the API
+            call_api_async: The awaitable counterpart of call_api
+            _build_models: Creates a model object for each response
+            _to_file: Writes the model objects to a csv, Parquet or Arrow file
+            _build_endpoint: Builds the endpoint for a search item
         """
 
-    def __init__(self, http):
+    def __init__(self, http, asynchronous=False):
         """ Init"""
         self._http = http
+        self._asynchronous = asynchronous
+
+    def _run(self, coroutine):
+        """Returns the coroutine as is for the asynchronous client, otherwise runs it to completion"""
+
+        if self._asynchronous:
+            return coroutine
+
+        return run_until_complete(coroutine)
 
     def call_api(self, search_item, product, product_subtype, location=None, tile_product=None, year=None,
                  return_period=None, event_id=None, extra_param=None):
         """Receives an item, a product, a product subtype, and a location to create and call an endpoint to the First
+        Street Foundation API. Returns an awaitable for the asynchronous client.
+
+        See call_api_async for the arguments.
+        """
+
+        return self._run(self.call_api_async(search_item, product, product_subtype, location, tile_product, year,
+                                             return_period, event_id, extra_param))
+
+    async def call_api_async(self, search_item, product, product_subtype, location=None, tile_product=None,
+                             year=None, return_period=None, event_id=None, extra_param=None):
+        """Receives an item, a product, a product subtype, and a location to create and call an endpoint to the First
         Street Foundation API.
 
         Args:
-            search_item (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
-                file of First Street Foundation IDs
+            search_item (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
+                file of First Street Foundation IDs. Items of an iterable, such as a generator over a database
+                cursor, are pulled as requests complete so the requests start before the iterable is exhausted
             product (str): The overall product to call
             product_subtype (str): The product subtype (if suitable)
             location (str/None): The location type (if suitable)
@@ -45,92 +89,194 @@ class Api:
             A list of JSON responses
         """
 
-        # Not a list. This means it's should be a file
-        if not isinstance(search_item, list):
+        # A file is read lazily, one search item at a time
+        if isinstance(search_item, str):
+            if not os.path.isfile(search_item):
+                raise InvalidArgument("File provided is not a list or a valid file. "
+                                      "Please check the file name and path. '{}'".format(str(search_item)))
 
-            # Check if it's a file
-            if isinstance(search_item, str) and os.path.isfile(search_item):
+            search_item = iter_search_items_from_file(search_item)
 
-                # Get search items from file
-                search_item = read_search_items_from_file(search_item)
+        # A bare tuple is a single coordinate, not an iterable of search items
+        elif isinstance(search_item, (bytes, dict, tuple)) or not isinstance(search_item, Iterable):
+            raise InvalidArgument("Search items provided are not a list, an iterable or a valid file. "
+                                  "'{}'".format(str(search_item)))
 
-            else:
-                raise InvalidArgument("File provided is not a list or a valid file. "
-                                      "Please check the file name and path. '{}'".format(str(search_item)))
+        # A list is checked before any request is made. Other iterables are checked as their items are pulled
+        checked = isinstance(search_item, list)
+        if checked:
 
-        else:
+            # No items found
+            if not search_item:
+                raise InvalidArgument(search_item)
+
+            for item in search_item:
+                self._check_search_item(item, product, product_subtype, tile_product, search_item)
+
+        # The index of the unique endpoint of each search item, and the search items for the aal summary
+        unique = {}
+        order = []
+        items = [] if product == "economic/aal" else None
+
+        def endpoints():
+            """Builds the endpoint of each search item as the executor pulls it. Duplicate search items share the
+            request of their first occurrence, so only new urls are yielded
+            """
+
+            for item in search_item:
+                if not checked:
+                    self._check_search_item(item, product, product_subtype, tile_product)
+
+                endpoint = self._build_endpoint(item, product, product_subtype, location, tile_product, year,
+                                                return_period, event_id, extra_param)
+
+                index = unique.get(endpoint[0])
+                if index is None:
+                    index = unique[endpoint[0]] = len(unique)
+                    yield endpoint
+
+                order.append(index)
+                if items is not None:
+                    items.append(item)
+
+        # Asynchronously call the API for each endpoint as the search items arrive
+        results = await self._http.endpoint_execute(endpoints())
+
+        # No items found
+        if not order:
+            raise InvalidArgument("No search items provided")
+
+        saved = len(order) - len(unique)
+        if saved:
+            self._http.deduplicated += saved
+            logging.info("Removed {} duplicate search items. {} requests were made".format(saved, len(unique)))
+
+        # Fan the responses back out to every search item, in order
+        response = [results[index] for index in order]
+
+        if items is not None:
+            return zip(response, items)
+
+        return response
 
-            # Check tile product
-            if tile_product:
-                if not all(isinstance(t, tuple) for t in search_item):
-                    raise TypeError("Input must be a list of coordinates in a tuple of (z, x, y). "
-                                    "Provided Arg: {}".format(search_item))
+    def _build_models(self, model, api_datas, *args):
+        """Creates a model object for each response, timed as the model stage of the instrumentation
 
-                if not all(isinstance(coord, int) for t in search_item for coord in t):
-                    raise TypeError("Each coordinate in the tuple must be an integer. Provided Arg: {}"
-                                    .format(search_item))
+        Args:
+            model (class): The model of the product
+            api_datas (list): The JSON responses
+            args: Extra arguments of the model, such as the year of a tile
+        Returns:
+            A list of model objects
+        """
+
+        with self._http.instrumentation.time('model'):
+            return [model(api_data, *args) for api_data in api_datas]
+
+    def _to_file(self, data, product, product_subtype, location_type=None, output_dir=None, file_format='csv'):
+        """Writes the model objects to a file with csv_format.to_file, timed as the format and write stages of the
+        instrumentation. See csv_format.to_file for the arguments
+        """
+
+        # Imported on first use, so pandas is only loaded by the calls that write a file
+        from firststreet.api import csv_format
 
-                if not all(0 < t[0] <= 18 for t in search_item):
-                    raise TypeError("Max zoom is 18. Provided Arg: {}".format(search_item))
+        csv_format.to_file(data, product, product_subtype, location_type, output_dir, file_format,
+                           instrumentation=self._http.instrumentation)
 
-            # else:
+    @staticmethod
+    def _check_search_item(item, product, product_subtype, tile_product=None, provided=None):
+        """Checks a search item can be used for the product
+
+        Args:
+            item (int/tuple/str): A First Street Foundation ID, lat/lng pair, address, or tile coordinate
+            product (str): The overall product to call
+            product_subtype (str): The product subtype (if suitable)
+            tile_product (str/None): The tile product (if suitable)
+            provided (list/None): The search items shown in the error, defaults to the item
+        Raises:
+            TypeError: The search item is not an int, tuple or str, is not a tile coordinate for a tile product, or
+                is not an ID for a product that only takes IDs
+        """
+
+        if provided is None:
+            provided = item
+
+        # Any other type would build an endpoint without the search item
+        if not isinstance(item, (int, tuple, str)) or isinstance(item, bool):
+            raise TypeError("Input must be an FSID, a tuple of (lat, lng) or an address. "
+                            "Provided Arg: {}".format(provided))
+
+        # Check tile product
+        if tile_product:
+            if not isinstance(item, tuple):
+                raise TypeError("Input must be a list of coordinates in a tuple of (z, x, y). "
+                                "Provided Arg: {}".format(provided))
+
+            if not all(isinstance(coord, int) for coord in item):
+                raise TypeError("Each coordinate in the tuple must be an integer. Provided Arg: {}".format(provided))
+
+            if not 0 < item[0] <= 18:
+                raise TypeError("Max zoom is 18. Provided Arg: {}".format(provided))
 
         # Ensure for historic and adaptation the search items are EventIDs or AdaptationIDs
         if ((product == "adaptation" and product_subtype == "detail") or
             (product == "historic" and product_subtype == "event") or
             (product == "economic/avm" and product_subtype == "provider")) and \
-                not all(isinstance(t, int) for t in search_item):
+                not isinstance(item, int):
             raise TypeError("Input must be an integer for this product. "
-                            "Provided Arg: {}".format(search_item))
+                            "Provided Arg: {}".format(provided))
 
-        # No items found
-        if not search_item:
-            raise InvalidArgument(search_item)
+    def _build_endpoint(self, item, product, product_subtype, location=None, tile_product=None, year=None,
+                        return_period=None, event_id=None, extra_param=None):
+        """Builds the endpoint for a search item
+
+        Args:
+            item (int/tuple/str): A First Street Foundation ID, lat/lng pair, address, or tile coordinate
+            product (str): The overall product to call
+            product_subtype (str): The product subtype (if suitable)
+            location (str/None): The location type (if suitable)
+            tile_product (str/None): The tile product (if suitable)
+            year (int/None): The year for probability depth tiles (if suitable)
+            return_period (int/None): The return period for probability depth tiles (if suitable)
+            event_id (int/None): The event_id for historic tiles (if suitable)
+            extra_param (dict): Extra parameter to be added to the url
+        Returns:
+            A tuple of the url, the search item, the product and the product subtype
+        """
 
         base_url = self._http.options.get('url')
         version = self._http.version
 
-        # Create the endpoint
-        endpoints = []
-        for item in search_item:
-            if location:
-                endpoint = "/".join([base_url, version, product, product_subtype, location])
-            elif tile_product:
-                if event_id:
-                    endpoint = "/".join([base_url, version, product, product_subtype, tile_product,
-                                         str(event_id), "/".join(map(str, item))])
-                else:
-                    endpoint = "/".join([base_url, version, product, product_subtype, tile_product,
-                                         str(year), str(return_period), "/".join(map(str, item))])
+        if location:
+            endpoint = "/".join([base_url, version, product, product_subtype, location])
+        elif tile_product:
+            if event_id:
+                endpoint = "/".join([base_url, version, product, product_subtype, tile_product,
+                                     str(event_id), "/".join(map(str, item))])
             else:
-                endpoint = "/".join([base_url, version, product, product_subtype])
-
-            if not tile_product:
-
-                if not extra_param:
-                    formatted_params = ""
-                else:
-                    formatted_params = urllib.parse.urlencode(extra_param)
-
-                # fsid
-                if isinstance(item, int):
-                    endpoint = endpoint + "/{}".format(item) + "?{}".format(formatted_params)
+                endpoint = "/".join([base_url, version, product, product_subtype, tile_product,
+                                     str(year), str(return_period), "/".join(map(str, item))])
+        else:
+            endpoint = "/".join([base_url, version, product, product_subtype])
 
-                # lat/lng
-                elif isinstance(item, tuple):
-                    endpoint = endpoint + "?lat={}&lng={}&{}".format(item[0], item[1], formatted_params)
+        if not tile_product:
 
-                # address
-                elif isinstance(item, str):
-                    endpoint = endpoint + "?address={}&{}".format(item, formatted_params)
+            if not extra_param:
+                formatted_params = ""
+            else:
+                formatted_params = urllib.parse.urlencode(extra_param)
 
-            endpoints.append((endpoint, item, product, product_subtype))
+            # fsid
+            if isinstance(item, int):
+                endpoint = endpoint + "/{}".format(item) + "?{}".format(formatted_params)
 
-        # Asynchronously call the API for each endpoint
-        loop = asyncio.get_event_loop()
-        response = loop.run_until_complete(self._http.endpoint_execute(endpoints))
+            # lat/lng
+            elif isinstance(item, tuple):
+                endpoint = endpoint + "?lat={}&lng={}&{}".format(item[0], item[1], formatted_params)
 
-        if product == "economic/aal":
-            return zip(response, search_item)
+            # address
+            elif isinstance(item, str):
+                endpoint = endpoint + "?address={}&{}".format(item, formatted_params)
 
-        return response
+        return endpoint, item, product, product_subtype
@@ -2,6 +2,7 @@
 # Copyright: This module is owned by First Street Foundation
 
 # Standard Imports
+import contextlib
 import datetime
 import logging
 import os
@@ -9,10 +10,132 @@ import pathlib
 
 # External Imports
 import pandas as pd
-import shapely.geometry
 
+# Internal Imports
+from firststreet.api.flatten import probability_columns
+from firststreet.errors import InvalidArgument
+
+
+FILE_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+# The strings left by str conversions for missing values
+NA_STRINGS = ['<NA>', 'nan', 'NaN', 'None', '']
+
+# The dtypes of the typed Parquet and Arrow files
+INT, FLOAT, BOOL, TEXT, CATEGORY = 'Int64', 'float64', 'boolean', 'string', 'category'
+
+# The dtype of each column of the typed output of each formatter. The schema is declared so every batch of a product
+# is written with the same types, whatever its values. Codes such as zip codes and state FIPS are text, so leading
+# zeros are kept. Text with a small fixed set of values, such as types and scenarios, is categorical and stored as a
+# dictionary. Columns left out are written as text
+_LOCATION = {'city_fips': INT, 'city_name': TEXT, 'neighborhood_fips': INT, 'neighborhood_name': TEXT,
+             'tract_fips': INT, 'county_fips': INT, 'county_name': TEXT, 'cd_fips': INT, 'cd_name': TEXT,
+             'state_fips': TEXT, 'state_name': CATEGORY, 'zipCode': TEXT, 'fips': INT, 'name': TEXT,
+             'latitude': FLOAT, 'longitude': FLOAT}
+_PROBABILITY = {'fsid': INT, 'year': INT, 'threshold': INT, 'returnPeriod': INT, 'bin': INT}
+
+COLUMN_TYPES = {
+    'adaptation_detail': {'adaptationId': INT, 'name': TEXT, 'type': CATEGORY, 'scenario': CATEGORY, 'conveyance': BOOL,
+                          'returnPeriod': INT, 'serving_property': INT, 'serving_neighborhood': INT,
+                          'serving_zcta': INT, 'serving_tract': INT, 'serving_city': INT, 'serving_county': INT,
+                          'serving_cd': INT, 'serving_state': INT, 'latitude': FLOAT, 'longitude': FLOAT},
+    'adaptation_summary': {'fsid': INT, 'adaptation': INT, 'properties': INT},
+    'probability_chance': dict(_PROBABILITY, low=FLOAT, mid=FLOAT, high=FLOAT),
+    'probability_count': dict(_PROBABILITY, low=INT, mid=INT, high=INT),
+    'probability_count_summary': dict(_PROBABILITY, location=CATEGORY, location_fips=INT, location_name=TEXT,
+                                      subtype=CATEGORY, low=INT, mid=INT, high=INT),
+    'probability_cumulative': dict(_PROBABILITY, low=FLOAT, mid=FLOAT, high=FLOAT),
+    'probability_depth': dict(_PROBABILITY, low=INT, mid=INT, high=INT),
+    'environmental_precipitation': {'fsid': INT, 'year': INT, 'low': FLOAT, 'mid': FLOAT, 'high': FLOAT},
+    'historic_event': {'eventId': INT, 'name': TEXT, 'month': INT, 'year': INT, 'returnPeriod': INT, 'type': CATEGORY,
+                       'propertiesTotal': INT, 'propertiesAffected': INT, 'latitude': FLOAT, 'longitude': FLOAT},
+    'historic_summary_property': {'fsid': INT, 'eventId': INT, 'name': TEXT, 'type': CATEGORY, 'depth': INT},
+    'historic_summary': {'fsid': INT, 'eventId': INT, 'name': TEXT, 'type': CATEGORY, 'bin': INT, 'count': INT},
+    'location_detail_property': dict(_LOCATION, fsid=INT, streetNumber=TEXT, route=TEXT, footprintId=INT,
+                                     elevation=FLOAT, fema=CATEGORY, floorElevation=FLOAT, basement=BOOL, units=INT,
+                                     stories=INT, floodType=CATEGORY, residential=BOOL),
+    'location_detail_neighborhood': dict(_LOCATION, fsid=INT, subtype=CATEGORY),
+    'location_detail_city': dict(_LOCATION, fsid=INT, lsad=CATEGORY),
+    'location_detail_zcta': dict(_LOCATION, fsid=INT),
+    'location_detail_tract': dict(_LOCATION, fsid=INT),
+    'location_detail_county': dict(_LOCATION, fsid=INT, isCoastal=BOOL),
+    'location_detail_cd': dict(_LOCATION, fsid=INT, district=TEXT),
+    'location_detail_state': dict(_LOCATION, fsid=INT),
+    'location_summary_property': {'fsid': INT, 'floodFactor': INT, 'riskDirection': INT, 'environmentalRisk': INT,
+                                  'historic': INT, 'adaptation': INT},
+    'location_summary': {'fsid': INT, 'riskDirection': INT, 'environmentalRisk': INT, 'propertiesTotal': INT,
+                         'propertiesAtRisk': INT, 'historic': INT, 'adaptation': INT},
+    'fema_nfip': {'fsid': INT, 'claimCount': INT, 'policyCount': INT, 'buildingPaid': INT, 'contentPaid': INT,
+                  'buildingCoverage': INT, 'contentCoverage': INT, 'iccPaid': INT},
+    'aal_summary_property': {'fsid': INT, 'depth': INT, 'damage': FLOAT, 'year': INT, 'low': FLOAT, 'mid': FLOAT,
+                             'high': FLOAT},
+    'aal_summary': {'fsid': INT, 'year': INT, 'total_loss_low': FLOAT, 'total_loss_mid': FLOAT,
+                    'total_loss_high': FLOAT, 'count_low': INT, 'count_mid': INT, 'count_high': INT,
+                    'floodFactor_gr2': INT},
+    'avm': {'fsid': INT, 'avm_mid': FLOAT, 'provider_id': INT},
+    'avm_provider': {'provider_id': INT, 'provider_name': TEXT, 'provider_logo': TEXT},
+    'economic_nfip_premium': {'fsid': INT, 'estimate': FLOAT, 'building': FLOAT, 'contents': FLOAT},
+}
+COLUMN_TYPES['adaptation_summary_detail'] = dict(COLUMN_TYPES['adaptation_detail'],
+                                                 **COLUMN_TYPES['adaptation_summary'])
+COLUMN_TYPES['historic_summary_event_property'] = dict(COLUMN_TYPES['historic_event'],
+                                                       **COLUMN_TYPES['historic_summary_property'])
+COLUMN_TYPES['historic_summary_event'] = dict(COLUMN_TYPES['historic_event'], **COLUMN_TYPES['historic_summary'])
+
+
+def timed(instrumentation, stage):
+    """Times a block as a stage of the instrumentation, if any
 
-def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
+    Args:
+        instrumentation (Instrumentation/None): The instrumentation of the Http
+        stage (str): The stage, format or write
+    Returns:
+        A context manager
+    """
+
+    if instrumentation is None:
+        return contextlib.nullcontext()
+
+    return instrumentation.time(stage)
+
+
+def to_file(data, product, product_subtype, location_type=None, output_dir=None, file_format='csv',
+            instrumentation=None):
+    """Receives a list of data, a product, a product subtype, and a location to create a CSV, Parquet or Arrow IPC file
+
+    Args:
+        data (list): A list of FSF object
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+        output_dir (str): The output directory to save the generated file
+        file_format (bool/str/CsvWriter): 'csv' (or True), 'parquet', 'arrow', or a CsvWriter to append the data to
+        instrumentation (Instrumentation/None): Times the formatting and the writing of the file
+    Raises:
+        InvalidArgument: The file format is not supported
+    """
+
+    if file_format is True:
+        file_format = 'csv'
+
+    if isinstance(file_format, CsvWriter):
+        file_format.write(data, product, product_subtype, location_type, instrumentation=instrumentation)
+
+    elif file_format == 'csv':
+        to_csv(data, product, product_subtype, location_type, output_dir, instrumentation=instrumentation)
+
+    elif file_format == 'parquet':
+        to_parquet(data, product, product_subtype, location_type, output_dir, instrumentation=instrumentation)
+
+    elif file_format == 'arrow':
+        to_arrow(data, product, product_subtype, location_type, output_dir, instrumentation=instrumentation)
+
+    else:
+        raise InvalidArgument("File format is not one of: {}. Provided: {}".format(", ".join(FILE_EXTENSIONS),
+                                                                                   file_format))
+
+
+def to_csv(data, product, product_subtype, location_type=None, output_dir=None, instrumentation=None):
     """Receives a list of data, a product, a product subtype, and a location to create a CSV
 
     Args:
@@ -21,17 +144,217 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
         product_subtype (str): The product subtype (if suitable)
         location_type (str): The location lookup type (if suitable)
         output_dir (str): The output directory to save the generated csvs
+        instrumentation (Instrumentation/None): Times the formatting and the writing of the csv
     """
 
     logging.info("Generating CSV file")
 
+    path = output_path(product, product_subtype, location_type, output_dir, FILE_EXTENSIONS['csv'])
+
+    with timed(instrumentation, 'format'):
+        df = format_data(data, product, product_subtype, location_type)
+        df = df.fillna(pd.NA).astype(str)
+
+    with timed(instrumentation, 'write'):
+        df.to_csv(path, index=False)
+    logging.info("CSV generated to '{}'.".format(path))
+
+
+def to_parquet(data, product, product_subtype, location_type=None, output_dir=None, compression='zstd',
+               instrumentation=None):
+    """Receives a list of data, a product, a product subtype, and a location to create a compressed Parquet file
+    that keeps the column types. Requires pyarrow
+
+    Args:
+        data (list): A list of FSF object
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+        output_dir (str): The output directory to save the generated file
+        compression (str): The Parquet compression codec
+        instrumentation (Instrumentation/None): Times the formatting and the writing of the file
+    """
+
+    require_pyarrow()
+    logging.info("Generating Parquet file")
+
+    path = output_path(product, product_subtype, location_type, output_dir, FILE_EXTENSIONS['parquet'])
+
+    with timed(instrumentation, 'format'):
+        df = typed_frame(format_data(data, product, product_subtype, location_type, drop_valid=False), product,
+                         product_subtype, location_type)
+
+    with timed(instrumentation, 'write'):
+        df.to_parquet(path, engine='pyarrow', compression=compression, index=False)
+    logging.info("Parquet generated to '{}'.".format(path))
+
+
+def to_arrow(data, product, product_subtype, location_type=None, output_dir=None, compression='zstd',
+             instrumentation=None):
+    """Receives a list of data, a product, a product subtype, and a location to create a compressed Arrow IPC
+    (Feather V2) file that keeps the column types. Requires pyarrow
+
+    Args:
+        data (list): A list of FSF object
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+        output_dir (str): The output directory to save the generated file
+        compression (str): The Arrow IPC compression codec
+        instrumentation (Instrumentation/None): Times the formatting and the writing of the file
+    """
+
+    require_pyarrow()
+    logging.info("Generating Arrow file")
+
+    path = output_path(product, product_subtype, location_type, output_dir, FILE_EXTENSIONS['arrow'])
+
+    with timed(instrumentation, 'format'):
+        df = typed_frame(format_data(data, product, product_subtype, location_type, drop_valid=False), product,
+                         product_subtype, location_type)
+
+    with timed(instrumentation, 'write'):
+        df.to_feather(path, compression=compression)
+    logging.info("Arrow generated to '{}'.".format(path))
+
+
+class CsvWriter:
+    """A streaming CSV sink that appends chunks of data to one file with a single header, so the memory used scales
+        with the chunk size instead of the job size. Each chunk is formatted with the formatter of its product. The
+        valid_id and error columns are always written, as a later chunk may hold invalid search items.
+
+        Attributes:
+            output_dir (str): The output directory to save the generated csv
+            path (Path/None): The csv file, named after the product of the first chunk
+            rows (int): The number of rows written
+        Methods:
+            write: Formats a chunk of data and appends it to the csv
+            merge: Appends the rows of another csv
+            close: Closes the csv
+        Example:
+        ```python
+            with CsvWriter("output_data") as writer:
+                for chunk in chunked(cursor_of_fsids, 10000):
+                    fs.probability.get_depth(chunk, csv=writer)
+        ```
+        """
+
+    def __init__(self, output_dir=None):
+        self.output_dir = output_dir
+        self.path = None
+        self.rows = 0
+
+        self._columns = None
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, data, product, product_subtype, location_type=None, instrumentation=None):
+        """Formats a chunk of data and appends it to the csv, writing the header with the first chunk
+
+        Args:
+            data (list): A list of FSF object
+            product (str): The overall product to call
+            product_subtype (str): The product subtype (if suitable)
+            location_type (str): The location lookup type (if suitable)
+            instrumentation (Instrumentation/None): Times the formatting and the writing of the chunk
+        """
+
+        if not data:
+            return
+
+        with timed(instrumentation, 'format'):
+            df = format_data(data, product, product_subtype, location_type, drop_valid=False)
+            df = df.fillna(pd.NA).astype(str)
+
+        if self._file is None:
+            self._open(output_path(product, product_subtype, location_type, self.output_dir, FILE_EXTENSIONS['csv']))
+
+        with timed(instrumentation, 'write'):
+            self._append(df)
+
+    def merge(self, path, chunk_size=100000):
+        """Appends the rows of a csv written by another CsvWriter, such as the csv of a worker process. The first
+        merged csv gives the name and header of the csv
+
+        Args:
+            path (str): The csv to append
+            chunk_size (int): The number of rows read at once
+        """
+
+        for df in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_size):
+            if self._file is None:
+                output_dir = self.output_dir or pathlib.Path(os.getcwd()) / "output_data"
+                os.makedirs(output_dir, exist_ok=True)
+                self._open(pathlib.Path(output_dir) / pathlib.Path(path).name)
+
+            self._append(df)
+
+    def _open(self, path):
+        self.path = path
+        self._file = open(self.path, "w", newline="")
+
+    def _append(self, df):
+        """Appends the formatted rows to the csv, writing the header with the first chunk"""
+
+        if self._columns is None:
+            self._columns = list(df.columns)
+            header = True
+
+        else:
+            dropped = [column for column in df.columns if column not in self._columns]
+            if dropped:
+                logging.warning("Columns not in the csv header were dropped: {}".format(dropped))
+
+            df = df.reindex(columns=self._columns).fillna(pd.NA).astype(str)
+            header = False
+
+        df.to_csv(self._file, header=header, index=False)
+        self._file.flush()
+
+        self.rows += len(df)
+        logging.info("{} rows appended to '{}'.".format(len(df), self.path))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def require_pyarrow():
+    """Raises an ImportError with the install instructions if pyarrow is missing"""
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet and Arrow output require pyarrow. Install it with "
+                          "'pip install fsf-api-access_python[columnar]' or 'pip install pyarrow'")
+
+
+def output_path(product, product_subtype, location_type=None, output_dir=None, extension='.csv'):
+    """Creates the output directory if needed and returns the path of a new output file
+
+    Args:
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+        output_dir (str): The output directory to save the generated file
+        extension (str): The extension of the file
+    Returns:
+        The path of the file, named after the current date, time, and product
+    """
+
     date = datetime.datetime.today().strftime('%Y_%m_%d_%H_%M_%S')
 
     # Set file name to the current date, time, and product
     if location_type:
-        file_name = "_".join([date, product, product_subtype, location_type]) + ".csv"
+        file_name = "_".join([date, product, product_subtype, location_type]) + extension
     else:
-        file_name = "_".join([date, product, product_subtype]) + ".csv"
+        file_name = "_".join([date, product, product_subtype]) + extension
 
     if not output_dir:
         output_dir = pathlib.Path(os.getcwd()) / "output_data"
@@ -40,63 +363,126 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    # Format the data for each product
+    return output_dir / file_name
+
+
+def typed_frame(df, product, product_subtype, location_type=None):
+    """Casts the columns of a formatted DataFrame to the dtypes declared for the product in COLUMN_TYPES. The valid_id
+    column is boolean and the others are text. Categorical columns are categories of text
+
+    Args:
+        df (DataFrame): A DataFrame made by format_data
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+    Returns:
+        A pandas DataFrame with typed columns
+    """
+
+    types = COLUMN_TYPES[formatter(product, product_subtype, location_type).__name__[len("format_"):]]
+    df = df.reset_index(drop=True)
+
+    for column in df.columns:
+        dtype = BOOL if column == 'valid_id' else types.get(column, TEXT)
+        series = df[column]
+
+        # Lists, dicts and geometries are kept as their text
+        if series.dtype == object:
+            series = series.map(lambda v: v if v is None or isinstance(v, (str, bool, int, float)) else str(v))
+        series = series.mask(series.isna() | series.isin(NA_STRINGS))
+
+        if dtype == BOOL:
+            df[column] = series.map({True: True, False: False, 'True': True, 'False': False}).astype(BOOL)
+
+        elif dtype in (INT, FLOAT):
+            numeric = pd.to_numeric(series, errors='coerce')
+
+            lost = numeric.isna() & series.notna()
+            if lost.any():
+                logging.warning("{} values of the {} column are not numbers and are written as missing. "
+                                "Example: '{}'".format(lost.sum(), column, series[lost].iloc[0]))
+
+            df[column] = numeric.astype(dtype)
+
+        elif dtype == CATEGORY:
+            df[column] = series.astype(TEXT).astype(CATEGORY)
+
+        else:
+            df[column] = series.astype(TEXT)
+
+    return df
+
+
+def formatter(product, product_subtype, location_type=None):
+    """Returns the formatter of a product
+
+    Args:
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+    Returns:
+        The format_ function of the product
+    Raises:
+        NotImplementedError: The product has no formatter
+    """
+
+    # The formatter of each product
     if product == 'adaptation':
 
         if product_subtype == 'detail':
-            df = format_adaptation_detail(data)
+            return format_adaptation_detail
 
         elif product_subtype == 'summary':
-            df = format_adaptation_summary(data)
+            return format_adaptation_summary
 
         elif product_subtype == 'summary_detail':
-            df = format_adaptation_summary_detail(data)
+            return format_adaptation_summary_detail
 
         else:
             raise NotImplementedError
 
     elif product == 'probability':
         if product_subtype == 'chance':
-            df = format_probability_chance(data)
+            return format_probability_chance
 
         elif product_subtype == 'count':
-            df = format_probability_count(data)
+            return format_probability_count
 
         elif product_subtype == 'count-summary':
-            df = format_probability_count_summary(data)
+            return format_probability_count_summary
 
         elif product_subtype == 'cumulative':
-            df = format_probability_cumulative(data)
+            return format_probability_cumulative
 
         elif product_subtype == 'depth':
-            df = format_probability_depth(data)
+            return format_probability_depth
         else:
             raise NotImplementedError
 
     elif product == 'environmental':
         if product_subtype == 'precipitation':
-            df = format_environmental_precipitation(data)
+            return format_environmental_precipitation
 
         else:
             raise NotImplementedError
 
     elif product == 'historic':
         if product_subtype == 'event':
-            df = format_historic_event(data)
+            return format_historic_event
 
         elif product_subtype == 'summary':
             if location_type == 'property':
-                df = format_historic_summary_property(data)
+                return format_historic_summary_property
 
             else:
-                df = format_historic_summary(data)
+                return format_historic_summary
 
         elif product_subtype == 'summary_event':
             if location_type == 'property':
-                df = format_historic_summary_event_property(data)
+                return format_historic_summary_event_property
 
             else:
-                df = format_historic_summary_event(data)
+                return format_historic_summary_event
 
         else:
             raise NotImplementedError
@@ -104,28 +490,28 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
     elif product == 'location':
         if product_subtype == 'detail':
             if location_type == 'property':
-                df = format_location_detail_property(data)
+                return format_location_detail_property
 
             elif location_type == 'neighborhood':
-                df = format_location_detail_neighborhood(data)
+                return format_location_detail_neighborhood
 
             elif location_type == 'city':
-                df = format_location_detail_city(data)
+                return format_location_detail_city
 
             elif location_type == 'zcta':
-                df = format_location_detail_zcta(data)
+                return format_location_detail_zcta
 
             elif location_type == 'tract':
-                df = format_location_detail_tract(data)
+                return format_location_detail_tract
 
             elif location_type == 'county':
-                df = format_location_detail_county(data)
+                return format_location_detail_county
 
             elif location_type == 'cd':
-                df = format_location_detail_cd(data)
+                return format_location_detail_cd
 
             elif location_type == 'state':
-                df = format_location_detail_state(data)
+                return format_location_detail_state
 
             else:
                 raise NotImplementedError
@@ -133,17 +519,17 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
         elif product_subtype == 'summary':
 
             if location_type == 'property':
-                df = format_location_summary_property(data)
+                return format_location_summary_property
 
             else:
-                df = format_location_summary(data)
+                return format_location_summary
 
         else:
             raise NotImplementedError
 
     elif product == 'fema':
         if product_subtype == 'nfip':
-            df = format_fema_nfip(data)
+            return format_fema_nfip
         else:
             raise NotImplementedError
 
@@ -152,10 +538,10 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
         if product_subtype == 'summary':
 
             if location_type == 'property':
-                df = format_aal_summary_property(data)
+                return format_aal_summary_property
 
             else:
-                df = format_aal_summary(data)
+                return format_aal_summary
 
         else:
             raise NotImplementedError
@@ -164,11 +550,11 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
 
         if product_subtype == 'avm':
 
-            df = format_avm(data)
+            return format_avm
 
         elif product_subtype == "provider":
 
-            df = format_avm_provider(data)
+            return format_avm_provider
 
         else:
             raise NotImplementedError
@@ -177,7 +563,7 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
 
         if product_subtype == 'nfip':
 
-            df = format_economic_nfip_premium(data)
+            return format_economic_nfip_premium
 
         else:
             raise NotImplementedError
@@ -185,23 +571,39 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
     else:
         raise NotImplementedError
 
-    # Export CSVs
-    if df['valid_id'].all():
+
+def format_data(data, product, product_subtype, location_type=None, drop_valid=True):
+    """Formats a list of data into a DataFrame with the formatter of the product
+
+    Args:
+        data (list): A list of FSF object
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+        drop_valid (bool): To drop the valid_id and error columns when every search item is valid
+    Returns:
+        A pandas formatted DataFrame
+    """
+
+    df = formatter(product, product_subtype, location_type)(data)
+
+    # Drop the valid_id and error columns when every search item is valid
+    if drop_valid and df['valid_id'].all():
         df = df.drop(columns=['valid_id'])
     else:
         df['valid_id'] = df['valid_id'].fillna(True)
 
-    # Export CSVs
-    if 'error' in df and df['error'].isnull().all():
+    if drop_valid and 'error' in df and df['error'].isnull().all():
         df = df.drop(columns=['error'])
 
-    df = df.fillna(pd.NA).astype(str)
-    df.to_csv(output_dir / file_name, index=False)
-    logging.info("CSV generated to '{}'.".format(output_dir / file_name))
+    return df
 
 
 def get_geom_center(geom):
 
+    # Not imported with the module, as the geometry formatters are the only ones to need shapely
+    import shapely.geometry
+
     if hasattr(geom, "center"):
         if isinstance(geom.center, shapely.geometry.MultiPolygon) and not geom.center.is_empty:
             return {"latitude": geom.center.centroid.y, "longitude": geom.center.centroid.x}
@@ -226,7 +628,7 @@ def format_adaptation_detail(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('type').explode('scenario').reset_index(drop=True)
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('type').explode('scenario').reset_index(drop=True)
     df['adaptationId'] = df['adaptationId'].apply(str)
     df['returnPeriod'] = df['returnPeriod'].astype('Int64').apply(str)
     df['geometry'] = df['geometry'].apply(get_geom_center)
@@ -265,7 +667,7 @@ def format_adaptation_summary(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('adaptation').reset_index(drop=True)
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('adaptation').reset_index(drop=True)
     df['fsid'] = df['fsid'].apply(str)
     df['adaptation'] = df['adaptation'].astype('Int64').apply(str)
 
@@ -292,53 +694,36 @@ def format_adaptation_summary_detail(data):
         .rename(columns={"error_x": "error"}).drop('error_y', axis=1)
 
 
-def format_probability_chance(data):
-    """Reformat the list of data to Probability Chance format
+def flatten_probability(data, attribute, key, bins=False):
+    """Flattens the yearly probability records of every FSF object into column buffers in a single pass, then builds
+    one DataFrame. An object without records gets a single row of missing values
 
     Args:
         data (list): A list of FSF object
+        attribute (str): The attribute holding the yearly records, such as depth or chance
+        key (str): The field identifying each record, such as returnPeriod or threshold
+        bins (bool): If the records of each key are split into bins, as for Probability Count
     Returns:
-        A pandas formatted DataFrame
+        A pandas DataFrame with the fsid, valid_id, year, key, bin (if suitable), low, mid, high and error columns
     """
 
-    depth_list = list()
+    items = ((str(d.fsid), d.valid_id, d.error, getattr(d, attribute)) for d in data)
 
-    # Loop through data
-    for d in data:
-
-        try:
-            # Normalize data to get df
-            row_df = pd.json_normalize(d.chance, record_path='data', meta=['year'])
+    return pd.DataFrame(probability_columns(items, key, bins))
 
-            # Add FSID to row
-            row_df['fsid'] = d.fsid
-            row_df['valid_id'] = d.valid_id
-            row_df['error'] = d.error
 
-            # Add rows to df - return periods matched to depths across scenarios
-            depth_list.append(row_df)
+def format_probability_chance(data):
+    """Reformat the list of data to Probability Chance format
 
-        except TypeError:
-            row_df = pd.DataFrame([[str(d.fsid), d.valid_id, d.error]], columns=['fsid', 'valid_id', 'error'])
-            row_df['year'] = pd.NA
-            row_df['threshold'] = pd.NA
-            row_df['data.low'] = pd.NA
-            row_df['data.mid'] = pd.NA
-            row_df['data.high'] = pd.NA
-            depth_list.append(row_df)
+    Args:
+        data (list): A list of FSF object
+    Returns:
+        A pandas formatted DataFrame
+    """
 
-    # Get into df
-    df = pd.concat(depth_list, axis=0).reset_index(drop=True)
-    df.rename(columns={'data.low': 'low', 'data.mid': 'mid', 'data.high': 'high'}, inplace=True)
-    df['fsid'] = df['fsid'].apply(str)
+    df = flatten_probability(data, 'chance', 'threshold')
     df['year'] = df['year'].astype('Int64').apply(str)
     df['threshold'] = df['threshold'].astype('Int64').apply(str)
-    if df['low'] is None:
-        df['low'] = df['low'].round(3)
-    if df['mid'] is None:
-        df['mid'] = df['mid'].round(3)
-    if df['high'] is None:
-        df['high'] = df['high'].round(3)
 
     return df[['fsid', 'valid_id', 'year', 'threshold', 'low', 'mid', 'high', 'error']]
 
@@ -352,38 +737,7 @@ def format_probability_count(data):
         A pandas formatted DataFrame
     """
 
-    depth_list = list()
-
-    # Loop through data
-    for d in data:
-
-        try:
-            # Normalize data to get df
-            row_df = pd.json_normalize(d.count, record_path=['data', 'data'], meta=['year', ['data', 'returnPeriod']])
-
-            # Add FSID to row
-            row_df['fsid'] = d.fsid
-            row_df['valid_id'] = d.valid_id
-            row_df['error'] = d.error
-
-            # Add rows to df - return periods matched to depths across scenarios
-            depth_list.append(row_df)
-
-        except TypeError:
-            row_df = pd.DataFrame([[str(d.fsid), d.valid_id, d.error]], columns=['fsid', 'valid_id', 'error'])
-            row_df['year'] = pd.NA
-            row_df['data.returnPeriod'] = pd.NA
-            row_df['bin'] = pd.NA
-            row_df['count.low'] = pd.NA
-            row_df['count.mid'] = pd.NA
-            row_df['count.high'] = pd.NA
-            depth_list.append(row_df)
-
-    # Get into df
-    df = pd.concat(depth_list, axis=0).reset_index(drop=True)
-    df.rename(columns={'count.low': 'low', 'count.mid': 'mid', 'count.high': 'high',
-                       'data.returnPeriod': 'returnPeriod'}, inplace=True)
-    df['fsid'] = df['fsid'].apply(str)
+    df = flatten_probability(data, 'count', 'returnPeriod', bins=True)
     df['year'] = df['year'].astype('Int64').apply(str)
     df['returnPeriod'] = df['returnPeriod'].astype('Int64').apply(str)
     df['bin'] = df['bin'].astype('Int64').apply(str)
@@ -470,44 +824,9 @@ def format_probability_cumulative(data):
         A pandas formatted DataFrame
     """
 
-    depth_list = list()
-
-    # Loop through data
-    for d in data:
-
-        try:
-            # Normalize data to get df
-            row_df = pd.json_normalize(d.cumulative, record_path='data', meta='year')
-
-            # Add FSID to row
-            row_df['fsid'] = d.fsid
-            row_df['valid_id'] = d.valid_id
-            row_df['error'] = d.error
-
-            # Add rows to df - return periods matched to depths across scenarios
-            depth_list.append(row_df)
-
-        except TypeError:
-            row_df = pd.DataFrame([[str(d.fsid), d.valid_id, d.error]], columns=['fsid', 'valid_id', 'error'])
-            row_df['year'] = pd.NA
-            row_df['threshold'] = pd.NA
-            row_df['data.low'] = pd.NA
-            row_df['data.mid'] = pd.NA
-            row_df['data.high'] = pd.NA
-            depth_list.append(row_df)
-
-    # Get into df
-    df = pd.concat(depth_list, axis=0).reset_index(drop=True)
-    df.rename(columns={'data.low': 'low', 'data.mid': 'mid', 'data.high': 'high'}, inplace=True)
-    df['fsid'] = df['fsid'].apply(str)
+    df = flatten_probability(data, 'cumulative', 'threshold')
     df['year'] = df['year'].astype('Int64').apply(str)
     df['threshold'] = df['threshold'].astype('Int64').apply(str)
-    if df['low'] is None:
-        df['low'] = df['low'].round(3)
-    if df['mid'] is None:
-        df['mid'] = df['mid'].round(3)
-    if df['high'] is None:
-        df['high'] = df['high'].round(3)
 
     return df[['fsid', 'valid_id', 'year', 'threshold', 'low', 'mid', 'high', 'error']]
 
@@ -521,36 +840,7 @@ def format_probability_depth(data):
         A pandas formatted DataFrame
     """
 
-    depth_list = list()
-
-    # Loop through data
-    for d in data:
-
-        try:
-            # Normalize data to get df
-            row_df = pd.json_normalize(d.depth, record_path='data', meta=['year'])
-
-            # Add FSID to row
-            row_df['fsid'] = d.fsid
-            row_df['valid_id'] = d.valid_id
-            row_df['error'] = d.error
-
-            # Add rows to df - return periods matched to depths across scenarios
-            depth_list.append(row_df)
-
-        except TypeError:
-            row_df = pd.DataFrame([[str(d.fsid), d.valid_id, d.error]], columns=['fsid', 'valid_id', 'error'])
-            row_df['year'] = pd.NA
-            row_df['returnPeriod'] = pd.NA
-            row_df['data.low'] = pd.NA
-            row_df['data.mid'] = pd.NA
-            row_df['data.high'] = pd.NA
-            depth_list.append(row_df)
-
-    # Get into df
-    df = pd.concat(depth_list, axis=0).reset_index(drop=True)
-    df.rename(columns={'data.low': 'low', 'data.mid': 'mid', 'data.high': 'high'}, inplace=True)
-    df['fsid'] = df['fsid'].apply(str)
+    df = flatten_probability(data, 'depth', 'returnPeriod')
     df['year'] = df['year'].astype('Int64').apply(str)
     df['returnPeriod'] = df['returnPeriod'].astype('Int64').apply(str)
     df['low'] = df['low'].astype('Int64').apply(str)
@@ -569,7 +859,7 @@ def format_environmental_precipitation(data):
         A pandas formatted DataFrame
     """
     #
-    df = pd.DataFrame([vars(o) for o in data]).explode('projected').reset_index(drop=True)
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('projected').reset_index(drop=True)
     if not df['projected'].isna().values.all():
         df = pd.concat([df.drop(['projected'], axis=1), df['projected'].apply(pd.Series)], axis=1)
         df = pd.concat([df.drop(['data'], axis=1), df['data'].apply(pd.Series)], axis=1)
@@ -598,7 +888,7 @@ def format_historic_event(data):
         A pandas formatted DataFrame
     """
 
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     if not df['properties'].isna().values.all():
         df = pd.concat([df.drop(['properties'], axis=1), df['properties'].apply(pd.Series)], axis=1)
         df.rename(columns={'total': 'propertiesTotal', 'affected': 'propertiesAffected'}, inplace=True)
@@ -628,7 +918,7 @@ def format_historic_summary_property(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('historic').reset_index(drop=True)
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('historic').reset_index(drop=True)
     if not df['historic'].isna().values.all():
         df = pd.concat([df.drop(['historic'], axis=1), df['historic'].apply(pd.Series)], axis=1)
     else:
@@ -653,7 +943,7 @@ def format_historic_summary(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('historic').reset_index(drop=True)
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('historic').reset_index(drop=True)
     if not df['historic'].isna().values.all():
         df = pd.concat([df.drop(['historic'], axis=1), df['historic'].apply(pd.Series)], axis=1)
         df = df.explode('data').reset_index(drop=True)
@@ -717,7 +1007,7 @@ def format_location_detail_property(data):
         A pandas formatted DataFrame
     """
 
-    df = pd.DataFrame([vars(o) for o in data]).explode('neighborhood').reset_index(drop=True)
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('neighborhood').reset_index(drop=True)
     df.rename(columns={'fsid': 'fsid_placeholder'}, inplace=True)
 
     if not df['city'].isna().values.all():
@@ -810,7 +1100,7 @@ def format_location_detail_neighborhood(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('city').explode('county').reset_index(drop=True)
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('city').explode('county').reset_index(drop=True)
     df.rename(columns={'fsid': 'fsid_placeholder', 'name': 'name_placeholder'}, inplace=True)
 
     if not df['city'].isna().values.all():
@@ -856,7 +1146,7 @@ def format_location_detail_city(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('zcta').explode('county') \
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('zcta').explode('county') \
         .explode('neighborhood').reset_index(drop=True)
     df.rename(columns={'fsid': 'fsid_placeholder', 'name': 'name_placeholder'}, inplace=True)
 
@@ -912,7 +1202,7 @@ def format_location_detail_zcta(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('city').explode('county')
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('city').explode('county')
     df.rename(columns={'fsid': 'fsid_placeholder', 'name': 'name_placeholder'}, inplace=True)
 
     if not df['city'].isna().values.all():
@@ -958,7 +1248,7 @@ def format_location_detail_tract(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     df.rename(columns={'fsid': 'fsid_placeholder'}, inplace=True)
 
     if not df['county'].isna().values.all():
@@ -995,7 +1285,7 @@ def format_location_detail_county(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('city').explode('zcta') \
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('city').explode('zcta') \
         .explode('cd').reset_index(drop=True)
     df.rename(columns={'fsid': 'fsid_placeholder', 'name': 'name_placeholder'}, inplace=True)
 
@@ -1051,7 +1341,7 @@ def format_location_detail_cd(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('county')
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('county')
     df.rename(columns={'fsid': 'fsid_placeholder'}, inplace=True)
 
     if not df['county'].isna().values.all():
@@ -1088,7 +1378,7 @@ def format_location_detail_state(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     df['fsid'] = df['fsid'].apply(str)
     df['geometry'] = df['geometry'].apply(get_geom_center)
     df = pd.concat([df.drop(['geometry'], axis=1), df['geometry'].apply(pd.Series)], axis=1)
@@ -1103,7 +1393,7 @@ def format_location_summary_property(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     df['fsid'] = df['fsid'].apply(str)
     df['riskDirection'] = df['riskDirection'].astype('Int64').apply(str)
     df['environmentalRisk'] = df['environmentalRisk'].astype('Int64').apply(str)
@@ -1122,7 +1412,7 @@ def format_location_summary(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
 
     if not df['properties'].isna().values.all():
         df = pd.concat([df.drop(['properties'], axis=1), df['properties'].apply(pd.Series)], axis=1)
@@ -1151,7 +1441,7 @@ def format_fema_nfip(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     df['fsid'] = df['fsid'].apply(str)
     df['claimCount'] = df['claimCount'].astype('Int64').apply(str)
     df['policyCount'] = df['policyCount'].astype('Int64').apply(str)
@@ -1172,7 +1462,7 @@ def format_aal_summary_property(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('annual_loss')
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('annual_loss')
     df = df.explode('depth_loss')
 
     if not df[['annual_loss', 'depth_loss']].isna().values.all():
@@ -1219,7 +1509,7 @@ def format_aal_summary(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('annual_loss')
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('annual_loss')
 
     if not df[['annual_loss']].isna().values.all():
         df = pd.concat([df.drop(['annual_loss'], axis=1), df['annual_loss'].apply(pd.Series)], axis=1)
@@ -1263,7 +1553,7 @@ def format_avm(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data])
+    df = pd.json_normalize([o.to_dict() for o in data])
 
     if 'avm.mid' in df:
         df.rename(columns={'avm.mid': 'avm_mid'}, inplace=True)
@@ -1288,7 +1578,7 @@ def format_avm_provider(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data])
+    df = pd.json_normalize([o.to_dict() for o in data])
 
     df['provider_id'] = df['provider_id'].astype('Int64').apply(str)
 
@@ -1303,7 +1593,7 @@ def format_economic_nfip_premium(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode("data")
+    df = pd.json_normalize([o.to_dict() for o in data]).explode("data")
 
     if not df[['data']].isna().values.all():
         df = pd.concat([df.drop(['data'], axis=1), df['data'].apply(pd.Series)], axis=1)
@@ -5,10 +5,10 @@
 import logging
 
 # Internal Imports
-from firststreet.api import csv_format
-from firststreet.api.api import Api
+from firststreet.api.api import Api, dual_mode
 from firststreet.errors import InvalidArgument
 from firststreet.models.economic import AVMProperty, AVMProvider, AALSummaryProperty, AALSummaryOther, NFIPPremium
+from firststreet.models.frame import ProductFrame
 
 
 class AAL(Api):
@@ -18,25 +18,32 @@ class AAL(Api):
             get_summary: Retrieves a list of AAL Summary for the given list of IDs
         """
 
-    def get_summary(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_summary(self, search_items, location_type, csv=False, output_dir=None,
+                          extra_param=None, as_frame=False):
         """Retrieves AAL summary product data from the First Street Foundation API given a list of search_items and
         returns a list of AAL Summary objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
             location_type (str): The location lookup type
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of AAL Summary
+            A list of AAL Summary, or a ProductFrame if as_frame is set
         Raises:
             InvalidArgument: The location provided is empty
             TypeError: The location provided is not a string
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         if not location_type:
             raise InvalidArgument(location_type)
         elif not isinstance(location_type, str):
@@ -46,19 +53,26 @@ class AAL(Api):
         if extra_param and "depths" in extra_param:
             extra_param["depths"] = ','.join(map(str, extra_param["depths"]))
 
-        api_datas = self.call_api(search_items, "economic/aal", "summary", location_type, extra_param=extra_param)
+        api_datas = await self.call_api_async(search_items, "economic/aal", "summary", location_type,
+                                              extra_param=extra_param)
+
+        if as_frame:
+            responses = [dict(api_data, fsid=fsid) for api_data, fsid in api_datas]
+            return ProductFrame.from_responses(responses, "economic/aal", "summary", location_type)
 
         product = []
-        for api_data, fsid in api_datas:
-            api_data["fsid"] = fsid
+        with self._http.instrumentation.time('model'):
+            for api_data, fsid in api_datas:
+                api_data["fsid"] = fsid
 
-            if location_type == "property":
-                product.append(AALSummaryProperty(api_data))
-            else:
-                product.append(AALSummaryOther(api_data))
+                if location_type == "property":
+                    product.append(AALSummaryProperty(api_data))
+                else:
+                    product.append(AALSummaryOther(api_data))
 
         if csv:
-            csv_format.to_csv(product, "economic_aal", "summary", location_type, output_dir=output_dir)
+            self._to_file(product, "economic_aal", "summary", location_type,
+                          output_dir=output_dir, file_format=csv)
 
         logging.info("AAL Summary Data Ready.")
 
@@ -73,53 +87,73 @@ class AVM(Api):
             get_provider: Retrieves a list of AVM providers for the given list of IDs
         """
 
-    def get_avm(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_avm(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves AVM product data from the First Street Foundation API given a list of search_items and
         returns a list of AVM objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of AVM
+            A list of AVM, or a ProductFrame if as_frame is set
         """
+
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "economic", "avm", "property", extra_param=extra_param)
+        api_datas = await self.call_api_async(search_items, "economic", "avm", "property", extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "economic", "avm", "property")
 
-        product = [AVMProperty(api_data) for api_data in api_datas]
+        product = self._build_models(AVMProperty, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "economic_avm", "avm", "property", output_dir=output_dir)
+            self._to_file(product, "economic_avm", "avm", "property", output_dir=output_dir, file_format=csv)
 
         logging.info("AVM Data Ready.")
 
         return product
 
-    def get_provider(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_provider(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves AVM provider product data from the First Street Foundation API given a list of search_items and
         returns a list of AVM provider objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of AVM Provider
+            A list of AVM Provider, or a ProductFrame if as_frame is set
         """
+
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "economic/avm", "provider", extra_param=extra_param)
+        api_datas = await self.call_api_async(search_items, "economic/avm", "provider", extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "economic/avm", "provider")
 
-        product = [AVMProvider(api_data) for api_data in api_datas]
+        product = self._build_models(AVMProvider, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "economic_avm", "provider", output_dir=output_dir)
+            self._to_file(product, "economic_avm", "provider", output_dir=output_dir, file_format=csv)
 
         logging.info("AVM Provider Data Ready.")
 
@@ -133,27 +167,37 @@ class Economic(Api):
             get_property_nfip: Retrieves a list of property nfip premiums for the given list of IDs
         """
 
-    def get_property_nfip(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_property_nfip(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves AVM product data from the First Street Foundation API given a list of search_items and
         returns a list of AVM objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of property NFIP premiums
+            A list of property NFIP premiums, or a ProductFrame if as_frame is set
         """
+
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "economic", "nfip", "property", extra_param=extra_param)
+        api_datas = await self.call_api_async(search_items, "economic", "nfip", "property", extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "economic", "nfip", "property")
 
-        product = [NFIPPremium(api_data) for api_data in api_datas]
+        product = self._build_models(NFIPPremium, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "economic", "nfip", "property", output_dir=output_dir)
+            self._to_file(product, "economic", "nfip", "property", output_dir=output_dir, file_format=csv)
 
         logging.info("NFIP Premium Data Ready.")
 
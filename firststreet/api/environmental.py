@@ -5,9 +5,10 @@
 import logging
 
 # Internal Imports
-from firststreet.api import csv_format
-from firststreet.api.api import Api
+from firststreet.api.api import Api, dual_mode
+from firststreet.errors import InvalidArgument
 from firststreet.models.environmental import EnvironmentalPrecipitation
+from firststreet.models.frame import ProductFrame
 
 
 class Environmental(Api):
@@ -17,27 +18,39 @@ class Environmental(Api):
             get_precipitation: Retrieves a list of Environmental Precipitation for the given list of IDs
         """
 
-    def get_precipitation(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_precipitation(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves environmental precipitation product data from the First Street Foundation API given a list of
         search_items and returns a list of Environmental Precipitation objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Adaptation Detail
+            A list of Adaptation Detail, or a ProductFrame if as_frame is set
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "environmental", "precipitation", "county", extra_param=extra_param)
-        product = [EnvironmentalPrecipitation(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "environmental", "precipitation", "county",
+                                              extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "environmental", "precipitation", "county")
+
+        product = self._build_models(EnvironmentalPrecipitation, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "environmental", "precipitation", "county", output_dir=output_dir)
+            self._to_file(product, "environmental", "precipitation", "county",
+                          output_dir=output_dir, file_format=csv)
 
         logging.info("Environmental Precipitation Data Ready.")
 
@@ -5,10 +5,10 @@
 import logging
 
 # Internal Imports
-from firststreet.api import csv_format
-from firststreet.api.api import Api
+from firststreet.api.api import Api, dual_mode
 from firststreet.errors import InvalidArgument
 from firststreet.models.fema import FemaNfip
+from firststreet.models.frame import ProductFrame
 
 
 class Fema(Api):
@@ -18,36 +18,46 @@ class Fema(Api):
             get_nfip: Retrieves a list of Fema Nfip for the given list of IDs
         """
 
-    def get_nfip(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_nfip(self, search_items, location_type, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves fema nfip product data from the First Street Foundation API given a list of search_items and
         returns a list of Fema Nfip objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
             location_type (str): The location lookup type
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Fema Nfip
+            A list of Fema Nfip, or a ProductFrame if as_frame is set
         Raises:
             InvalidArgument: The location provided is empty
             TypeError: The location provided is not a string
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         if not location_type:
             raise InvalidArgument(location_type)
         elif not isinstance(location_type, str):
             raise TypeError("location is not a string")
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "fema", "nfip", location_type, extra_param=extra_param)
-        product = [FemaNfip(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "fema", "nfip", location_type, extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "fema", "nfip", location_type)
+
+        product = self._build_models(FemaNfip, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "fema", "nfip", location_type, output_dir=output_dir)
+            self._to_file(product, "fema", "nfip", location_type, output_dir=output_dir, file_format=csv)
 
         logging.info("Fema Nfip Data Ready.")
 
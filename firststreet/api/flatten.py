@@ -0,0 +1,54 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+
+def probability_columns(items, key, bins=False):
+    """Flattens the yearly probability records into column buffers in a single pass. A search item without records
+    gets a single row of missing values
+
+    Args:
+        items (iterable): Tuples of the fsid, valid_id, error and yearly records of each search item
+        key (str): The field identifying each record, such as returnPeriod or threshold
+        bins (bool): If the records of each key are split into bins, as for Probability Count
+    Returns:
+        A dict of the fsid, valid_id, year, key, bin (if suitable), low, mid, high and error column lists
+    """
+
+    value_key = 'count' if bins else 'data'
+    names = ['fsid', 'valid_id', 'year', key] + (['bin'] if bins else []) + ['low', 'mid', 'high', 'error']
+    columns = {name: [] for name in names}
+
+    for fsid, valid_id, error, years in items:
+
+        rows = []
+        try:
+            for year in years:
+                for record in year['data']:
+
+                    if bins:
+                        values = [(record['returnPeriod'], item.get('bin'), item.get(value_key))
+                                  for item in record['data']]
+                    else:
+                        values = [(record.get(key), None, record.get(value_key))]
+
+                    for item_key, item_bin, value in values:
+                        value = value or {}
+                        rows.append((year['year'], item_key, item_bin,
+                                     value.get('low'), value.get('mid'), value.get('high')))
+
+        except TypeError:
+            rows = [(None, None, None, None, None, None)]
+
+        for year, item_key, item_bin, low, mid, high in rows:
+            columns['fsid'].append(fsid)
+            columns['valid_id'].append(valid_id)
+            columns['year'].append(year)
+            columns[key].append(item_key)
+            if bins:
+                columns['bin'].append(item_bin)
+            columns['low'].append(low)
+            columns['mid'].append(mid)
+            columns['high'].append(high)
+            columns['error'].append(error)
+
+    return columns
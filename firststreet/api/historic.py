@@ -5,9 +5,9 @@
 import logging
 
 # Internal Imports
-from firststreet.api import csv_format
-from firststreet.api.api import Api
+from firststreet.api.api import Api, dual_mode
 from firststreet.errors import InvalidArgument
+from firststreet.models.frame import ProductFrame
 from firststreet.models.historic import HistoricEvent, HistoricSummary
 
 
@@ -19,41 +19,53 @@ class Historic(Api):
             get_summary: Retrieves a list of Historic Summary for the given list of IDs
         """
 
-    def get_event(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_event(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves historic event product data from the First Street Foundation API given a list of search_items and
         returns a list of Historic Event objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Historic Event
+            A list of Historic Event, or a ProductFrame if as_frame is set
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "historic", "event", None, extra_param=extra_param)
-        product = [HistoricEvent(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "historic", "event", None, extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "historic", "event")
+
+        product = self._build_models(HistoricEvent, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "historic", "event", output_dir=output_dir)
+            self._to_file(product, "historic", "event", output_dir=output_dir, file_format=csv)
 
         logging.info("Historic Event Data Ready.")
 
         return product
 
-    def get_events_by_location(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_events_by_location(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
         """Retrieves historic summary product data from the First Street Foundation API given a list of location
         search_items and returns a list of Historic Summary objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
             location_type (str): The location lookup type
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
 
@@ -70,57 +82,70 @@ class Historic(Api):
             raise TypeError("location is not a string")
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "historic", "summary", location_type)
-        summary = [HistoricSummary(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "historic", "summary", location_type)
+        summary = self._build_models(HistoricSummary, api_datas)
 
         search_item = list(set([event.get("eventId") for sum_hist in summary if sum_hist.historic for
                                 event in sum_hist.historic]))
 
         if search_item:
-            api_datas_event = self.call_api(search_item, "historic", "event", None, extra_param=extra_param)
+            api_datas_event = await self.call_api_async(search_item, "historic", "event", None, extra_param=extra_param)
 
         else:
             api_datas_event = [{"eventId": None, "valid_id": False}]
 
-        event = [HistoricEvent(api_data) for api_data in api_datas_event]
+        event = self._build_models(HistoricEvent, api_datas_event)
 
         if csv:
-            csv_format.to_csv([summary, event], "historic", "summary_event", location_type, output_dir=output_dir)
+            self._to_file([summary, event], "historic", "summary_event", location_type,
+                          output_dir=output_dir, file_format=csv)
 
         logging.info("Historic Summary Event Data Ready.")
 
         return [summary, event]
 
-    def get_summary(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_summary(self, search_items, location_type, csv=False, output_dir=None,
+                          extra_param=None, as_frame=False):
         """Retrieves historic summary product data from the First Street Foundation API given a list of search_items and
         returns a list of Historic Summary objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
             location_type (str): The location lookup type
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Historic Summary
+            A list of Historic Summary, or a ProductFrame if as_frame is set
         Raises:
             InvalidArgument: The location provided is empty
             TypeError: The location provided is not a string
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         if not location_type:
             raise InvalidArgument(location_type)
         elif not isinstance(location_type, str):
             raise TypeError("location is not a string")
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "historic", "summary", location_type, extra_param=extra_param)
-        product = [HistoricSummary(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "historic", "summary", location_type,
+                                              extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "historic", "summary", location_type)
+
+        product = self._build_models(HistoricSummary, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "historic", "summary", location_type, output_dir=output_dir)
+            self._to_file(product, "historic", "summary", location_type, output_dir=output_dir, file_format=csv)
 
         logging.info("Historic Summary Data Ready.")
 
@@ -5,9 +5,9 @@
 import logging
 
 # Internal Imports
-from firststreet.api import csv_format
-from firststreet.api.api import Api
+from firststreet.api.api import Api, dual_mode
 from firststreet.errors import InvalidArgument
+from firststreet.models.frame import ProductFrame
 from firststreet.models.location import LocationDetailProperty, LocationDetailNeighborhood, LocationDetailCity, \
     LocationDetailZcta, LocationDetailTract, LocationDetailCounty, LocationDetailCd, \
     LocationDetailState, LocationSummaryProperty, LocationSummaryOther
@@ -21,102 +21,124 @@ class Location(Api):
             get_summary: Retrieves a list of Location Summary for the given list of IDs
         """
 
-    def get_detail(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_detail(self, search_items, location_type, csv=False, output_dir=None,
+                         extra_param=None, as_frame=False):
         """Retrieves location detail product data from the First Street Foundation API given a list of search_items and
         returns a list of Location Detail objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
             location_type (str): The location lookup type
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Location Detail
+            A list of Location Detail, or a ProductFrame if as_frame is set
         Raises:
             InvalidArgument: The location provided is empty
             TypeError: The location provided is not a string
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         if not location_type:
             raise InvalidArgument("No location type provided: {}".format(location_type))
         elif not isinstance(location_type, str):
             raise TypeError("location is not a string")
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "location", "detail", location_type, extra_param=extra_param)
+        api_datas = await self.call_api_async(search_items, "location", "detail", location_type,
+                                              extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "location", "detail", location_type)
 
         if location_type == 'property':
-            product = [LocationDetailProperty(api_data) for api_data in api_datas]
+            product = self._build_models(LocationDetailProperty, api_datas)
 
         elif location_type == 'neighborhood':
-            product = [LocationDetailNeighborhood(api_data) for api_data in api_datas]
+            product = self._build_models(LocationDetailNeighborhood, api_datas)
 
         elif location_type == 'city':
-            product = [LocationDetailCity(api_data) for api_data in api_datas]
+            product = self._build_models(LocationDetailCity, api_datas)
 
         elif location_type == 'zcta':
-            product = [LocationDetailZcta(api_data) for api_data in api_datas]
+            product = self._build_models(LocationDetailZcta, api_datas)
 
         elif location_type == 'tract':
-            product = [LocationDetailTract(api_data) for api_data in api_datas]
+            product = self._build_models(LocationDetailTract, api_datas)
 
         elif location_type == 'county':
-            product = [LocationDetailCounty(api_data) for api_data in api_datas]
+            product = self._build_models(LocationDetailCounty, api_datas)
 
         elif location_type == 'cd':
-            product = [LocationDetailCd(api_data) for api_data in api_datas]
+            product = self._build_models(LocationDetailCd, api_datas)
 
         elif location_type == 'state':
-            product = [LocationDetailState(api_data) for api_data in api_datas]
+            product = self._build_models(LocationDetailState, api_datas)
 
         else:
             raise NotImplementedError
 
         if csv:
-            csv_format.to_csv(product, "location", "detail", location_type, output_dir=output_dir)
+            self._to_file(product, "location", "detail", location_type, output_dir=output_dir, file_format=csv)
 
         logging.info("Location Detail Data Ready.")
 
         return product
 
-    def get_summary(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_summary(self, search_items, location_type, csv=False, output_dir=None,
+                          extra_param=None, as_frame=False):
         """Retrieves location summary product data from the First Street Foundation API given a list of search_items and
         returns a list of Location Summary objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
             location_type (str): The location lookup type
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Location Summary
+            A list of Location Summary, or a ProductFrame if as_frame is set
         Raises:
             InvalidArgument: The location provided is empty
             TypeError: The location provided is not a string
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         if not location_type:
             raise InvalidArgument(location_type)
         elif not isinstance(location_type, str):
             raise TypeError("location is not a string")
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "location", "summary", location_type, extra_param=extra_param)
+        api_datas = await self.call_api_async(search_items, "location", "summary", location_type,
+                                              extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "location", "summary", location_type)
 
         if location_type == "property":
-            product = [LocationSummaryProperty(api_data) for api_data in api_datas]
+            product = self._build_models(LocationSummaryProperty, api_datas)
 
         else:
-            product = [LocationSummaryOther(api_data) for api_data in api_datas]
+            product = self._build_models(LocationSummaryOther, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "location", "summary", location_type, output_dir=output_dir)
+            self._to_file(product, "location", "summary", location_type, output_dir=output_dir, file_format=csv)
 
         logging.info("Location Summary Data Ready.")
 
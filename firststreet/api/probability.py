@@ -5,9 +5,9 @@
 import logging
 
 # Internal Imports
-from firststreet.api import csv_format
-from firststreet.api.api import Api
+from firststreet.api.api import Api, dual_mode
 from firststreet.errors import InvalidArgument
+from firststreet.models.frame import ProductFrame
 from firststreet.models.probability import ProbabilityChance, ProbabilityCount, ProbabilityCountSummary, \
     ProbabilityCumulative, ProbabilityDepth
 
@@ -23,140 +23,195 @@ class Probability(Api):
             get_cumulative: Retrieves a list of Probability Depth for the given list of IDs
         """
 
-    def get_chance(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_chance(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves probability chance product data from the First Street Foundation API given a list of search_items
          and returns a list of Probability Chance objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Probability Chance
+            A list of Probability Chance, or a ProductFrame if as_frame is set
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "chance", "property", extra_param=extra_param)
-        product = [ProbabilityChance(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "probability", "chance", "property",
+                                              extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "probability", "chance", "property")
+
+        product = self._build_models(ProbabilityChance, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "probability", "chance", output_dir=output_dir)
+            self._to_file(product, "probability", "chance", output_dir=output_dir, file_format=csv)
 
         logging.info("Probability Chance Data Ready.")
 
         return product
 
-    def get_count(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_count(self, search_items, location_type, csv=False, output_dir=None,
+                        extra_param=None, as_frame=False):
         """Retrieves probability count product data from the First Street Foundation API given a list of search_items
          and returns a list of Probability Count objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
             location_type (str): The location lookup type
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Probability Count
+            A list of Probability Count, or a ProductFrame if as_frame is set
         Raises:
             InvalidArgument: The location provided is empty
             TypeError: The location provided is not a string
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         if not location_type:
             raise InvalidArgument(location_type)
         elif not isinstance(location_type, str):
             raise TypeError("location is not a string")
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "count", location_type, extra_param=extra_param)
-        product = [ProbabilityCount(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "probability", "count", location_type,
+                                              extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "probability", "count", location_type)
+
+        product = self._build_models(ProbabilityCount, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "probability", "count", location_type, output_dir=output_dir)
+            self._to_file(product, "probability", "count", location_type, output_dir=output_dir, file_format=csv)
 
         logging.info("Probability Count Data Ready.")
 
         return product
 
-    def get_count_summary(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_count_summary(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves probability Count-Summary product data from the First Street Foundation API given a list of
         search_items and returns a list of Probability Count-Summary object.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Probability Count-Summary
+            A list of Probability Count-Summary, or a ProductFrame if as_frame is set
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "count-summary", "property", extra_param=extra_param)
-        product = [ProbabilityCountSummary(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "probability", "count-summary", "property",
+                                              extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "probability", "count-summary", "property")
+
+        product = self._build_models(ProbabilityCountSummary, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "probability", "count-summary", output_dir=output_dir)
+            self._to_file(product, "probability", "count-summary", output_dir=output_dir, file_format=csv)
 
         logging.info("Probability Count-Summary Data Ready.")
 
         return product
 
-    def get_cumulative(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_cumulative(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves probability cumulative product data from the First Street Foundation API given a list of
         search_items and returns a list of Probability Cumulative object.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Probability Cumulative
+            A list of Probability Cumulative, or a ProductFrame if as_frame is set
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "cumulative", "property", extra_param=extra_param)
-        product = [ProbabilityCumulative(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "probability", "cumulative", "property",
+                                              extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "probability", "cumulative", "property")
+
+        product = self._build_models(ProbabilityCumulative, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "probability", "cumulative", output_dir=output_dir)
+            self._to_file(product, "probability", "cumulative", output_dir=output_dir, file_format=csv)
 
         logging.info("Probability Cumulative Data Ready.")
 
         return product
 
-    def get_depth(self, search_items, csv=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_depth(self, search_items, csv=False, output_dir=None, extra_param=None, as_frame=False):
         """Retrieves probability depth product data from the First Street Foundation API given a list of search_items
          and returns a list of Probability Depth objects.
 
         Args:
-            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+            search_items (iterable/file): A First Street Foundation IDs, lat/lng pair, address, or a
                 file of First Street Foundation IDs
-            csv (bool): To output extracted data to a csv or not
+            csv (bool/str/CsvWriter): To output extracted data to a csv or not, or 'parquet'/'arrow' for a typed file.
+                A CsvWriter appends the data to its csv
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            as_frame (bool): To return a ProductFrame of the responses instead of a list of objects
 
         Returns:
-            A list of Probability Depth
+            A list of Probability Depth, or a ProductFrame if as_frame is set
         """
 
+        if as_frame and csv:
+            raise InvalidArgument("as_frame cannot be combined with csv output")
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "depth", "property", extra_param=extra_param)
-        product = [ProbabilityDepth(api_data) for api_data in api_datas]
+        api_datas = await self.call_api_async(search_items, "probability", "depth", "property", extra_param=extra_param)
+
+        if as_frame:
+            return ProductFrame.from_responses(api_datas, "probability", "depth", "property")
+
+        product = self._build_models(ProbabilityDepth, api_datas)
 
         if csv:
-            csv_format.to_csv(product, "probability", "depth", output_dir=output_dir)
+            self._to_file(product, "probability", "depth", output_dir=output_dir, file_format=csv)
 
         logging.info("Probability Depth Data Ready.")
 
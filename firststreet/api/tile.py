@@ -8,7 +8,7 @@ import logging
 # Internal Imports
 import os
 
-from firststreet.api.api import Api
+from firststreet.api.api import Api, dual_mode
 from firststreet.errors import InvalidArgument
 from firststreet.models.tile import ProbabilityDepthTile, HistoricEventTile
 
@@ -21,14 +21,16 @@ class Tile(Api):
             get_historic_event: Retrieves a list of Probability Depth for the given list of IDs
         """
 
-    def get_probability_depth(self, search_items, year, return_period, image=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_probability_depth(self, search_items, year, return_period, image=False, output_dir=None,
+                                    extra_param=None):
         """Retrieves probability depth tile data from the First Street Foundation API given a list of search_items
          and returns a list of Probability Depth Tile objects.
 
         Args:
             year (int): The year to get the tile
             return_period (int): The return period to get the tile
-            search_items (list of tuple): A list of coordinates in the form of [(x_1, y_1, z_1), (x_2, y_2, z_2), ...]
+            search_items (iterable of tuple): The coordinates in the form of [(x_1, y_1, z_1), (x_2, y_2, z_2), ...]
             image (bool): To output extracted image to a png or not
             output_dir (str): The output directory to save the generated tile
             extra_param (dict): Extra parameter to be added to the url
@@ -55,8 +57,8 @@ class Tile(Api):
             raise InvalidArgument(return_period)
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "tile", "probability", tile_product="depth", year=year,
-                                  return_period=return_period, extra_param=extra_param)
+        api_datas = await self.call_api_async(search_items, "tile", "probability", tile_product="depth", year=year,
+                                              return_period=return_period, extra_param=extra_param)
 
         if image:
             for data in api_datas:
@@ -78,18 +80,19 @@ class Tile(Api):
 
             logging.info("Image(s) generated to '{}'.".format(output_dir))
 
-        product = [ProbabilityDepthTile(api_data, year, return_period) for api_data in api_datas]
+        product = self._build_models(ProbabilityDepthTile, api_datas, year, return_period)
 
         logging.info("Probability Depth Tile Ready.")
 
         return product
 
-    def get_historic_event(self, search_items, event_id, image=False, output_dir=None, extra_param=None):
+    @dual_mode
+    async def get_historic_event(self, search_items, event_id, image=False, output_dir=None, extra_param=None):
         """Retrieves historic event tile data from the First Street Foundation API given a list of search_items
          and returns a list of Historic Event Tile objects.
 
         Args:
-            search_items (list of tuple): A list of coordinates in the form of [(x_1, y_1, z_1), (x_2, y_2, z_2), ...]
+            search_items (iterable of tuple): The coordinates in the form of [(x_1, y_1, z_1), (x_2, y_2, z_2), ...]
             event_id (int): A First Street Foundation eventId
             image (bool): To output extracted image to a png or not
             output_dir (str): The output directory to save the generated tile
@@ -108,8 +111,8 @@ class Tile(Api):
             raise TypeError("event id is not an int")
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "tile", "historic", tile_product="event", event_id=event_id,
-                                  extra_param=extra_param)
+        api_datas = await self.call_api_async(search_items, "tile", "historic", tile_product="event", event_id=event_id,
+                                              extra_param=extra_param)
 
         if image:
             for data in api_datas:
@@ -130,7 +133,7 @@ class Tile(Api):
 
             logging.info("Image(s) generated to '{}'.".format(output_dir))
 
-        product = [HistoricEventTile(api_data, event_id) for api_data in api_datas]
+        product = self._build_models(HistoricEventTile, api_datas, event_id)
 
         logging.info("Historic Event Tile Ready.")
 
@@ -0,0 +1,345 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import asyncio
+import collections
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import time
+import zlib
+
+DEFAULT_CACHE_PATH = pathlib.Path.home() / ".firststreet" / "cache.sqlite"
+
+
+def is_cacheable(result):
+    """Only successful bodies are cached. Error bodies carry a valid_id or search_item key
+
+    Args:
+        result (dict): The result of a fetch
+    Returns:
+        If the result can be cached
+    """
+    return isinstance(result, dict) and 'valid_id' not in result and 'search_item' not in result
+
+
+def cache_key(endpoint, version):
+    """The cache key of an endpoint
+
+    Args:
+        endpoint (tuple): The endpoint built by Api.call_api
+        version (str): The version of the API
+    Returns:
+        The key made of the version and the endpoint url
+    """
+    return "{}:{}".format(version, endpoint[0])
+
+
+class Coalescer:
+    """Shares a single fetch between every concurrent caller asking for the same key
+
+        Attributes:
+            coalesced (int): The number of callers that waited on a fetch already in flight
+        Methods:
+            run: Runs the fetch for a key, or waits on the one already in flight
+        """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._in_flight = {}
+        self._waiters = {}
+
+    async def run(self, key, fetch):
+        """Runs the fetch for the key unless one is already in flight, in which case its result is awaited. The fetch
+        runs in its own task, so a cancelled caller does not cancel it for the others. It is only cancelled once every
+        caller waiting on it is gone
+        Args:
+            key (str): The key of the fetch
+            fetch (callable): Returns an awaitable of the result
+        Returns:
+            The result of the fetch
+        """
+
+        task = self._in_flight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[key] = task
+            self._waiters[key] = 0
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+
+        try:
+            return await asyncio.shield(task)
+
+        finally:
+            self._waiters[key] -= 1
+
+            if not self._waiters[key]:
+                del self._waiters[key]
+                del self._in_flight[key]
+                task.cancel()
+
+
+class MemoryCache:
+    """An in-process LRU cache of the decoded responses, bounded by the number of entries and a TTL. Concurrent
+        requests for the same endpoint are coalesced so only one of them goes to the API. The cached bodies are shared
+        by every caller and must not be modified.
+
+        Attributes:
+            max_entries (int): The max number of responses held
+            ttl (int): The time to live of an entry in seconds
+            hits (int): The number of lookups answered from the cache
+            misses (int): The number of lookups that had to be fetched
+            coalesced (int): The number of lookups that waited on a fetch already in flight
+        Methods:
+            get: Returns the cached body for an endpoint, if any
+            set: Stores the body for an endpoint
+            get_or_fetch: Returns the cached body, or fetches it once for all concurrent callers
+            stats: Returns the counters of the cache
+            clear: Removes every entry
+        """
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+
+        self._not_found = 0
+        self._entries = collections.OrderedDict()
+        self._coalescer = Coalescer()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def misses(self):
+        return self._not_found - self.coalesced
+
+    @property
+    def coalesced(self):
+        return self._coalescer.coalesced
+
+    def get(self, endpoint, version):
+        """Returns the cached body for the endpoint
+        Args:
+            endpoint (tuple): The endpoint built by Api.call_api
+            version (str): The version of the API
+        Returns:
+            The decoded JSON body, or None if it is not cached or has expired
+        """
+
+        key = cache_key(endpoint, version)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        body, expires = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+
+        return body
+
+    def set(self, endpoint, version, body):
+        """Stores the body for the endpoint, evicting the least recently used entry if the cache is full
+        Args:
+            endpoint (tuple): The endpoint built by Api.call_api
+            version (str): The version of the API
+            body (dict): The decoded JSON body
+        """
+
+        key = cache_key(endpoint, version)
+        self._entries[key] = (body, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, endpoint, version, fetch):
+        """Returns the cached body for the endpoint. On a miss the body is fetched once, and every concurrent caller
+        for the same endpoint waits on that fetch
+        Args:
+            endpoint (tuple): The endpoint built by Api.call_api
+            version (str): The version of the API
+            fetch (callable): Returns an awaitable of the body
+        Returns:
+            The decoded JSON body
+        """
+
+        body = self.get(endpoint, version)
+        if body is not None:
+            self.hits += 1
+            return body
+
+        self._not_found += 1
+
+        body = await self._coalescer.run(cache_key(endpoint, version), fetch)
+
+        if is_cacheable(body):
+            self.set(endpoint, version, body)
+
+        return body
+
+    def stats(self):
+        """Returns the counters of the cache
+        Returns:
+            A dict of the entries, hits, misses, coalesced lookups and the hit rate
+        """
+
+        lookups = self.hits + self.misses + self.coalesced
+
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'coalesced': self.coalesced, 'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0}
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ResponseCache:
+    """A persistent SQLite cache of the decoded product responses, keyed by the API version and the full endpoint url.
+        The bodies are stored compressed, expire after a per product TTL, and the least recently used entries are
+        evicted once the cache grows past max_size. Tiles and error responses are not cached.
+
+        Attributes:
+            path (str): The SQLite file holding the cache
+            ttl (int): The default time to live of an entry in seconds
+            product_ttl (dict): The time to live per product, keyed by "product/product_subtype" or "product". A TTL
+                of 0 turns caching off for that product
+            max_size (int): The max total size of the stored bodies in bytes
+            compress_level (int): The zlib compression level of the stored bodies
+        Methods:
+            get: Returns the cached body for an endpoint, if any
+            set: Stores the body for an endpoint
+            clear: Removes every entry
+            close: Closes the SQLite connection
+        """
+
+    def __init__(self, path=None, ttl=86400, product_ttl=None, max_size=512 * 1024 * 1024, compress_level=6):
+        if path is None:
+            path = DEFAULT_CACHE_PATH
+
+        path = pathlib.Path(path)
+        if not os.path.exists(path.parent):
+            os.makedirs(path.parent)
+
+        self.path = str(path)
+        self.ttl = ttl
+        self.product_ttl = product_ttl or {}
+        self.max_size = max_size
+        self.compress_level = compress_level
+
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body BLOB NOT NULL, "
+                           "size INTEGER NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, endpoint, version):
+        """Returns the cached body for the endpoint
+        Args:
+            endpoint (tuple): The endpoint built by Api.call_api
+            version (str): The version of the API
+        Returns:
+            The decoded JSON body, or None if it is not cached or has expired
+        """
+
+        if not self._ttl_for(endpoint):
+            return None
+
+        key = cache_key(endpoint, version)
+        row = self._conn.execute("SELECT body, expires FROM responses WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            return None
+
+        body, expires = row
+        now = time.time()
+
+        if expires <= now:
+            self._delete(key)
+            return None
+
+        self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+
+        return json.loads(zlib.decompress(body))
+
+    def set(self, endpoint, version, body):
+        """Stores the body for the endpoint, evicting the least recently used entries if the cache is full
+        Args:
+            endpoint (tuple): The endpoint built by Api.call_api
+            version (str): The version of the API
+            body (dict): The decoded JSON body
+        """
+
+        ttl = self._ttl_for(endpoint)
+        if not ttl:
+            return
+
+        key = cache_key(endpoint, version)
+        data = zlib.compress(json.dumps(body, separators=(',', ':')).encode(), self.compress_level)
+        now = time.time()
+
+        self._delete(key)
+        self._conn.execute("INSERT INTO responses (key, body, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                           (key, data, len(data), now + ttl, now))
+        self._size += len(data)
+
+        if self._size > self.max_size:
+            self._evict()
+
+    def clear(self):
+        self._conn.execute("DELETE FROM responses")
+        self._size = 0
+
+    def close(self):
+        self._conn.close()
+
+    def _ttl_for(self, endpoint):
+        product, product_subtype = endpoint[2], endpoint[3]
+
+        if product == 'tile':
+            return 0
+
+        return self.product_ttl.get("{}/{}".format(product, product_subtype),
+                                    self.product_ttl.get(product, self.ttl))
+
+    def _delete(self, key):
+        row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._size -= row[0]
+
+    def _evict(self):
+        """Removes expired entries, then the least recently used entries until the cache fits in max_size"""
+
+        self._conn.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        evicted = 0
+        while self._size > self.max_size:
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 100").fetchall()
+            if not rows:
+                break
+
+            for key, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= size
+                evicted += 1
+
+                if self._size <= self.max_size:
+                    break
+
+        logging.debug("Evicted {} responses from the cache".format(evicted))
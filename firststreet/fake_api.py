@@ -0,0 +1,495 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import struct
+import uuid
+import zlib
+
+# External Imports
+from aiohttp import web
+
+# The location types of the API
+LOCATIONS = ('property', 'neighborhood', 'city', 'zcta', 'tract', 'county', 'cd', 'state')
+
+YEARS = (2021, 2036, 2051)
+RETURN_PERIODS = (500, 100, 20, 5, 2)
+THRESHOLDS = (0, 15, 30, 61, 91)
+BINS = (0, 15, 30, 61, 91, 122)
+
+# The latency distributions, each drawing a delay in seconds from its parameters
+LATENCY_DISTRIBUTIONS = {
+    'constant': lambda rng, value: value,
+    'uniform': lambda rng, low, high: rng.uniform(low, high),
+    'normal': lambda rng, mean, deviation: max(rng.gauss(mean, deviation), 0.0),
+    'lognormal': lambda rng, median, sigma: rng.lognormvariate(math.log(median), sigma),
+    'exponential': lambda rng, mean: rng.expovariate(1 / mean),
+}
+
+
+def latency_sampler(latency):
+    """Builds the function drawing the delay of each response
+
+    Args:
+        latency (None/float/tuple/str/callable): None for no delay, a constant delay in seconds, a tuple of the name of
+            a distribution in LATENCY_DISTRIBUTIONS and its parameters such as ('lognormal', 0.05, 0.5), the same as
+            a string such as "lognormal:0.05:0.5", or a callable drawing the delay from a random.Random
+    Returns:
+        A callable taking a random.Random and returning the delay in seconds
+    Raises:
+        ValueError: if the distribution is not known
+    """
+
+    if latency is None:
+        return lambda rng: 0.0
+
+    if callable(latency):
+        return latency
+
+    if isinstance(latency, (int, float)):
+        return lambda rng: float(latency)
+
+    if isinstance(latency, str):
+        name, *params = latency.split(":")
+        latency = (name,) + tuple(float(param) for param in params)
+
+    name, *params = latency
+    if name not in LATENCY_DISTRIBUTIONS:
+        raise ValueError("Unknown latency distribution '{}'. Expected one of {}".format(
+            name, ", ".join(LATENCY_DISTRIBUTIONS)))
+
+    distribution = LATENCY_DISTRIBUTIONS[name]
+    return lambda rng: distribution(rng, *params)
+
+
+def png(size=256):
+    """Builds a transparent square PNG, standing in for a tile
+
+    Args:
+        size (int): The width and height in pixels
+    Returns:
+        The bytes of the PNG
+    """
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = (b"\x00" + b"\x00\x00\x00\x00" * size) * size
+
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 6, 0, 0, 0)) + \
+        chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def _values(rng, low, high, digits=None):
+    values = sorted(rng.uniform(low, high) for _ in range(3))
+    values = [round(value, digits) if digits else int(value) for value in values]
+    return {'low': values[0], 'mid': values[1], 'high': values[2]}
+
+
+def _area(rng, kind, fsid=None):
+    fsid = fsid if fsid is not None else rng.randrange(10 ** 4, 10 ** 10)
+    return {'fsid': fsid, 'name': "{} {}".format(kind.capitalize(), fsid)}
+
+
+def _geometry(rng):
+    lat, lng = rng.uniform(25, 48), rng.uniform(-124, -67)
+    ring = [[lng - 0.01, lat - 0.01], [lng + 0.01, lat - 0.01], [lng + 0.01, lat + 0.01], [lng - 0.01, lat + 0.01],
+            [lng - 0.01, lat - 0.01]]
+
+    return {'center': {'type': 'Point', 'coordinates': [lng, lat]},
+            'polygon': {'type': 'MultiPolygon', 'coordinates': [[ring]]},
+            'bbox': {'type': 'Polygon', 'coordinates': [ring]}}
+
+
+def _yearly(rng, key, keys, low, high):
+    return [{'year': year, 'data': [{key: item, 'data': _values(rng, low, high)} for item in keys]} for year in YEARS]
+
+
+def _probability_depth(item, location, rng):
+    return {'fsid': item, 'depth': _yearly(rng, 'returnPeriod', RETURN_PERIODS, 0, 200)}
+
+
+def _probability_chance(item, location, rng):
+    chance = _yearly(rng, 'threshold', THRESHOLDS, 0, 1)
+    for year in chance:
+        for record in year['data']:
+            record['data'] = _values(rng, 0, 1, digits=3)
+
+    return {'fsid': item, 'chance': chance}
+
+
+def _probability_cumulative(item, location, rng):
+    cumulative = _probability_chance(item, location, rng)['chance']
+    return {'fsid': item, 'cumulative': cumulative}
+
+
+def _probability_count(item, location, rng):
+    return {'fsid': item, 'count': [{'year': year, 'data': [
+        {'returnPeriod': return_period, 'data': [{'bin': bin_, 'count': _values(rng, 0, 5000)} for bin_ in BINS]}
+        for return_period in RETURN_PERIODS]} for year in YEARS]}
+
+
+def _probability_count_summary(item, location, rng):
+    body = {'fsid': item}
+    for kind in ('state', 'city', 'zcta', 'neighborhood', 'tract', 'county', 'cd'):
+        area = _area(rng, kind)
+        area['count'] = [{'year': year, 'data': _values(rng, 0, 100000)} for year in YEARS]
+        if kind == 'city':
+            area['subtype'] = "city"
+        body[kind] = [area]
+
+    return body
+
+
+def _location_detail(item, location, rng):
+    body = {'fsid': item, 'geometry': _geometry(rng)}
+    state = _area(rng, 'state', rng.randrange(1, 57))
+
+    if location == 'property':
+        body.update({'streetNumber': str(rng.randrange(1, 9999)), 'route': "Main St", 'city': _area(rng, 'city'),
+                     'zipCode': str(rng.randrange(10000, 99999)), 'zcta': rng.randrange(10000, 99999),
+                     'neighborhood': [_area(rng, 'neighborhood')], 'tract': {'fsid': rng.randrange(10 ** 10, 10 ** 11)},
+                     'county': _area(rng, 'county'), 'cd': _area(rng, 'cd'), 'state': state,
+                     'footprintId': rng.randrange(10 ** 8), 'elevation': round(rng.uniform(0, 300), 1),
+                     'fema': rng.choice(("X", "AE", "VE")), 'floorElevation': round(rng.uniform(0, 300), 1),
+                     'building': {'basement': rng.choice((True, False)), 'units': rng.randrange(1, 4),
+                                  'stories': rng.randrange(1, 4)},
+                     'floodType': rng.choice(("Fluvial", "Pluvial", "Coastal")), 'residential': True})
+
+    elif location == 'neighborhood':
+        body.update({'name': "Neighborhood {}".format(item), 'subtype': "neighborhood", 'state': state,
+                     'city': [_area(rng, 'city')], 'county': [_area(rng, 'county')]})
+
+    elif location == 'city':
+        body.update({'name': "City {}".format(item), 'lsad': "25", 'state': state, 'zcta': [_area(rng, 'zcta')],
+                     'county': [_area(rng, 'county')], 'neighborhood': [_area(rng, 'neighborhood')]})
+
+    elif location == 'zcta':
+        body.update({'name': str(item), 'state': state, 'city': [_area(rng, 'city')],
+                     'county': [_area(rng, 'county')]})
+
+    elif location == 'tract':
+        body.update({'fips': item, 'county': _area(rng, 'county'), 'state': state})
+
+    elif location == 'county':
+        body.update({'name': "County {}".format(item), 'fips': item, 'isCoastal': rng.choice((True, False)),
+                     'state': state, 'city': [_area(rng, 'city')], 'zcta': [_area(rng, 'zcta')],
+                     'cd': [_area(rng, 'cd')]})
+
+    elif location == 'cd':
+        body.update({'district': str(rng.randrange(1, 50)), 'congress': "116", 'state': state,
+                     'county': [_area(rng, 'county')]})
+
+    else:
+        body.update({'name': "State {}".format(item), 'fips': item})
+
+    return body
+
+
+def _location_summary(item, location, rng):
+    body = {'fsid': item, 'riskDirection': rng.choice((-1, 0, 1)), 'environmentalRisk': rng.randrange(1, 11),
+            'historic': rng.randrange(0, 5), 'adaptation': rng.randrange(0, 5)}
+
+    if location == 'property':
+        body['floodFactor'] = rng.randrange(1, 11)
+    else:
+        total = rng.randrange(100, 100000)
+        body['properties'] = {'total': total, 'atRisk': rng.randrange(0, total)}
+
+    return body
+
+
+def _adaptation_detail(item, location, rng):
+    return {'adaptationId': item, 'name': "Adaptation {}".format(item), 'type': ["levee"],
+            'scenario': ["fluvial", "pluvial"], 'conveyance': rng.choice((True, False)),
+            'returnPeriod': rng.choice(RETURN_PERIODS),
+            'serving': {kind: rng.randrange(0, 1000) for kind in LOCATIONS}, 'geometry': _geometry(rng)}
+
+
+def _adaptation_summary(item, location, rng):
+    body = {'fsid': item, 'adaptation': [rng.randrange(1, 10 ** 4) for _ in range(rng.randrange(1, 4))]}
+    if location != 'property':
+        body['properties'] = rng.randrange(0, 10000)
+
+    return body
+
+
+def _historic_event(item, location, rng):
+    total = rng.randrange(100, 100000)
+    return {'eventId': item, 'name': "Event {}".format(item), 'month': rng.randrange(1, 13),
+            'year': rng.randrange(1950, 2021), 'returnPeriod': rng.choice(RETURN_PERIODS), 'type': "hurricane",
+            'properties': {'total': total, 'affected': rng.randrange(0, total)}, 'geometry': _geometry(rng)}
+
+
+def _historic_summary(item, location, rng):
+    events = []
+    for _ in range(rng.randrange(1, 4)):
+        event = {'eventId': rng.randrange(1, 10 ** 4), 'name': "Event", 'type': "hurricane"}
+        if location == 'property':
+            event['depth'] = rng.randrange(0, 200)
+        else:
+            event['data'] = [{'bin': bin_, 'count': rng.randrange(0, 5000)} for bin_ in BINS]
+        events.append(event)
+
+    return {'fsid': item, 'historic': events}
+
+
+def _fema_nfip(item, location, rng):
+    return {'fsid': item, 'claimCount': rng.randrange(0, 500), 'policyCount': rng.randrange(0, 5000),
+            'buildingPaid': rng.randrange(0, 10 ** 7), 'contentPaid': rng.randrange(0, 10 ** 6),
+            'buildingCoverage': rng.randrange(0, 10 ** 8), 'contentCoverage': rng.randrange(0, 10 ** 7),
+            'iccPaid': rng.randrange(0, 10 ** 5)}
+
+
+def _environmental_precipitation(item, location, rng):
+    return {'fsid': item, 'projected': [{'year': year, 'data': _values(rng, 0, 20, digits=3)} for year in YEARS]}
+
+
+def _aal_summary(item, location, rng):
+    if location == 'property':
+        return {'fsid': item,
+                'annualLoss': [{'year': year, 'data': _values(rng, 0, 10000)} for year in YEARS],
+                'depthLoss': [{'depth': depth, 'data': rng.randrange(0, 100000)} for depth in BINS]}
+
+    return {'fsid': item, 'annualLoss': [{'year': year, 'floodFactor': flood_factor,
+                                          'totalLoss': _values(rng, 0, 10 ** 7), 'count': _values(rng, 0, 1000)}
+                                         for year in YEARS for flood_factor in (1, 5, 10)]}
+
+
+def _avm(item, location, rng):
+    return {'fsid': item, 'avm': {'mid': rng.randrange(50000, 2000000)}, 'providerID': 2}
+
+
+def _avm_provider(item, location, rng):
+    return {'providerID': item, 'providerName': "Provider {}".format(item),
+            'providerLogo': "https://example.org/provider-{}.png".format(item)}
+
+
+def _economic_nfip(item, location, rng):
+    return {'fsid': item, 'data': [{'estimate': estimate, 'building': rng.randrange(100, 5000),
+                                    'contents': rng.randrange(100, 2000)} for estimate in (1, 2, 3)]}
+
+
+# The body of each product and product subtype, keyed by the path Api.call_api builds for them
+PRODUCTS = {
+    'adaptation/detail': _adaptation_detail,
+    'adaptation/summary': _adaptation_summary,
+    'probability/chance': _probability_chance,
+    'probability/count': _probability_count,
+    'probability/count-summary': _probability_count_summary,
+    'probability/cumulative': _probability_cumulative,
+    'probability/depth': _probability_depth,
+    'historic/event': _historic_event,
+    'historic/summary': _historic_summary,
+    'location/detail': _location_detail,
+    'location/summary': _location_summary,
+    'fema/nfip': _fema_nfip,
+    'environmental/precipitation': _environmental_precipitation,
+    'economic/aal/summary': _aal_summary,
+    'economic/avm': _avm,
+    'economic/avm/provider': _avm_provider,
+    'economic/nfip': _economic_nfip,
+}
+
+
+class FakeApi:
+    """A local stand-in for the First Street Foundation API, to load test and benchmark the client offline. It answers
+        every endpoint Api.call_api builds, by fsid, lat/lng, address or tile coordinate, with synthetic bodies in the
+        schema of the API. The body of a search item is the same on every call. The latency of the responses is drawn
+        from a distribution, a fraction of the requests can be failed with chosen statuses, and the requests over the
+        rate limit are answered with 429 along with the x-ratelimit headers.
+
+        Attributes:
+            latency (None/float/tuple/str/callable): The delay of each response, see latency_sampler
+            error_rates (dict): The fraction of the requests answered with each error status, such as {503: 0.01}
+            rate_limit (int/None): The max number of requests during the period, or None for no limit
+            rate_period (float): The period of time for the limit in seconds
+            seed (int): The seed of the synthetic bodies, latencies and errors
+            requests (int): The number of requests received
+            statuses (dict): The number of responses sent with each status
+        Methods:
+            app: Returns the aiohttp application
+            start: Serves the application on a local port
+            close: Stops serving
+        Example:
+        ```python
+            api = FakeApi(latency="lognormal:0.05:0.5", error_rates={503: 0.01}, rate_limit=5000, rate_period=60)
+            url = await api.start()
+            fs = firststreet.FirstStreet("key")
+            fs.http.options['url'] = url
+        ```
+        """
+
+    def __init__(self, latency=None, error_rates=None, rate_limit=None, rate_period=60, seed=0, tile_size=256):
+        self.latency = latency
+        self.error_rates = error_rates or {}
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.seed = seed
+        self.requests = 0
+        self.statuses = {}
+
+        self._sample = latency_sampler(latency)
+        self._rng = random.Random(seed)
+        self._tile = png(tile_size)
+        self._window_start = None
+        self._window_count = 0
+        self._runner = None
+
+    def app(self):
+        """Returns the aiohttp application answering every endpoint of the API"""
+
+        app = web.Application()
+        app.router.add_get('/{version}/{path:.*}', self._handle)
+
+        return app
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Serves the application
+        Args:
+            host (str): The address to listen on
+            port (int): The port to listen on. 0 picks a free port
+        Returns:
+            The base url to set as the url option of the client
+        """
+
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        return "http://{}:{}".format(host, site._server.sockets[0].getsockname()[1])
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request):
+        self.requests += 1
+        headers = self._rate_limit_headers()
+        throttled = self.rate_limit is not None and self._window_count > self.rate_limit
+
+        delay = self._sample(self._rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if throttled:
+            return self._respond(429, {'error': {'message': "Rate limit exceeded", 'code': 429}}, headers)
+
+        roll = self._rng.random()
+        for status, rate in self.error_rates.items():
+            if roll < rate:
+                return self._respond(status, {'error': {'message': "Synthetic error", 'code': status}}, headers)
+            roll -= rate
+
+        path = request.match_info['path'].strip("/")
+        if path.startswith("tile/"):
+            return self._tile_response(path, headers)
+
+        return self._product_response(path, request.query, headers)
+
+    def _rate_limit_headers(self):
+        """Counts the request against a fixed window and returns the x-ratelimit headers"""
+
+        headers = {'x-request-id': str(uuid.uuid4())}
+        if self.rate_limit is None:
+            return headers
+
+        now = asyncio.get_running_loop().time()
+        if self._window_start is None or now - self._window_start >= self.rate_period:
+            self._window_start = now
+            self._window_count = 0
+
+        self._window_count += 1
+
+        # The reset is sent in seconds from now
+        headers.update({'x-ratelimit-limit': str(self.rate_limit),
+                        'x-ratelimit-remaining': str(max(self.rate_limit - self._window_count, 0)),
+                        'x-ratelimit-reset': "{:.3f}".format(self._window_start + self.rate_period - now)})
+
+        return headers
+
+    def _respond(self, status, body, headers):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        return web.Response(status=status, text=json.dumps(body), content_type="application/json", headers=headers)
+
+    def _tile_response(self, path, headers):
+        # tile/probability/depth/{year}/{return_period}/{z}/{x}/{y} or tile/historic/event/{event_id}/{z}/{x}/{y}
+        if not all(part.isdigit() for part in path.split("/")[-3:]):
+            return self._respond(500, {'error': {'message': "Invalid tile coordinate", 'code': 500}}, headers)
+
+        self.statuses[200] = self.statuses.get(200, 0) + 1
+        return web.Response(body=self._tile, content_type="image/png", headers=headers)
+
+    def _product_response(self, path, query, headers):
+        # The longest product path first, so economic/avm/provider is not taken for economic/avm
+        for product in sorted(PRODUCTS, key=len, reverse=True):
+            if path == product or path.startswith(product + "/"):
+                break
+        else:
+            return self._respond(404, {'error': {'message': "Unknown product '{}'".format(path), 'code': 404}},
+                                 headers)
+
+        parts = [part for part in path[len(product):].split("/") if part]
+        location = parts.pop(0) if parts and parts[0] in LOCATIONS else None
+
+        if parts:
+            try:
+                item = int(parts[0])
+            except ValueError:
+                return self._respond(404, {'error': {'message': "Invalid ID", 'code': 404}}, headers)
+
+        # A lat/lng or an address is resolved to a synthetic fsid, the same for the same search item
+        elif 'lat' in query and 'lng' in query:
+            item = zlib.crc32("{},{}".format(query['lat'], query['lng']).encode())
+        elif 'address' in query:
+            item = zlib.crc32(query['address'].encode())
+        else:
+            return self._respond(404, {'error': {'message': "Missing search item", 'code': 404}}, headers)
+
+        rng = random.Random("{}:{}:{}".format(self.seed, path, item))
+        return self._respond(200, PRODUCTS[product](item, location, rng), headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves a local stand-in for the First Street Foundation API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default=None, help="A distribution such as lognormal:0.05:0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="The fraction of requests failed with 503")
+    parser.add_argument("--rate-limit", type=int, default=None)
+    parser.add_argument("--rate-period", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    api = FakeApi(latency=args.latency, error_rates={503: args.error_rate} if args.error_rate else None,
+                  rate_limit=args.rate_limit, rate_period=args.rate_period, seed=args.seed)
+
+    async def serve():
+        url = await api.start(args.host, args.port)
+
+        # The url is printed on its own line so a parent process can read it, such as when serving on port 0
+        print(url, flush=True)
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await api.close()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
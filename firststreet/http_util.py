@@ -3,19 +3,24 @@
 
 # Standard Imports
 import asyncio
+import itertools
+import json
+import time
+from collections.abc import Sized
 
 # External Imports
 import logging
 from json.decoder import JSONDecodeError
 
-import tqdm
 import aiohttp
 import ssl
-import certifi
 from asyncio_throttle import Throttler
 
 # Internal Imports
 import firststreet.errors as e
+from firststreet.cache import Coalescer, cache_key, is_cacheable
+from firststreet.instrumentation import Instrumentation
+from firststreet.retry import RetryPolicy, RetryableStatusError
 
 DEFAULT_SUMMARY_VERSION = 'v1'
 
@@ -29,18 +34,44 @@ class Http:
             rate_limit (int): The max number of requests during the period
             rate_period (int): The period of time for the limit
             version (str): The version to call the API with
+            rate_limiter (object/None): Limits the request rate in place of the default throttler. It is used as an
+                async context manager around each request, and its update method (if any) is called with the rate
+                limit information of every response. See AdaptiveRateLimiter
+            retry_policy (RetryPolicy/None): Decides which failures are retried and the backoff between retries
+            cache (ResponseCache/None): A persistent cache of the responses checked before calling the API
+            memory_cache (MemoryCache/None): An in-process cache of the responses checked before the response cache.
+                Concurrent requests for the same endpoint are coalesced into one
+            journal (Journal/None): An append-only journal of the completed endpoints. Endpoints it holds are replayed
+                from it instead of calling the API
+            tracer (Tracer/None): Traces the DNS, connect, send and first byte timings of every request through the
+                TraceConfig signals of aiohttp
+            metrics (Metrics/None): Counts the requests, errors, retries, cache hits and bytes received, and keeps the
+                last x-ratelimit-remaining header, for export in the Prometheus text format
+            deduplicated (int): The number of duplicate endpoints removed from calls by Api.call_api
+            instrumentation (Instrumentation): The latency histograms of each stage of the requests and products
         Methods:
+            stats: Returns the count and latency percentiles of each stage
+            open: Opens the long-lived session and connection pool shared across calls
+            close: Closes the session and releases the pooled connections
             endpoint_execute: Sets up the throttler and session for the asynchronous call
+            iter_execute: Yields the responses as they complete, with a bounded number of requests in flight
+            bound_fetch: Fetches an endpoint from the memory cache, the journal, the response cache or the API
+            cached_fetch: Fetches an endpoint from the journal, the response cache or the API
+            retry_fetch: Fetches an endpoint from the API, retrying according to the retry policy
             execute: Sends a request to the First Street Foundation API for the specified endpoint
             tile_response: Handles the response for a tile
             product_response: Handles the response for all other products
+            _update_rate_limit: Feeds the parsed rate limit to an adaptive rate limiter and the metrics
+            _count: Adds to a counter of the metrics
             _parse_rate_limit: Parses the rate limiter returned by the header
             _network_error: Handles any network errors returned by the response
             limited_as_completed: Limits the number of concurrent coroutines. Prevents Timeout errors due to too
                 many coroutines
         """
 
-    def __init__(self, api_key, connection_limit, rate_limit, rate_period, version=None):
+    def __init__(self, api_key, connection_limit, rate_limit, rate_period, version=None, rate_limiter=None,
+                 retry_policy=None, cache=None, memory_cache=None, journal=None,
+                 tracer=None, metrics=None):
         if version is None:
             version = DEFAULT_SUMMARY_VERSION
 
@@ -58,86 +89,320 @@ class Http:
         self.rate_limit = rate_limit
         self.rate_period = rate_period
 
+        if rate_limiter is None:
+            rate_limiter = Throttler(rate_limit=self.rate_limit, period=self.rate_period)
+
+        self._throttler = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self.memory_cache = memory_cache
+        self.journal = journal
+        self.tracer = tracer
+        self.metrics = metrics
+        self.deduplicated = 0
+        self.instrumentation = Instrumentation()
+
+        self._coalescer = Coalescer()
+        self._session = None
+        self._loop = None
+
+    @property
+    def requests_saved(self):
+        """The number of requests saved by removing duplicate endpoints from a call, and by sharing the requests
+        in flight between concurrent calls"""
+
+        coalesced = self._coalescer.coalesced
+        if self.memory_cache is not None:
+            coalesced += self.memory_cache.coalesced
+
+        return self.deduplicated + coalesced
+
+    def stats(self):
+        """Returns the count and latency percentiles of the semaphore and throttle waits, the time to first byte, the
+        body read, the JSON decode, the model construction, and the csv formatting and writing
+        Returns:
+            A dict of stage to a dict of the count, and the total, mean, p50, p90, p99 and max in milliseconds
+        """
+        return self.instrumentation.summary()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Opens the session used for every call. The session and its keep-alive connection pool are reused by
+        each subsequent call to endpoint_execute until close is called, so back-to-back calls do not pay the DNS
+        and TLS handshake cost again.
+        Returns:
+            The open ClientSession
+        """
+
+        loop = asyncio.get_running_loop()
+
+        if self._session is not None and not self._session.closed:
+            if self._loop is loop:
+                return self._session
+
+            # A session cannot be used across event loops. The old loop owns its connections, so drop it
+            logging.debug("Event loop changed. Opening a new session")
+
+        # Only needed once a session is opened, so it is left out of the import of the client
+        import certifi
+
+        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+        connector = aiohttp.TCPConnector(limit_per_host=self.connection_limit, ssl=ssl_ctx, ttl_dns_cache=300)
+
+        trace_configs = [self.tracer.trace_config()] if self.tracer is not None else None
+
+        self._session = aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+        self._loop = loop
+
+        return self._session
+
+    async def close(self):
+        """Closes the session and all of the pooled connections"""
+
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+
+        self._session = None
+        self._loop = None
+
     async def bound_fetch(self, sem, endpoint, session, throttler):
-        async with sem:
-            return await self.execute(endpoint, session, throttler)
+        """Fetches the endpoint from the memory cache, the response cache or the API, in that order. A request for an
+        endpoint that is already in flight waits for that request instead of making another
+        Args:
+            sem (Semaphore): Limits the number of requests in flight
+            endpoint (tuple): The endpoint to get
+            session (ClientSession): The open session
+            throttler (Throttler/AdaptiveRateLimiter): The throttle limiter
+        Returns:
+            The JSON reponse or an empty body if error
+        """
+
+        def fetch():
+            return self.cached_fetch(sem, endpoint, session, throttler)
+
+        if self.memory_cache is not None:
+            body = await self.memory_cache.get_or_fetch(endpoint, self.version, fetch)
+
+            if self.metrics is not None:
+                self.metrics.set('fsf_cache_hits_total', self.memory_cache.hits, {'cache': 'memory'})
+
+            return body
+
+        # Share the request with any other batch already fetching the same endpoint
+        return await self._coalescer.run(cache_key(endpoint, self.version), fetch)
+
+    async def cached_fetch(self, sem, endpoint, session, throttler):
+        """Fetches the endpoint from the journal or the response cache if either holds it, otherwise from the API.
+        Completed endpoints are added to the journal
+        Args:
+            sem (Semaphore): Limits the number of requests in flight
+            endpoint (tuple): The endpoint to get
+            session (ClientSession): The open session
+            throttler (Throttler/AdaptiveRateLimiter): The throttle limiter
+        Returns:
+            The JSON reponse or an empty body if error
+        """
+
+        if self.journal is not None:
+            body = self.journal.get(endpoint, self.version)
+            if body is not None:
+                self._count('fsf_cache_hits_total', cache='journal')
+                return body
+
+        if self.cache is not None:
+            body = self.cache.get(endpoint, self.version)
+            if body is not None:
+                self._count('fsf_cache_hits_total', cache='disk')
+                return self._record(endpoint, body)
+
+        result = await self.retry_fetch(sem, endpoint, session, throttler)
+
+        if self.cache is not None and is_cacheable(result):
+            self.cache.set(endpoint, self.version, result)
+
+        return self._record(endpoint, result)
+
+    def _record(self, endpoint, result):
+        """Adds a completed endpoint to the journal, if any, and returns its result"""
+
+        if self.journal is not None:
+            self.journal.record(endpoint, self.version, result)
+
+        return result
+
+    async def retry_fetch(self, sem, endpoint, session, throttler):
+        """Fetches the endpoint, retrying failures according to the retry policy. The semaphore and throttler are
+        only held while a request is made, so backing off does not hold up the other requests
+        Args:
+            sem (Semaphore): Limits the number of requests in flight
+            endpoint (tuple): The endpoint to get
+            session (ClientSession): The open session
+            throttler (Throttler/AdaptiveRateLimiter): The throttle limiter
+        Returns:
+            The JSON reponse or an empty body if error
+        """
+
+        self.retry_policy.record_request()
+
+        attempt = 0
+        while True:
+
+            try:
+                waited = time.perf_counter()
+                async with sem:
+                    self.instrumentation.record('semaphore_wait', time.perf_counter() - waited)
+                    return await self.execute(endpoint, session, throttler)
+
+            except (RetryableStatusError, asyncio.TimeoutError, JSONDecodeError, aiohttp.ClientError) as ex:
+                delay = self.retry_policy.retry_delay(ex, attempt)
+
+                if delay is None:
+                    logging.error("{} error getting item: {} from {} after {} retries".format(
+                        ex.__class__, endpoint[1], endpoint[0], attempt))
+                    self._count('fsf_failures_total', endpoint)
+                    return {'search_item': endpoint[1]}
+
+                reason = ex.status if isinstance(ex, RetryableStatusError) else ex.__class__.__name__
+                self._count('fsf_retries_total', endpoint, reason=reason)
+
+                logging.info("{} error for item: {} at {}. Retry {} in {:.2f}s".format(
+                    ex.__class__, endpoint[1], endpoint[0], attempt, delay))
+
+            attempt += 1
+            await asyncio.sleep(delay)
 
     async def endpoint_execute(self, endpoints):
-        """Asynchronously calls each endpoint and returns the JSON responses
+        """Asynchronously calls each endpoint and returns the JSON responses. The session is opened if it is not
+        already open, and is left open for the next call. An iterable without a length, such as a generator, is pulled
+        as requests complete
         Args:
-            endpoints (list): List of endpoints to get
+            endpoints (iterable): The endpoints to get
         Returns:
             The list of JSON responses corresponding to each endpoint
         """
 
-        throttler = Throttler(rate_limit=self.rate_limit, period=self.rate_period)
-        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+        import tqdm
+
+        total = len(endpoints) if isinstance(endpoints, Sized) else None
+        ret = [None] * (total or 0)
+
+        with tqdm.tqdm(total=total) as progress:
+            async for index, _, result in self._iter_indexed(endpoints):
+                if index >= len(ret):
+                    ret.extend([None] * (index + 1 - len(ret)))
+
+                ret[index] = result
+                progress.update()
+
+        return ret
+
+    async def iter_execute(self, endpoints, window=None):
+        """Asynchronously calls each endpoint and yields the responses as they complete. The endpoints are pulled
+        lazily from the iterable, and at most window requests are in flight at any time, so memory does not grow with
+        the number of endpoints
+        Args:
+            endpoints (iterable): An iterable of endpoints to get
+            window (int/None): The max number of requests in flight. Defaults to twice the connection limit
+        Yields:
+            A tuple of (endpoint, JSON response) in completion order
+        """
+
+        async for _, endpoint, result in self._iter_indexed(endpoints, window):
+            yield endpoint, result
+
+    async def _iter_indexed(self, endpoints, window=None):
+        """Runs the endpoints in a bounded window of tasks
+        Args:
+            endpoints (iterable): An iterable of endpoints to get
+            window (int/None): The max number of requests in flight. Defaults to twice the connection limit
+        Yields:
+            A tuple of (index, endpoint, JSON response) in completion order
+        """
+
+        if window is None:
+            window = self.connection_limit * 2
 
-        connector = aiohttp.TCPConnector(limit_per_host=self.connection_limit, ssl=ssl_ctx)
-        session = aiohttp.ClientSession(connector=connector)
+        session = await self.open()
+        sem = asyncio.Semaphore(self.connection_limit)
+        items = enumerate(endpoints)
+        pending = {}
+
+        def schedule(count):
+            for index, endpoint in itertools.islice(items, count):
+                task = asyncio.create_task(self.bound_fetch(sem, endpoint, session, self._throttler))
+                pending[task] = (index, endpoint)
 
-        # Asnycio create tasks for each endpoint
         try:
+            schedule(window)
 
-            sem = asyncio.Semaphore(self.connection_limit)
-            tasks = [asyncio.create_task(self.bound_fetch(sem, endpoint, session, throttler)) for endpoint in endpoints]
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
 
-            [await f for f in tqdm.tqdm(asyncio.as_completed(tasks), total=len(endpoints))]
-            ret = [t.result() for t in tasks]
+                # Top the window back up before handing results over, so requests keep flowing meanwhile
+                finished = [(pending.pop(task), task) for task in done]
+                schedule(len(finished))
 
-        finally:
-            await session.close()
+                for (index, endpoint), task in finished:
+                    yield index, endpoint, task.result()
 
-        return ret
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def execute(self, endpoint, session, throttler):
-        """Executes the endpoint for the given endpoint with the open session
+        """Executes the endpoint for the given endpoint with the open session. A single attempt is made, the retries
+        are handled by bound_fetch
         Args:
             endpoint (str): The endpoint to get from
             session (ClientSession): The open session
-            throttler (Throttler): The throttle limiter
+            throttler (Throttler/AdaptiveRateLimiter): The throttle limiter
         Returns:
-            The JSON reponse or an empty body if error
+            The JSON reponse
         Raises:
+            RetryableStatusError: if the response status is retried by the retry policy
             _network_error: if an error occurs
         """
 
         headers = self.options.get('headers')
+        instrumentation = self.instrumentation
 
-        # Retry loop
-        retry = 0
-        while retry < 5:
-
-            # Throttle
-            async with throttler:
-                try:
-                    async with session.get(endpoint[0], headers=headers, ssl=False) as response:
+        # Throttle
+        waited = time.perf_counter()
+        async with throttler:
+            sent = time.perf_counter()
+            instrumentation.record('throttle_wait', sent - waited)
 
-                        # Read a tile response
-                        if endpoint[2] == 'tile':
-                            return await self.tile_response(response, endpoint)
+            async with session.get(endpoint[0], headers=headers, ssl=False) as response:
+                instrumentation.record('ttfb', time.perf_counter() - sent)
 
-                        # Read a json response
-                        else:
-                            return await self.product_response(response, endpoint)
+                self._count('fsf_requests_total', endpoint, status=response.status)
+                if response.status >= 400:
+                    self._count('fsf_errors_total', endpoint, status_class="{}xx".format(response.status // 100))
 
-                except (asyncio.TimeoutError, JSONDecodeError) as ex:
-                    logging.info("{} error for item: {} at {}. Retry {}".format(ex.__class__, endpoint[1],
-                                                                                endpoint[0], retry))
-                    retry += 1
-                    await asyncio.sleep(1)
+                if response.status in self.retry_policy.statuses:
+                    rate_limit = self._parse_rate_limit(response.headers)
+                    self._update_rate_limit(rate_limit)
+                    raise RetryableStatusError(response.status, rate_limit, response.headers.get('Retry-After'))
 
-                except aiohttp.ClientError as ex:
-                    logging.error("{} error getting item: {} from {}".format(ex.__class__, endpoint[1], endpoint[0]))
-                    return {'search_item': endpoint[1]}
+                # Read a tile response
+                if endpoint[2] == 'tile':
+                    return await self.tile_response(response, endpoint)
 
-        logging.error("Timeout error after 5 retries for search_item: {} from {}".format(endpoint[1], endpoint[0]))
-        return {'search_item': endpoint[1]}
+                # Read a json response
+                else:
+                    return await self.product_response(response, endpoint)
 
     async def tile_response(self, response, endpoint):
 
         # Get rate limit from header
         rate_limit = self._parse_rate_limit(response.headers)
+        self._update_rate_limit(rate_limit)
 
         if response.status != 200 and response.status != 500:
             raise self._network_error(self.options, rate_limit,
@@ -149,7 +414,10 @@ class Http:
                 "are correct: {}".format(endpoint[1]))
             return {"coordinate": endpoint[1], "image": None, 'valid_id': False}
 
-        body = await response.read()
+        with self.instrumentation.time('body_read'):
+            body = await response.read()
+
+        self._count('fsf_received_bytes_total', endpoint, value=len(body))
 
         return {"coordinate": endpoint[1], "image": body}
 
@@ -157,8 +425,16 @@ class Http:
 
         # Get rate limit from header
         rate_limit = self._parse_rate_limit(response.headers)
+        self._update_rate_limit(rate_limit)
 
-        body = await response.json(content_type=None)
+        with self.instrumentation.time('body_read'):
+            data = await response.read()
+
+        self._count('fsf_received_bytes_total', endpoint, value=len(data))
+
+        # An empty body is read as None, as by ClientResponse.json
+        with self.instrumentation.time('json_decode'):
+            body = json.loads(data) if data.strip() else None
 
         try:
             if response.status != 200 and response.status != 404 and response.status != 500:
@@ -201,6 +477,38 @@ class Http:
 
         return body
 
+    def _update_rate_limit(self, rate_limit):
+        """Feeds the rate limit information to the rate limiter if it adapts to it
+        Args:
+            rate_limit (dict): The rate limit information
+        """
+        update = getattr(self._throttler, 'update', None)
+        if update is not None:
+            update(rate_limit)
+
+        if self.metrics is not None and rate_limit.get('remaining') is not None:
+            try:
+                self.metrics.set('fsf_ratelimit_remaining', float(rate_limit['remaining']))
+            except ValueError:
+                pass
+
+    def _count(self, name, endpoint=None, value=1, **labels):
+        """Adds to a counter of the metrics, if any, labelled with the product of the endpoint
+        Args:
+            name (str): The name of the counter
+            endpoint (tuple/None): The endpoint the sample is about
+            value (int): The amount to add
+            labels: The other labels of the sample
+        """
+
+        if self.metrics is None:
+            return
+
+        if endpoint is not None:
+            labels['product'] = "{}/{}".format(endpoint[2], endpoint[3])
+
+        self.metrics.inc(name, labels, value)
+
     @staticmethod
     def _parse_rate_limit(headers):
         """Parses the rate limit form the header
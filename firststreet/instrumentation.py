@@ -0,0 +1,180 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import contextlib
+import time
+
+# The stages of a job, in the order they are reported
+STAGES = ('semaphore_wait', 'throttle_wait', 'ttfb', 'body_read', 'json_decode', 'model', 'format', 'write')
+
+
+class Histogram:
+    """A latency histogram in the style of HdrHistogram. Values are counted in buckets whose width grows with the
+        value, so every value is kept within a fixed relative precision while the memory used does not grow with the
+        number of values. The values are recorded in microseconds.
+
+        Attributes:
+            significant_bits (int): The bits of precision kept for each value. 7 bits keep values within 1%
+            count (int): The number of values recorded
+            total (int): The sum of the values recorded
+            min (int/None): The smallest value recorded
+            max (int/None): The largest value recorded
+        Methods:
+            record: Counts a value
+            percentile: Returns the value at a percentile
+            merge: Adds the counts of another histogram
+        """
+
+    def __init__(self, significant_bits=7):
+        self.significant_bits = significant_bits
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+        self._half = 1 << (significant_bits - 1)
+        self._counts = {}
+
+    def record(self, value):
+        """Counts a value
+        Args:
+            value (int): The value in microseconds
+        """
+
+        value = max(int(value), 0)
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + 1
+
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percentile):
+        """Returns the value at a percentile
+        Args:
+            percentile (float): The percentile, between 0 and 100
+        Returns:
+            The highest value in the bucket of the percentile, or 0 if nothing was recorded
+        """
+
+        if not self.count:
+            return 0
+
+        rank = max(1, -(-self.count * percentile // 100))
+
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                return min(self._highest(index), self.max)
+
+        return self.max
+
+    def merge(self, other):
+        """Adds the counts of another histogram of the same precision
+        Args:
+            other (Histogram): The histogram to add
+        """
+
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def _index(self, value):
+        # Values below 2 ** significant_bits have a bucket each, then each power of two is split into half as many
+        shift = max(value.bit_length() - self.significant_bits, 0)
+        return shift * self._half + (value >> shift)
+
+    def _highest(self, index):
+        shift = max(index // self._half - 1, 0)
+        return ((index - shift * self._half + 1) << shift) - 1
+
+
+class Instrumentation:
+    """Times each stage of a job into latency histograms, to tell whether a slow job is bound by the network, the
+        throttling, the JSON decoding, the model construction or the csv output. The request stages are recorded per
+        request, and the model, format and write stages per product call.
+
+        Attributes:
+            histograms (dict): The Histogram of each stage
+        Methods:
+            record: Records the duration of a stage
+            time: Times a block as a stage
+            summary: Returns the count and latency percentiles of each stage
+            report: Returns the summary as a table
+            reset: Clears every histogram
+        """
+
+    def __init__(self):
+        self.histograms = {}
+
+    def record(self, stage, seconds):
+        """Records the duration of a stage
+        Args:
+            stage (str): The stage, such as ttfb
+            seconds (float): The duration in seconds
+        """
+
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+
+        histogram.record(seconds * 1000000)
+
+    @contextlib.contextmanager
+    def time(self, stage):
+        """Times the block as a stage
+        Args:
+            stage (str): The stage, such as json_decode
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def summary(self):
+        """Returns the count and latency percentiles of each stage
+        Returns:
+            A dict of stage to a dict of the count, and the total, mean, p50, p90, p99 and max in milliseconds
+        """
+
+        stages = [stage for stage in STAGES if stage in self.histograms]
+        stages += sorted(stage for stage in self.histograms if stage not in STAGES)
+
+        summary = {}
+        for stage in stages:
+            histogram = self.histograms[stage]
+            summary[stage] = {'count': histogram.count,
+                              'total_ms': histogram.total / 1000,
+                              'mean_ms': histogram.total / histogram.count / 1000 if histogram.count else 0.0,
+                              'p50_ms': histogram.percentile(50) / 1000,
+                              'p90_ms': histogram.percentile(90) / 1000,
+                              'p99_ms': histogram.percentile(99) / 1000,
+                              'max_ms': (histogram.max or 0) / 1000}
+
+        return summary
+
+    def report(self):
+        """Returns the summary as a table with a line per stage"""
+
+        lines = ["{:<16}{:>10}{:>12}{:>10}{:>10}{:>10}{:>10}{:>10}".format(
+            "stage", "count", "total_ms", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")]
+
+        for stage, values in self.summary().items():
+            lines.append("{:<16}{:>10}{:>12.1f}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.2f}".format(
+                stage, values['count'], values['total_ms'], values['mean_ms'], values['p50_ms'], values['p90_ms'],
+                values['p99_ms'], values['max_ms']))
+
+        return "\n".join(lines)
+
+    def reset(self):
+        self.histograms.clear()
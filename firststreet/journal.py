@@ -0,0 +1,146 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import json
+import logging
+import os
+import pathlib
+
+# Internal Imports
+from firststreet.cache import cache_key
+
+
+def is_complete(endpoint, result):
+    """Only the endpoints the API answered are journaled. A request that failed after its retries carries a
+    search_item key and is made again on resume. Tiles are images and are not journaled
+
+    Args:
+        endpoint (tuple): The endpoint built by Api.call_api
+        result (dict): The result of a fetch
+    Returns:
+        If the result can be journaled
+    """
+    return endpoint[2] != 'tile' and isinstance(result, dict) and 'search_item' not in result
+
+
+class Journal:
+    """An append-only on-disk journal of the completed endpoints and their decoded bodies, so a long job that died can
+        be run again with resume=True without calling the API again for the endpoints it completed. The completed
+        endpoints are replayed from the journal into the results, in input order. Each line holds the key of an
+        endpoint and its body, and only the offsets of the lines are kept in memory. A line left incomplete by a crash
+        is dropped on resume.
+
+        Attributes:
+            path (str): The journal file
+            resume (bool): To replay the entries of an existing journal. Otherwise the journal is started over
+            fsync (bool): To fsync each entry so it also survives a power loss or a reboot, at the cost of throughput
+            replayed (int): The number of responses replayed from the journal
+            recorded (int): The number of responses added to the journal
+        Methods:
+            get: Returns the journaled body for an endpoint, if any
+            record: Appends the body of a completed endpoint
+            close: Closes the journal
+        Example:
+        ```python
+            journal = Journal("depth.journal", resume=True)
+            fs = firststreet.FirstStreet(api_key, journal=journal)
+            fs.probability.get_depth("fsids.txt", csv=True)
+        ```
+        """
+
+    def __init__(self, path, resume=False, fsync=False):
+        path = pathlib.Path(path)
+        if not os.path.exists(path.parent):
+            os.makedirs(path.parent)
+
+        self.path = str(path)
+        self.resume = resume
+        self.fsync = fsync
+        self.replayed = 0
+        self.recorded = 0
+
+        self._offsets = {}
+        self._reader = None
+
+        if resume and os.path.exists(self.path):
+            self._load()
+            logging.info("Resuming from the journal '{}' with {} completed requests".format(self.path,
+                                                                                            len(self._offsets)))
+
+        self._file = open(self.path, "ab" if resume else "wb")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def get(self, endpoint, version):
+        """Returns the journaled body for the endpoint
+        Args:
+            endpoint (tuple): The endpoint built by Api.call_api
+            version (str): The version of the API
+        Returns:
+            The decoded JSON body, or None if the endpoint was not completed
+        """
+
+        offset = self._offsets.get(cache_key(endpoint, version))
+        if offset is None:
+            return None
+
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+
+        self._reader.seek(offset)
+        _, _, body = self._reader.readline().partition(b"\t")
+        self.replayed += 1
+
+        return json.loads(body)
+
+    def record(self, endpoint, version, body):
+        """Appends the body of a completed endpoint to the journal
+        Args:
+            endpoint (tuple): The endpoint built by Api.call_api
+            version (str): The version of the API
+            body (dict): The decoded JSON body
+        """
+
+        if not is_complete(endpoint, body):
+            return
+
+        key = cache_key(endpoint, version)
+        if key in self._offsets:
+            return
+
+        # JSON escapes tabs and newlines, so the first tab ends the key and each entry is a single line
+        line = "{}\t{}\n".format(json.dumps(key), json.dumps(body, separators=(',', ':'))).encode()
+
+        offset = self._file.tell()
+        self._file.write(line)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+        self._offsets[key] = offset
+        self.recorded += 1
+
+    def close(self):
+        self._file.close()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _load(self):
+        """Indexes the lines of an existing journal, and cuts off a last line left incomplete by a crash"""
+
+        offset = 0
+        with open(self.path, "rb") as fp:
+            for line in fp:
+                if not line.endswith(b"\n"):
+                    break
+
+                key, _, _ = line.partition(b"\t")
+                self._offsets[json.loads(key)] = offset
+                offset += len(line)
+
+        if offset < os.path.getsize(self.path):
+            logging.warning("Dropped an incomplete entry at the end of the journal '{}'".format(self.path))
+            os.truncate(self.path, offset)
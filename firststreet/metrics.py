@@ -0,0 +1,189 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import http.server
+import logging
+import os
+import threading
+
+# The metrics of the client: (name, type, help)
+METRICS = (
+    ('fsf_requests_total', 'counter', "The responses received from the API, by product and status"),
+    ('fsf_errors_total', 'counter', "The 4xx and 5xx responses received from the API, by product and status class"),
+    ('fsf_retries_total', 'counter', "The requests retried, by product and reason"),
+    ('fsf_failures_total', 'counter', "The requests that failed after all of their retries, by product"),
+    ('fsf_cache_hits_total', 'counter', "The requests answered without calling the API, by cache"),
+    ('fsf_received_bytes_total', 'counter', "The bytes of the response bodies received, by product"),
+    ('fsf_ratelimit_remaining', 'gauge', "The last x-ratelimit-remaining header received"),
+)
+
+
+def escape_label(value):
+    """Escapes a label value for the Prometheus text format
+
+    Args:
+        value (object): The label value
+    Returns:
+        The escaped string
+    """
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Metrics:
+    """A registry of the counters and gauges of the client, exported in the Prometheus text format from a small HTTP
+        endpoint or to a file read by the textfile collector of node_exporter. It counts the requests and the 4xx and
+        5xx responses by product, the retries, the failures, the cache hits and the bytes received, and keeps the last
+        x-ratelimit-remaining header. The samples can be updated from the event loop while being exported from
+        another thread.
+
+        Attributes:
+            samples (dict): The value of each metric, keyed by name and then by the sorted label pairs
+        Methods:
+            inc: Adds to a counter
+            set: Sets a gauge
+            get: Returns the value of a sample
+            render: Returns the metrics in the Prometheus text format
+            write: Writes the metrics to a file
+            serve: Serves the metrics over HTTP from a background thread
+            export: Writes the metrics to a file at an interval from a background thread
+            close: Stops the HTTP endpoint and the file export
+        Example:
+        ```python
+            metrics = Metrics()
+            metrics.serve(9464)
+            fs = firststreet.FirstStreet(api_key, metrics=metrics)
+        ```
+        """
+
+    def __init__(self):
+        self.samples = {name: {} for name, _, _ in METRICS}
+
+        self._lock = threading.Lock()
+        self._server = None
+        self._stop = threading.Event()
+        self._exporter = None
+
+    def inc(self, name, labels=None, value=1):
+        """Adds to a counter
+        Args:
+            name (str): The name of the metric
+            labels (dict/None): The labels of the sample
+            value (int/float): The amount to add
+        """
+
+        key = tuple(sorted(labels.items())) if labels else ()
+
+        with self._lock:
+            samples = self.samples[name]
+            samples[key] = samples.get(key, 0) + value
+
+    def set(self, name, value, labels=None):
+        """Sets a gauge
+        Args:
+            name (str): The name of the metric
+            value (int/float): The value
+            labels (dict/None): The labels of the sample
+        """
+
+        key = tuple(sorted(labels.items())) if labels else ()
+
+        with self._lock:
+            self.samples[name][key] = value
+
+    def get(self, name, labels=None):
+        """Returns the value of a sample, or 0 if it was never recorded"""
+        return self.samples[name].get(tuple(sorted(labels.items())) if labels else (), 0)
+
+    def render(self):
+        """Returns the metrics in the Prometheus text format
+        Returns:
+            The text of every metric
+        """
+
+        lines = []
+        with self._lock:
+            for name, kind, description in METRICS:
+                lines.append("# HELP {} {}".format(name, description))
+                lines.append("# TYPE {} {}".format(name, kind))
+
+                for key, value in sorted(self.samples[name].items()):
+                    labels = ",".join('{}="{}"'.format(label, escape_label(text)) for label, text in key)
+                    lines.append("{}{} {}".format(name, "{" + labels + "}" if labels else "", value))
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Writes the metrics to a file. The file is replaced at once so a reader never sees a partial file
+        Args:
+            path (str): The file to write
+        """
+
+        temp = "{}.tmp".format(path)
+        with open(temp, "w") as fp:
+            fp.write(self.render())
+
+        os.replace(temp, path)
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Serves the metrics on /metrics from a background thread
+        Args:
+            port (int): The port to listen on. 0 picks a free port
+            host (str): The address to listen on
+        Returns:
+            The port listened on
+        """
+
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logging.debug(format % args)
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        logging.info("Serving metrics on http://{}:{}/metrics".format(host, self._server.server_port))
+
+        return self._server.server_port
+
+    def export(self, path, interval=15):
+        """Writes the metrics to a file every interval seconds from a background thread, and once more on close
+        Args:
+            path (str): The file to write
+            interval (float): The time between writes in seconds
+        """
+
+        def run():
+            while not self._stop.wait(interval):
+                self.write(path)
+
+            self.write(path)
+
+        self._stop.clear()
+        self._exporter = threading.Thread(target=run, daemon=True)
+        self._exporter.start()
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+        if self._exporter is not None:
+            self._stop.set()
+            self._exporter.join()
+            self._exporter = None
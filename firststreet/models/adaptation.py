@@ -13,6 +13,8 @@ class AdaptationDetail(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('adaptationId', 'name', 'type', 'scenario', 'conveyance', 'returnPeriod', 'serving', 'geometry')
+
     def __init__(self, response):
         super().__init__(response)
         self.adaptationId = str(response.get('adaptationId'))
@@ -32,6 +34,8 @@ class AdaptationSummary(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'adaptation', 'properties')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
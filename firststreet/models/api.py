@@ -3,12 +3,19 @@
 
 
 class Api:
-    """Creates an Api interface given a response
+    """Creates an Api interface given a response. The models declare their attributes in __slots__ so millions of
+    results do not each carry a __dict__. The fields are enumerated in the order they are set by to_dict
 
     Args:
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('valid_id', 'error')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(name for klass in reversed(cls.__mro__) for name in klass.__dict__.get('__slots__', ()))
+
     def __init__(self, response):
         if response.get('valid_id') is not None:
             self.valid_id = response.get('valid_id')
@@ -19,3 +26,15 @@ class Api:
             self.error = response.get('error')
         else:
             self.error = None
+
+    def to_dict(self):
+        """Returns the fields of the object, in place of vars() which slotted objects do not support
+
+        Returns:
+            A dict of the fields that are set
+        """
+
+        return {name: getattr(self, name) for name in self._fields if hasattr(self, name)}
+
+
+Api._fields = Api.__slots__
@@ -12,6 +12,8 @@ class AALSummary(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'annual_loss')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -25,6 +27,8 @@ class AALSummaryProperty(AALSummary):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('depth_loss',)
+
     def __init__(self, response):
         super().__init__(response)
         self.depth_loss = response.get('depthLoss')
@@ -37,6 +41,8 @@ class AALSummaryOther(AALSummary):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ()
+
     def __init__(self, response):
         super().__init__(response)
 
@@ -48,6 +54,8 @@ class AVMProperty(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'avm', 'provider_id')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -62,6 +70,8 @@ class AVMProvider(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('provider_id', 'provider_name', 'provider_logo')
+
     def __init__(self, response):
         super().__init__(response)
         self.provider_id = response.get('providerID')
@@ -76,6 +86,8 @@ class NFIPPremium(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'data')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get("fsid"))
@@ -12,6 +12,8 @@ class EnvironmentalPrecipitation(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'projected')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get("fsid"))
@@ -12,6 +12,9 @@ class FemaNfip(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'claimCount', 'policyCount', 'buildingPaid', 'contentPaid', 'buildingCoverage',
+                 'contentCoverage', 'iccPaid')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -0,0 +1,98 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Internal Imports
+from firststreet.api.flatten import probability_columns
+
+# The yearly records of the probability products, flattened to one row per record: (attribute, key, bins)
+PROBABILITY_RECORDS = {
+    'chance': ('chance', 'threshold', False),
+    'count': ('count', 'returnPeriod', True),
+    'cumulative': ('cumulative', 'threshold', False),
+    'depth': ('depth', 'returnPeriod', False),
+}
+
+
+class ProductFrame:
+    """A columnar container of the results of a product, decoded straight from the responses without creating a model
+        object per search item. The yearly records of the probability chance, count, cumulative and depth products
+        are flattened to one row per record. Other products get one row per search item, with nested objects
+        flattened into dotted columns such as city.name. The columns use the pandas nullable dtypes.
+
+        Attributes:
+            product (str): The overall product
+            product_subtype (str): The product subtype
+            location_type (str/None): The location lookup type (if suitable)
+            df (DataFrame): The columns of the results
+        Methods:
+            from_responses: Decodes a list of JSON responses into a ProductFrame
+            to_pandas: Returns the DataFrame
+        Example:
+        ```python
+            depth = fs.probability.get_depth([390000257, 390000439], as_frame=True)
+            depth["mid"]
+            depth.to_pandas().groupby("returnPeriod")["mid"].mean()
+        ```
+        """
+
+    def __init__(self, df, product, product_subtype, location_type=None):
+        self.df = df
+        self.product = product
+        self.product_subtype = product_subtype
+        self.location_type = location_type
+
+    def __len__(self):
+        return len(self.df)
+
+    def __getitem__(self, column):
+        """Returns a column as an array"""
+        return self.df[column].array
+
+    def __repr__(self):
+        return "<ProductFrame {}/{}: {} rows x {} columns>".format(self.product, self.product_subtype,
+                                                                   len(self.df), len(self.df.columns))
+
+    @property
+    def columns(self):
+        return list(self.df.columns)
+
+    @classmethod
+    def from_responses(cls, responses, product, product_subtype, location_type=None):
+        """Decodes a list of JSON responses into a ProductFrame
+
+        Args:
+            responses (list): The JSON responses returned by Api.call_api
+            product (str): The overall product
+            product_subtype (str): The product subtype
+            location_type (str/None): The location lookup type (if suitable)
+        Returns:
+            A ProductFrame
+        """
+
+        # pandas is only loaded by the calls that ask for a frame
+        import pandas as pd
+
+        responses = list(responses)
+
+        if product == 'probability' and product_subtype in PROBABILITY_RECORDS:
+            attribute, key, bins = PROBABILITY_RECORDS[product_subtype]
+            items = ((response.get('fsid'), response.get('valid_id', True) is not False, response.get('error'),
+                      response.get(attribute)) for response in responses)
+            columns = probability_columns(items, key, bins)
+
+            df = pd.DataFrame({name: pd.array(values) if values else pd.array([], dtype=object)
+                               for name, values in columns.items()})
+
+        else:
+            df = pd.json_normalize(responses) if responses else pd.DataFrame()
+            df = df.convert_dtypes()
+
+            # Responses of valid search items do not carry the valid_id and error fields
+            df['valid_id'] = df['valid_id'].fillna(True).astype('boolean') if 'valid_id' in df else True
+            if 'error' not in df:
+                df['error'] = pd.NA
+
+        return cls(df, product, product_subtype, location_type)
+
+    def to_pandas(self):
+        return self.df
@@ -1,26 +1,41 @@
 # Author: Kelvin Lai <kelvin@firststreet.org>
 # Copyright: This module is owned by First Street Foundation
 
-# External Imports
-from shapely.geometry import shape
-
-
 class Geometry:
-    """Creates a Geometry object given a response
+    """Creates a Geometry object given a response. The raw GeoJSON is kept and the polygon, center and bbox shapes are
+    only built on first access, then cached. A Geometry made from an empty response has none of the three attributes
 
     Args:
         geometry (dict): A dict of geometry
     """
 
+    __slots__ = ('geojson', '_shapes')
+
+    _shape_keys = ('polygon', 'center', 'bbox')
+
     def __init__(self, geometry):
+        self.geojson = geometry or None
+        self._shapes = {}
 
-        if geometry:
-            self.polygon = shape(geometry.get('polygon')) if geometry.get('polygon') else None
-            self.center = shape(geometry.get('center'))
-            if geometry.get('bbox'):
-                self.bbox = shape(geometry.get('bbox'))
+    def __getattr__(self, name):
+        # Only called for names that are not slots, such as the shapes
+        if name not in self._shape_keys or not self.geojson:
+            raise AttributeError("'Geometry' object has no attribute '{}'".format(name))
+
+        shapes = self._shapes
+        if name not in shapes:
+            # shapely is only loaded once a shape is built
+            from shapely.geometry import shape
+
+            geojson = self.geojson.get(name)
+
+            # The center is always present, the polygon and bbox may be missing
+            if name == 'center':
+                shapes[name] = shape(geojson)
             else:
-                self.bbox = None
+                shapes[name] = shape(geojson) if geojson else None
+
+        return shapes[name]
 
     def __eq__(self, other):
         if not isinstance(other, Geometry):
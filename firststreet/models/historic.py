@@ -13,6 +13,8 @@ class HistoricEvent(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('eventId', 'name', 'month', 'year', 'returnPeriod', 'type', 'properties', 'geometry')
+
     def __init__(self, response):
         super().__init__(response)
         self.eventId = str(response.get('eventId'))
@@ -32,6 +34,8 @@ class HistoricSummary(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'historic')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -13,6 +13,8 @@ class LocationDetail(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid',)
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = response.get('fsid')
@@ -25,6 +27,10 @@ class LocationDetailProperty(LocationDetail):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('streetNumber', 'route', 'city', 'zipCode', 'zcta', 'neighborhood', 'tract', 'county', 'cd', 'state',
+                 'footprintId', 'elevation', 'fema', 'floorElevation', 'building', 'floodType', 'residential',
+                 'geometry')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -58,6 +64,8 @@ class LocationDetailNeighborhood(LocationDetail):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('city', 'subtype', 'county', 'state', 'geometry', 'name')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -79,6 +87,8 @@ class LocationDetailCity(LocationDetail):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('lsad', 'zcta', 'neighborhood', 'county', 'state', 'geometry', 'name')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -98,6 +108,8 @@ class LocationDetailZcta(LocationDetail):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('city', 'county', 'state', 'geometry', 'name')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -115,6 +127,8 @@ class LocationDetailTract(LocationDetail):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fips', 'county', 'state', 'geometry')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -131,6 +145,8 @@ class LocationDetailCounty(LocationDetail):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('name', 'city', 'zcta', 'fips', 'isCoastal', 'cd', 'state', 'geometry')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -155,6 +171,8 @@ class LocationDetailCd(LocationDetail):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('county', 'congress', 'state', 'geometry', 'district')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -172,6 +190,8 @@ class LocationDetailState(LocationDetail):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fips', 'geometry', 'name')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -187,6 +207,8 @@ class LocationSummary(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'riskDirection', 'environmentalRisk', 'historic', 'adaptation')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -203,6 +225,8 @@ class LocationSummaryProperty(LocationSummary):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('floodFactor',)
+
     def __init__(self, response):
         super().__init__(response)
         self.floodFactor = response.get('floodFactor')
@@ -215,6 +239,8 @@ class LocationSummaryOther(LocationSummary):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('properties',)
+
     def __init__(self, response):
         super().__init__(response)
         self.properties = response.get('properties')
@@ -12,6 +12,8 @@ class ProbabilityChance(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'chance')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -25,6 +27,8 @@ class ProbabilityCount(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'count')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -38,6 +42,8 @@ class ProbabilityCountSummary(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'state', 'city', 'zcta', 'neighborhood', 'tract', 'county', 'cd')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -71,6 +77,8 @@ class ProbabilityCumulative(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'cumulative')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
@@ -84,6 +92,8 @@ class ProbabilityDepth(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('fsid', 'depth')
+
     def __init__(self, response):
         super().__init__(response)
         self.fsid = str(response.get('fsid'))
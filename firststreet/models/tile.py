@@ -12,6 +12,8 @@ class Tile(Api):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('coordinate', 'image')
+
     def __init__(self, response):
         super().__init__(response)
         self.coordinate = response.get('coordinate')
@@ -25,6 +27,8 @@ class ProbabilityDepthTile(Tile):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('year', 'return_period')
+
     def __init__(self, response, year, return_period):
         super().__init__(response)
         self.year = year
@@ -38,6 +42,8 @@ class HistoricEventTile(Tile):
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('event_id',)
+
     def __init__(self, response, event_id):
         super().__init__(response)
         self.event_id = str(event_id)
@@ -0,0 +1,342 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import asyncio
+import contextlib
+import hashlib
+import logging
+import mmap
+import os
+import pathlib
+import struct
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows locks the state file with msvcrt instead
+    fcntl = None
+    import msvcrt
+
+# Epoch seconds are far larger than any reset window, which tells the two header formats apart
+EPOCH_THRESHOLD = 10 ** 9
+
+DEFAULT_BUCKET_DIR = pathlib.Path.home() / ".firststreet"
+
+# The lock is only held for a few microseconds, so a busy lock is polled rather than waited on
+LOCK_RETRY = 0.001
+
+
+def bucket_path(api_key=None):
+    """The default state file of a SharedRateLimiter. Each API key has its own quota, so the file is named by a hash
+        of the key, keeping the key itself off the disk
+
+    Args:
+        api_key (str/None): The API key the bucket limits
+    Returns:
+        The path of the state file
+    """
+
+    if api_key is None:
+        return DEFAULT_BUCKET_DIR / "rate_limit.bucket"
+
+    return DEFAULT_BUCKET_DIR / "rate_limit_{}.bucket".format(hashlib.sha256(api_key.encode()).hexdigest()[:16])
+
+
+class AdaptiveRateLimiter:
+    """A token bucket rate limiter that is continuously tuned by the x-ratelimit headers returned by the API. It is
+        used by Http in place of the static throttler. The refill rate starts at rate_limit / rate_period and is then
+        set to spread the remaining quota over the time left until the reset, so unused quota is spent and the bucket
+        slows down before the quota runs out.
+
+        Attributes:
+            rate_limit (int): The max number of requests during the period, used until the first header is seen
+            rate_period (int): The period of time for the limit
+            burst (int): The max number of tokens the bucket can hold
+            safety (float): The fraction of the remaining quota the limiter is allowed to plan with
+            min_rate (float): The lowest refill rate in requests per second
+            max_rate (float/None): The highest refill rate in requests per second, or None for no cap
+        Methods:
+            acquire: Waits until a token is available and takes it
+            update: Adjusts the refill rate from the rate limit headers of a response
+        """
+
+    def __init__(self, rate_limit, rate_period, burst=None, safety=0.9, min_rate=0.1, max_rate=None):
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.burst = burst or max(1, int(rate_limit / rate_period))
+        self.safety = safety
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+
+        self._rate = self._bound(rate_limit / rate_period)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+
+    @property
+    def rate(self):
+        """The current refill rate in requests per second"""
+        return self._rate
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._in_flight -= 1
+
+    async def acquire(self):
+        """Waits until a token is available, then takes it"""
+
+        while True:
+            now = time.monotonic()
+
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+
+            self._refill(now)
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._in_flight += 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def update(self, rate_limit):
+        """Adjusts the bucket from the rate limit information of a response
+        Args:
+            rate_limit (dict): The rate limit information parsed from the header by Http._parse_rate_limit
+        """
+
+        remaining = self._to_float(rate_limit.get('remaining'))
+        reset = self._to_float(rate_limit.get('reset'))
+
+        if remaining is None or reset is None:
+            return
+
+        now = time.monotonic()
+        self._refill(now)
+
+        reset_in = reset - time.time() if reset > EPOCH_THRESHOLD else reset
+        reset_in = max(reset_in, 0.0)
+
+        # Requests already sent are not reflected in the header yet, apart from the one whose response carries it
+        available = remaining - max(self._in_flight - 1, 0)
+
+        if available <= 0:
+            self._tokens = 0.0
+            self._blocked_until = now + reset_in
+            logging.debug("Rate limit quota exhausted. Waiting {:.2f}s for the reset".format(reset_in))
+            return
+
+        self._rate = self._bound(available * self.safety / max(reset_in, 1.0))
+        self._tokens = min(self._tokens, available * self.safety)
+
+    def _refill(self, now):
+        self._tokens = min(float(self.burst), self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+    def _bound(self, rate):
+        rate = max(rate, self.min_rate)
+        if self.max_rate is not None:
+            rate = min(rate, self.max_rate)
+
+        return rate
+
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+
+class SharedRateLimiter:
+    """A token bucket shared by every process on the host that uses the same state file, so several FirstStreet
+        instances, cron jobs or sharded workers calling the API with one key stay within its rate limit together. The
+        tokens live in a small memory-mapped file and each change is made under an exclusive file lock, which is
+        polled without blocking so the event loop keeps running while another process holds it. A response reporting
+        an exhausted quota pauses every process until the reset. The default state file is named by the api_key, so
+        jobs on different keys do not throttle each other. Use the same rate_limit and rate_period in every process.
+
+        Attributes:
+            rate_limit (int): The max number of requests during the period, across all processes
+            rate_period (int): The period of time for the limit
+            path (str): The state file of the bucket
+            api_key (str/None): The API key the bucket limits, which names the default state file
+            burst (int): The max number of tokens the bucket can hold
+        Methods:
+            acquire: Waits until a token is available and takes it
+            update: Pauses every process until the reset when the rate limit headers report an exhausted quota
+            close: Closes the state file
+        Example:
+        ```python
+            fs = firststreet.FirstStreet(api_key, rate_limiter=SharedRateLimiter(4990, 60, api_key=api_key))
+        ```
+        """
+
+    # The tokens left, the time of the last refill and the time the bucket is blocked until
+    _state = struct.Struct("<ddd")
+
+    def __init__(self, rate_limit, rate_period, path=None, burst=None, api_key=None):
+        if path is None:
+            path = bucket_path(api_key)
+
+        path = pathlib.Path(path)
+        if not os.path.exists(path.parent):
+            os.makedirs(path.parent)
+
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.path = str(path)
+        self.burst = burst or max(1, int(rate_limit / rate_period))
+
+        self._rate = rate_limit / rate_period
+        self._file = None
+        self._map = None
+        self._pending_block = 0.0
+
+    @property
+    def rate(self):
+        """The refill rate in requests per second"""
+        return self._rate
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def acquire(self):
+        """Waits until a token is available in the shared bucket, then takes it"""
+
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return
+
+            await asyncio.sleep(wait)
+
+    def update(self, rate_limit):
+        """Blocks the shared bucket until the reset if the response reports an exhausted quota
+        Args:
+            rate_limit (dict): The rate limit information parsed from the header by Http._parse_rate_limit
+        """
+
+        remaining = AdaptiveRateLimiter._to_float(rate_limit.get('remaining'))
+        reset = AdaptiveRateLimiter._to_float(rate_limit.get('reset'))
+
+        if remaining is None or reset is None or remaining > 0:
+            return
+
+        now = time.time()
+        reset_at = reset if reset > EPOCH_THRESHOLD else now + reset
+
+        with self._locked() as state:
+            # Another process holds the lock, so the block is written with the next token taken
+            if state is None:
+                self._pending_block = max(self._pending_block, reset_at)
+            else:
+                self._write(0.0, now, max(state[2], reset_at))
+
+        logging.debug("Rate limit quota exhausted. Waiting {:.2f}s for the reset".format(max(reset_at - now, 0.0)))
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _take(self):
+        """Takes a token from the shared bucket
+        Returns:
+            0 if a token was taken, otherwise the time to wait in seconds before trying again
+        """
+
+        with self._locked() as state:
+            if state is None:
+                return LOCK_RETRY
+
+            tokens, last, blocked_until = state
+            now = time.time()
+
+            blocked_until = max(blocked_until, self._pending_block)
+            self._pending_block = 0.0
+
+            if now < blocked_until:
+                self._write(tokens, last, blocked_until)
+                return blocked_until - now
+
+            tokens = min(float(self.burst), tokens + max(now - last, 0.0) * self._rate)
+
+            if tokens >= 1:
+                self._write(tokens - 1, now, blocked_until)
+                return 0
+
+            self._write(tokens, now, blocked_until)
+            return (1 - tokens) / self._rate
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Holds the file lock and yields the state of the bucket, or yields None without waiting if another process
+            holds the lock
+        """
+
+        if self._file is None:
+            self._file = open(self.path, "a+b")
+
+        if not self._try_lock():
+            yield None
+            return
+
+        try:
+            if self._map is None:
+                self._map_state()
+
+            yield self._state.unpack_from(self._map)
+        finally:
+            self._unlock()
+
+    def _map_state(self):
+        """Maps the state file, creating a full bucket if the file is new. The file lock must be held"""
+
+        if os.fstat(self._file.fileno()).st_size < self._state.size:
+            self._file.truncate(0)
+            self._file.write(self._state.pack(float(self.burst), time.time(), 0.0))
+            self._file.flush()
+
+        self._map = mmap.mmap(self._file.fileno(), self._state.size)
+
+    def _write(self, tokens, last, blocked_until):
+        self._state.pack_into(self._map, 0, tokens, last, blocked_until)
+
+    def _try_lock(self):
+        """Takes the file lock if it is free
+        Returns:
+            True if the lock was taken, False if another process holds it
+        """
+
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+
+        return True
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
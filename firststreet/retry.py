@@ -0,0 +1,164 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import asyncio
+import datetime
+import email.utils
+import random
+import time
+from json.decoder import JSONDecodeError
+
+# Internal Imports
+from firststreet.rate_limiter import EPOCH_THRESHOLD
+
+
+class RetryableStatusError(Exception):
+    """Raised for a response whose status is retried by the retry policy
+
+    Args:
+        status (int): The status of the response
+        rate_limit (dict): The rate limit information parsed from the header
+        retry_after (str/None): The Retry-After header of the response
+    """
+
+    def __init__(self, status, rate_limit=None, retry_after=None):
+        super().__init__("Retryable status {}".format(status))
+        self.status = status
+        self.rate_limit = rate_limit or {}
+        self.retry_after = retry_after
+
+
+class RetryBudget:
+    """Caps the retries as a fraction of the requests made, so a degraded API cannot multiply the traffic sent to it.
+        Every request deposits ratio tokens and every retry withdraws one.
+
+        Attributes:
+            ratio (float): The fraction of requests that may be retried
+            min_retries (int): The retries allowed before any request has been made
+            max_tokens (int): The max number of retries that can be saved up
+        Methods:
+            deposit: Records a request
+            withdraw: Takes a retry from the budget if one is left
+        """
+
+    def __init__(self, ratio=0.2, min_retries=10, max_tokens=100):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.max_tokens = max(max_tokens, min_retries)
+        self._tokens = float(min_retries)
+
+    @property
+    def remaining(self):
+        """The number of retries left in the budget"""
+        return int(self._tokens)
+
+    def deposit(self):
+        self._tokens = min(float(self.max_tokens), self._tokens + self.ratio)
+
+    def withdraw(self):
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+
+        return False
+
+
+class RetryPolicy:
+    """Decides which failures are retried and how long to wait before each retry. The wait grows exponentially with
+        full jitter, unless the response says when to come back through Retry-After or x-ratelimit-reset.
+
+        Attributes:
+            max_retries (int): The max number of retries for a timeout or a malformed body
+            statuses (dict): The max number of retries for each retried response status
+            exceptions (tuple): The exceptions that are retried
+            backoff_base (float): The wait before the first retry in seconds
+            backoff_max (float): The longest wait in seconds
+            jitter (bool): To randomise the wait between zero and the backoff
+            respect_retry_after (bool): To wait as long as the Retry-After or x-ratelimit-reset header asks
+            budget (RetryBudget/None): The budget shared by all requests, or None for no budget
+        Methods:
+            record_request: Records a new request against the retry budget
+            retry_delay: Returns the wait before the next retry, or None if the failure is not retried
+        """
+
+    def __init__(self, max_retries=5, statuses=None, exceptions=(asyncio.TimeoutError, JSONDecodeError),
+                 backoff_base=0.5, backoff_max=60, jitter=True, respect_retry_after=True, budget=None):
+
+        if statuses is None:
+            statuses = {429: 8, 502: max_retries, 503: max_retries, 504: max_retries}
+
+        if budget is None:
+            budget = RetryBudget()
+
+        self.max_retries = max_retries
+        self.statuses = statuses
+        self.exceptions = exceptions
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.respect_retry_after = respect_retry_after
+        self.budget = budget
+
+    def record_request(self):
+        if self.budget:
+            self.budget.deposit()
+
+    def retry_delay(self, exception, attempt):
+        """Returns how long to wait before retrying after the given failure
+        Args:
+            exception (Exception): The failure of the attempt
+            attempt (int): The number of retries already made
+        Returns:
+            The wait in seconds, or None if the failure should not be retried
+        """
+
+        if isinstance(exception, RetryableStatusError):
+            max_retries = self.statuses.get(exception.status, 0)
+        elif isinstance(exception, self.exceptions):
+            max_retries = self.max_retries
+        else:
+            return None
+
+        if attempt >= max_retries or (self.budget and not self.budget.withdraw()):
+            return None
+
+        delay = self.backoff_base * 2 ** attempt
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        if self.respect_retry_after and isinstance(exception, RetryableStatusError):
+            requested = self._requested_delay(exception)
+            if requested is not None:
+                delay = requested + random.uniform(0, self.backoff_base) if self.jitter else requested
+
+        return min(delay, self.backoff_max)
+
+    @staticmethod
+    def _requested_delay(exception):
+        """Reads the wait requested by the server from Retry-After, then x-ratelimit-reset
+        Args:
+            exception (RetryableStatusError): The failure of the attempt
+        Returns:
+            The wait in seconds, or None if the server did not ask for one
+        """
+
+        if exception.retry_after:
+            try:
+                return max(float(exception.retry_after), 0.0)
+            except ValueError:
+                try:
+                    date = email.utils.parsedate_to_datetime(exception.retry_after)
+                    return max((date - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0.0)
+                except (TypeError, ValueError):
+                    pass
+
+        if exception.status == 429 and exception.rate_limit.get('reset'):
+            try:
+                reset = float(exception.rate_limit.get('reset'))
+            except ValueError:
+                return None
+
+            return max(reset - time.time() if reset > EPOCH_THRESHOLD else reset, 0.0)
+
+        return None
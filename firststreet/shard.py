@@ -0,0 +1,213 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import concurrent.futures
+import inspect
+import logging
+import multiprocessing
+import os
+import pathlib
+import shutil
+import tempfile
+
+# Internal Imports
+from firststreet.cache import ResponseCache
+from firststreet.errors import InvalidArgument
+from firststreet.journal import Journal
+from firststreet.rate_limiter import AdaptiveRateLimiter, SharedRateLimiter
+
+
+def split(items, shards):
+    """Splits the items into contiguous shards of near equal size, so concatenating the shards restores the input order
+
+    Args:
+        items (list): The items to split
+        shards (int): The number of shards
+    Returns:
+        A list of at most shards non-empty lists
+    """
+
+    size, extra = divmod(len(items), shards)
+
+    result = []
+    start = 0
+    for index in range(shards):
+        end = start + size + (1 if index < extra else 0)
+        if end > start:
+            result.append(items[start:end])
+        start = end
+
+    return result
+
+
+def worker_options(http, processes):
+    """The settings of the Http of each worker process. The connection and rate limits are divided between the workers
+    so together they stay within the limits of the API key
+
+    Args:
+        http (Http): The Http of the parent process
+        processes (int): The number of worker processes
+    Returns:
+        A dict of picklable settings used to rebuild an Http in a worker
+    """
+
+    options = {'api_key': http.api_key,
+               'connection_limit': max(1, http.connection_limit // processes),
+               'rate_limit': max(1, http.rate_limit // processes),
+               'rate_period': http.rate_period,
+               'version': http.version,
+               'url': http.options.get('url'),
+               'retry_policy': http.retry_policy,
+               'cache': None,
+               'adaptive': None,
+               'shared': None,
+               'log': False}
+
+    # The SQLite connection cannot be sent to a worker, it is reopened there on the same file
+    if isinstance(http.cache, ResponseCache):
+        options['cache'] = {'path': http.cache.path, 'ttl': http.cache.ttl, 'product_ttl': http.cache.product_ttl,
+                            'max_size': http.cache.max_size, 'compress_level': http.cache.compress_level}
+
+    # The x-ratelimit headers report the quota of the whole key, so each worker only plans with its share of it
+    limiter = http._throttler
+    if isinstance(limiter, AdaptiveRateLimiter):
+        options['adaptive'] = {'safety': limiter.safety / processes, 'min_rate': limiter.min_rate / processes,
+                               'max_rate': limiter.max_rate / processes if limiter.max_rate else None}
+
+    # A shared bucket already coordinates every process, so the workers use it with the full limits
+    elif isinstance(limiter, SharedRateLimiter):
+        options['shared'] = {'rate_limit': limiter.rate_limit, 'rate_period': limiter.rate_period,
+                             'path': limiter.path, 'burst': limiter.burst}
+
+    return options
+
+
+def worker_arguments(options):
+    """The arguments of the Http, or FirstStreet, of a worker process, rebuilt from the settings made by worker_options
+
+    Args:
+        options (dict): The settings made by worker_options
+    Returns:
+        A dict of keyword arguments
+    """
+
+    rate_limiter = None
+    if options['adaptive'] is not None:
+        rate_limiter = AdaptiveRateLimiter(options['rate_limit'], options['rate_period'], **options['adaptive'])
+    elif options['shared'] is not None:
+        rate_limiter = SharedRateLimiter(**options['shared'])
+
+    cache = ResponseCache(**options['cache']) if options['cache'] is not None else None
+
+    return {'api_key': options['api_key'], 'connection_limit': options['connection_limit'],
+            'rate_limit': options['rate_limit'], 'rate_period': options['rate_period'], 'version': options['version'],
+            'rate_limiter': rate_limiter, 'retry_policy': options['retry_policy'], 'cache': cache}
+
+
+def _run_product_shard(options, product, search_items, output_dir, chunk_size, kwargs, journal=None):
+    """Runs a product method on a shard of search items in a worker process, writing the results to its own csv
+
+    Args:
+        options (dict): The settings made by worker_options
+        product (str): The product method, such as probability.get_depth
+        search_items (list): The search items of the shard
+        output_dir (str): The directory of the csv of the worker
+        chunk_size (int/None): The number of search items pulled at once
+        kwargs (dict): The arguments of the product method. Arguments the method does not take are left out
+        journal (dict/None): The arguments of the journal of the worker
+    Returns:
+        The path of the csv, or None if nothing was written
+    """
+
+    # Imported here as the client imports the product modules, which import this module
+    from firststreet import FirstStreet
+    from firststreet.api.csv_format import CsvWriter
+
+    if journal is not None:
+        journal = Journal(**journal)
+
+    fs = FirstStreet(log=options['log'], journal=journal, **worker_arguments(options))
+    fs.http.options['url'] = options['url']
+
+    product_class, method_name = product.split(".")
+    method = getattr(getattr(fs, product_class), method_name)
+    parameters = inspect.signature(method).parameters
+    kwargs = {key: value for key, value in kwargs.items() if key in parameters}
+
+    chunk_size = chunk_size or len(search_items)
+
+    try:
+        with CsvWriter(output_dir) as writer:
+            for start in range(0, len(search_items), chunk_size):
+                method(search_items[start:start + chunk_size], csv=writer, output_dir=output_dir, **kwargs)
+
+    finally:
+        fs.close()
+        if fs.http.cache is not None:
+            fs.http.cache.close()
+        if journal is not None:
+            journal.close()
+
+    return str(writer.path) if writer.path else None
+
+
+def run_product(http, product, search_items, processes, output_dir=None, chunk_size=None, log=True, **kwargs):
+    """Splits the search items across worker processes that each pull a product, decode it, build the models and
+    format the csv of their shard with a share of the rate limit. The csv of each worker is then appended to one csv
+    in the order of the search items. With a journal on the Http, each worker keeps its own journal next to it, named
+    after the index of its shard, so resuming needs the same search items and number of processes
+
+    Args:
+        http (Http): The Http of the parent process
+        product (str): The product method, such as probability.get_depth
+        search_items (list): The search items to pull
+        processes (int): The number of worker processes
+        output_dir (str): The output directory to save the generated csv
+        chunk_size (int/None): The number of search items each worker pulls at once
+        log (bool): To log the outputs of the workers on info level
+        kwargs: The arguments of the product method, such as location_type or extra_param
+    Returns:
+        The path of the csv, or None if nothing was written
+    Raises:
+        InvalidArgument: If no search items are provided
+    """
+
+    from firststreet.api.csv_format import CsvWriter
+
+    if not search_items:
+        raise InvalidArgument("No search items provided")
+
+    shards = split(search_items, processes)
+    options = worker_options(http, len(shards))
+    options['log'] = log
+
+    if not output_dir:
+        output_dir = pathlib.Path(os.getcwd()) / "output_data"
+    os.makedirs(output_dir, exist_ok=True)
+
+    part_dir = tempfile.mkdtemp(prefix=".shards_", dir=output_dir)
+    part_dirs = [os.path.join(part_dir, str(index)) for index in range(len(shards))]
+
+    journals = [None] * len(shards)
+    if http.journal is not None:
+        journals = [{'path': "{}.{}".format(http.journal.path, index), 'resume': http.journal.resume,
+                     'fsync': http.journal.fsync} for index in range(len(shards))]
+
+    logging.info("Splitting {} search items across {} processes".format(len(search_items), len(shards)))
+
+    try:
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(max(1, len(shards)), mp_context=context) as pool:
+            parts = list(pool.map(_run_product_shard, [options] * len(shards), [product] * len(shards), shards,
+                                  part_dirs, [chunk_size] * len(shards), [kwargs] * len(shards), journals))
+
+        with CsvWriter(output_dir) as writer:
+            for part in parts:
+                if part is not None:
+                    writer.merge(part)
+
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    return writer.path
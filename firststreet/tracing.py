@@ -0,0 +1,235 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import asyncio
+
+# External Imports
+import aiohttp
+
+# Internal Imports
+from firststreet.instrumentation import Histogram
+
+
+class RequestTiming:
+    """The timings of one request, in seconds. A timing is None when the request skipped that phase, such as the DNS
+    lookup and connect of a request sent on a reused connection
+
+    Attributes:
+        url (str): The url of the request
+        host (str): The host of the request
+        status (int/None): The status of the response, or None if the request failed
+        error (Exception/None): The exception raised by the request
+        dns (float/None): The DNS resolution
+        dns_cached (bool): If the host was found in the DNS cache of the connector
+        queued (float/None): The wait for a free connection in the pool
+        connect (float/None): The creation of a new connection. For https it includes the TLS handshake, which
+            aiohttp does not signal on its own
+        reused (bool): If the request was sent on a pooled connection
+        send (float/None): From the start of the request until its headers were sent
+        ttfb (float/None): From the headers being sent until the response headers were received
+        total (float): From the start of the request until the response headers were received
+    """
+
+    __slots__ = ('url', 'host', 'status', 'error', 'dns', 'dns_cached', 'queued', 'connect', 'reused', 'send',
+                 'ttfb', 'total')
+
+    def __init__(self, url, host):
+        self.url = url
+        self.host = host
+        self.status = None
+        self.error = None
+        self.dns = None
+        self.dns_cached = False
+        self.queued = None
+        self.connect = None
+        self.reused = False
+        self.send = None
+        self.ttfb = None
+        self.total = None
+
+
+class HostStats:
+    """The timings of the requests to one host, aggregated into latency histograms
+
+    Attributes:
+        requests (int): The number of requests
+        errors (int): The number of requests that raised an exception
+        new_connections (int): The number of requests that opened a new connection
+        reused_connections (int): The number of requests sent on a pooled connection
+        dns_cache_hits (int): The number of lookups answered by the DNS cache of the connector
+        histograms (dict): The Histogram of each phase, in microseconds
+    Methods:
+        add: Adds the timings of a request
+        summary: Returns the counters, the reuse rate and the latency percentiles of each phase
+    """
+
+    phases = ('dns', 'queued', 'connect', 'send', 'ttfb', 'total')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.dns_cache_hits = 0
+        self.histograms = {phase: Histogram() for phase in self.phases}
+
+    def add(self, timing):
+        """Adds the timings of a request
+        Args:
+            timing (RequestTiming): The timings of the request
+        """
+
+        self.requests += 1
+        self.errors += timing.error is not None
+        self.new_connections += timing.connect is not None
+        self.reused_connections += timing.reused
+        self.dns_cache_hits += timing.dns_cached
+
+        for phase in self.phases:
+            value = getattr(timing, phase)
+            if value is not None:
+                self.histograms[phase].record(value * 1000000)
+
+    def summary(self):
+        """Returns the counters, the reuse rate and the latency percentiles of each phase
+        Returns:
+            A dict of the counters, the connection reuse rate, and the count, p50, p99 and max of each phase in
+            milliseconds
+        """
+
+        connections = self.new_connections + self.reused_connections
+
+        summary = {'requests': self.requests, 'errors': self.errors, 'new_connections': self.new_connections,
+                   'reused_connections': self.reused_connections, 'dns_cache_hits': self.dns_cache_hits,
+                   'reuse_rate': self.reused_connections / connections if connections else 0.0}
+
+        for phase, histogram in self.histograms.items():
+            summary[phase] = {'count': histogram.count,
+                              'p50_ms': histogram.percentile(50) / 1000,
+                              'p99_ms': histogram.percentile(99) / 1000,
+                              'max_ms': (histogram.max or 0) / 1000}
+
+        return summary
+
+
+class Tracer:
+    """Traces the DNS resolution, connection pool wait, connection creation or reuse, request send and time to first
+        byte of every request through the TraceConfig signals of aiohttp. The timings of each request are passed to
+        the callback, if any, and aggregated per host, so the connection_limit can be tuned from the pool reuse rate
+        and the connect and queue times.
+
+        Attributes:
+            callback (callable/None): Called with the RequestTiming of each request once its response headers are
+                received or it fails
+        Methods:
+            trace_config: Returns the aiohttp TraceConfig that feeds the tracer
+            stats: Returns the aggregated timings of each host
+            reset: Clears the aggregated timings
+        Example:
+        ```python
+            tracer = Tracer(callback=lambda timing: print(timing.host, timing.reused, timing.ttfb))
+            fs = firststreet.FirstStreet(api_key, tracer=tracer)
+            fs.probability.get_depth([390000257])
+            tracer.stats()["api.firststreet.org"]["reuse_rate"]
+        ```
+        """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.hosts = {}
+
+    def trace_config(self):
+        """Returns the TraceConfig to pass to the ClientSession
+        Returns:
+            An aiohttp TraceConfig
+        """
+
+        config = aiohttp.TraceConfig()
+
+        config.on_request_start.append(self._on_request_start)
+        config.on_dns_resolvehost_start.append(self._on_dns_start)
+        config.on_dns_resolvehost_end.append(self._on_dns_end)
+        config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        config.on_connection_queued_start.append(self._on_queued_start)
+        config.on_connection_queued_end.append(self._on_queued_end)
+        config.on_connection_create_start.append(self._on_connect_start)
+        config.on_connection_create_end.append(self._on_connect_end)
+        config.on_connection_reuseconn.append(self._on_connection_reused)
+        config.on_request_end.append(self._on_request_end)
+        config.on_request_exception.append(self._on_request_exception)
+
+        # Added in aiohttp 3.8. Without it the time to first byte is measured from the start of the request
+        if hasattr(config, 'on_request_headers_sent'):
+            config.on_request_headers_sent.append(self._on_headers_sent)
+
+        return config
+
+    def stats(self):
+        """Returns the aggregated timings of each host
+        Returns:
+            A dict of host to the summary of its HostStats
+        """
+        return {host: stats.summary() for host, stats in self.hosts.items()}
+
+    def reset(self):
+        self.hosts.clear()
+
+    @staticmethod
+    def _now():
+        return asyncio.get_running_loop().time()
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.timing = RequestTiming(str(params.url), params.url.host)
+        ctx.start = self._now()
+        ctx.sent = None
+
+    async def _on_dns_start(self, session, ctx, params):
+        ctx.dns_start = self._now()
+
+    async def _on_dns_end(self, session, ctx, params):
+        ctx.timing.dns = self._now() - ctx.dns_start
+
+    async def _on_dns_cache_hit(self, session, ctx, params):
+        ctx.timing.dns_cached = True
+
+    async def _on_queued_start(self, session, ctx, params):
+        ctx.queued_start = self._now()
+
+    async def _on_queued_end(self, session, ctx, params):
+        ctx.timing.queued = self._now() - ctx.queued_start
+
+    async def _on_connect_start(self, session, ctx, params):
+        ctx.connect_start = self._now()
+
+    async def _on_connect_end(self, session, ctx, params):
+        ctx.timing.connect = self._now() - ctx.connect_start
+
+    async def _on_connection_reused(self, session, ctx, params):
+        ctx.timing.reused = True
+
+    async def _on_headers_sent(self, session, ctx, params):
+        ctx.sent = self._now()
+        ctx.timing.send = ctx.sent - ctx.start
+
+    async def _on_request_end(self, session, ctx, params):
+        now = self._now()
+        ctx.timing.status = params.response.status
+        ctx.timing.ttfb = now - (ctx.sent if ctx.sent is not None else ctx.start)
+        ctx.timing.total = now - ctx.start
+        self._done(ctx.timing)
+
+    async def _on_request_exception(self, session, ctx, params):
+        ctx.timing.error = params.exception
+        ctx.timing.total = self._now() - ctx.start
+        self._done(ctx.timing)
+
+    def _done(self, timing):
+        stats = self.hosts.get(timing.host)
+        if stats is None:
+            stats = self.hosts[timing.host] = HostStats()
+
+        stats.add(timing)
+
+        if self.callback is not None:
+            self.callback(timing)
@@ -1,33 +1,234 @@
 # Author: Kelvin Lai <kelvin@firststreet.org>
 # Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
 import ast
+import asyncio
+import csv
+import gzip
+import itertools
+import mmap
+
+# Internal Imports
+from firststreet.errors import InvalidArgument
+
+# The first bytes of a gzip file
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def parse_search_item(text):
+    """Converts one line or cell of a search item file into a search item. The common shapes, an FSID, a lat/lng or
+    z/x/y tuple and an address, are told apart with string checks, and only other literals go through ast.literal_eval
+
+    Args:
+        text (str): The line or cell, without its newline
+    Returns:
+        An int for an FSID, a tuple for a coordinate, a str for an address, or None for a blank line
+    """
+
+    text = text.strip()
+    if not text:
+        return None
+
+    # FSIDs, EventIDs and AdaptationIDs
+    if text.isdecimal():
+        return int(text)
+
+    # (lat, lng) or (z, x, y)
+    if text[0] == "(" and text[-1] == ")":
+        try:
+            return tuple(int(part) if part.strip().lstrip("-").isdecimal() else float(part)
+                         for part in text[1:-1].split(","))
+        except ValueError:
+            pass
+
+    # Anything else that looks like a literal, such as a quoted address, a float or a list
+    if text[0] in "'\"-[(" or text.replace(".", "", 1).isdecimal():
+        try:
+            return ast.literal_eval(text)
+        except (SyntaxError, ValueError):
+            pass
+
+    return text
+
+
+def _open_text(file_name, use_mmap, encoding):
+    """Opens a search item file for reading lines of text
+
+    Args:
+        file_name (str): A file name. Gzip files are found by their first bytes, whatever their extension
+        use_mmap (bool): Whether to read an uncompressed file through a memory map instead of a buffered reader
+        encoding (str): The encoding of the file
+    Returns:
+        An iterator over the lines of the file, and the file objects to close once it is read
+    """
+
+    fp = open(file_name, "rb")
+    try:
+        if fp.read(2) == GZIP_MAGIC:
+            fp.close()
+            fp = gzip.open(file_name, "rt", encoding=encoding, newline="")
+            return fp, [fp]
+
+        fp.seek(0)
+
+        # An empty file cannot be mapped
+        if use_mmap and fp.seek(0, 2):
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            lines = (line.decode(encoding) for line in iter(mapped.readline, b""))
+            return lines, [mapped, fp]
+
+    except BaseException:
+        fp.close()
+        raise
+
+    fp.close()
+    fp = open(file_name, encoding=encoding, newline="")
+    return fp, [fp]
+
+
+def _is_header(line):
+    """Whether the first line of a plain search item file is a header, which is a line of names that fails to parse as
+    a literal, such as fsid or lat,lng. Addresses fail with a SyntaxError and are kept
+
+    Args:
+        line (str): The first line of the file
+    Returns:
+        True if the line is a header
+    """
+
+    try:
+        ast.literal_eval(line.strip())
+    except ValueError:
+        return True
+    except SyntaxError:
+        return False
+
+    return False
 
 
-def read_search_items_from_file(file_name):
+def iter_search_items_from_file(file_name, column=None, delimiter=",", use_mmap=False, encoding="utf-8"):
+    """Reads the search_items of a file one at a time, so the items can be sent before the whole file is read.
+
+    Each line of a plain file is one search item: an FSID, a (lat, lng) tuple or an address. A first line of bare
+    names that does not parse as a literal, such as fsid or lat,lng, is taken as a header and skipped. With a column,
+    the file is read as a csv with a header row, and the search item is taken from that column. A pair of columns
+    gives a (lat, lng) tuple.
+
+    Args:
+        file_name (str): A file name, which may be gzip compressed
+        column (str/int/tuple/None): The name or index of the csv column, or a pair of them for the lat and lng
+        delimiter (str): The delimiter of the csv
+        use_mmap (bool): Whether to read an uncompressed file through a memory map
+        encoding (str): The encoding of the file
+    Returns:
+        A generator of search_items
+    Raises:
+        InvalidArgument: The column is not in the header of the csv
+    """
+
+    lines, handles = _open_text(file_name, use_mmap, encoding)
+
+    try:
+        if column is None:
+            first = True
+            for line in lines:
+                if first:
+                    first = False
+                    if _is_header(line):
+                        continue
+
+                item = parse_search_item(line)
+                if item is not None:
+                    yield item
+
+            return
+
+        rows = csv.reader(lines, delimiter=delimiter)
+        columns = column if isinstance(column, (tuple, list)) else (column,)
+
+        # The header row is skipped even when the columns are given by index
+        header = [name.strip() for name in next(rows, [])]
+        if not all(isinstance(col, int) for col in columns):
+            try:
+                columns = [col if isinstance(col, int) else header.index(col) for col in columns]
+            except ValueError:
+                raise InvalidArgument("The column {} is not in the header of {}: {}"
+                                      .format(column, file_name, header)) from None
+
+        if len(columns) == 1:
+            index = columns[0]
+            for row in rows:
+                if len(row) > index:
+                    item = parse_search_item(row[index])
+                    if item is not None:
+                        yield item
+
+        else:
+            lat, lng = columns
+            for row in rows:
+                if len(row) > max(lat, lng) and row[lat].strip() and row[lng].strip():
+                    yield float(row[lat]), float(row[lng])
+
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def read_search_items_from_file(file_name, **kwargs):
     """Reads the given file and pulls a list of search_items from the file
 
     Args:
         file_name (str): A file name
+        **kwargs: The column, delimiter, use_mmap and encoding of iter_search_items_from_file
     Returns:
         A list of search_items
     """
 
-    search_items = []
+    return list(iter_search_items_from_file(file_name, **kwargs))
 
-    with open(file_name) as fp:
 
-        count = 1
-        for line in fp:
+def chunked(search_items, size):
+    """Splits an iterable of search items into lists of at most size items, pulling only one list at a time. Paired
+    with a CsvWriter, a job over a generator such as a database cursor runs in memory bounded by the size
 
-            item = line.rstrip('\n')
-            try:
-                search_items.append(ast.literal_eval(item))
-            except SyntaxError:
-                search_items.append(line.rstrip('\n'))
-            except ValueError:
-                if count != 1:
-                    search_items.append(line.rstrip('\n'))
+    Args:
+        search_items (iterable): The search items
+        size (int): The max number of search items in a list
+    Returns:
+        A generator of lists of search_items
+    Raises:
+        InvalidArgument: The size is below 1
+    """
+
+    if size < 1:
+        raise InvalidArgument("The chunk size must be at least 1. '{}'".format(size))
+
+    iterator = iter(search_items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def run_until_complete(coroutine):
+    """Runs the coroutine to completion on the event loop of the current thread, creating the loop if there is none.
+    The same loop is kept across calls so the pooled session of Http stays usable
+
+    Args:
+        coroutine (coroutine): The coroutine to run
+    Returns:
+        The result of the coroutine
+    """
 
-            count += 1
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            raise RuntimeError("Event loop is closed")
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
 
-    return search_items
+    return loop.run_until_complete(coroutine)
@@ -9,6 +9,9 @@ with open('requirements.txt') as f:
 with open('extra_test_requires.txt') as f:
     extra = {'testing': [x.strip() for x in f.readlines()]}
 
+# Parquet and Arrow output
+extra['columnar'] = ['pyarrow>=1.0.0']
+
 setup(
     name='fsf-api-access_python',
     version='2.3.6',
@@ -0,0 +1,58 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import asyncio
+
+# External Imports
+import pytest
+from aiohttp import web
+
+# Internal Imports
+import firststreet
+from firststreet.errors import InvalidArgument
+
+
+async def start_server(aiohttp_server, calls):
+
+    async def handler(request):
+        calls.append(request.path)
+        await asyncio.sleep(0.01)
+        return web.json_response({"fsid": int(request.path.rsplit('/', 1)[-1]), "chance": [], "depth": []})
+
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', handler)
+
+    return await aiohttp_server(app)
+
+
+class TestAsyncFirstStreet:
+
+    async def test_concurrent_products(self, aiohttp_server):
+        calls = []
+        server = await start_server(aiohttp_server, calls)
+
+        async with firststreet.AsyncFirstStreet("key", log=False) as fs:
+            fs.http.options['url'] = str(server.make_url("")).rstrip('/')
+            session = fs.http._session
+
+            chance, depth = await asyncio.gather(fs.probability.get_chance([1, 2]),
+                                                 fs.probability.get_depth([3]))
+
+            assert fs.http._session is session
+
+        assert [c.fsid for c in chance] == ["1", "2"]
+        assert [d.fsid for d in depth] == ["3"]
+        assert sorted(calls) == ["/v1/probability/chance/property/1", "/v1/probability/chance/property/2",
+                                 "/v1/probability/depth/property/3"]
+
+    async def test_invalid_argument(self):
+        fs = firststreet.AsyncFirstStreet("key", log=False)
+
+        with pytest.raises(InvalidArgument):
+            await fs.location.get_detail([], "property")
+
+    def test_sync_context_manager(self):
+        with pytest.raises(TypeError):
+            with firststreet.AsyncFirstStreet("key", log=False):
+                pass
@@ -0,0 +1,156 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import asyncio
+import time
+
+# External Imports
+from aiohttp import web
+
+# Internal Imports
+from firststreet.cache import MemoryCache, ResponseCache
+from firststreet.http_util import Http
+
+DEPTH = ("https://api.firststreet.org/v1/probability/depth/property/1?", 1, "probability", "depth")
+LOCATION = ("https://api.firststreet.org/v1/location/detail/property/1?", 1, "location", "detail")
+
+
+class TestResponseCache:
+
+    def test_set_get(self, tmpdir):
+        cache = ResponseCache(tmpdir / "cache.sqlite")
+        assert cache.get(DEPTH, "v1") is None
+
+        cache.set(DEPTH, "v1", {"fsid": 1, "depth": [{"year": 2020}]})
+        assert cache.get(DEPTH, "v1") == {"fsid": 1, "depth": [{"year": 2020}]}
+        assert cache.get(DEPTH, "v2") is None
+        assert len(cache) == 1
+
+    def test_persistent(self, tmpdir):
+        cache = ResponseCache(tmpdir / "cache.sqlite")
+        cache.set(DEPTH, "v1", {"fsid": 1})
+        cache.close()
+
+        assert ResponseCache(tmpdir / "cache.sqlite").get(DEPTH, "v1") == {"fsid": 1}
+
+    def test_product_ttl(self, tmpdir):
+        cache = ResponseCache(tmpdir / "cache.sqlite", product_ttl={"probability/depth": 0.1, "location": 0})
+        cache.set(DEPTH, "v1", {"fsid": 1})
+        cache.set(LOCATION, "v1", {"fsid": 1})
+
+        assert cache.get(DEPTH, "v1") == {"fsid": 1}
+        assert cache.get(LOCATION, "v1") is None
+
+        time.sleep(0.15)
+        assert cache.get(DEPTH, "v1") is None
+
+    def test_lru_eviction(self, tmpdir):
+        cache = ResponseCache(tmpdir / "cache.sqlite", max_size=2000, compress_level=0)
+        endpoints = [("url/{}".format(i), i, "probability", "depth") for i in range(5)]
+
+        for endpoint in endpoints[:3]:
+            cache.set(endpoint, "v1", {"data": "x" * 500})
+            time.sleep(0.01)
+
+        # Touch the oldest entry so the second becomes the least recently used
+        assert cache.get(endpoints[0], "v1") is not None
+        cache.set(endpoints[3], "v1", {"data": "x" * 500})
+
+        assert cache.get(endpoints[1], "v1") is None
+        assert cache.get(endpoints[0], "v1") is not None
+        assert cache.get(endpoints[3], "v1") is not None
+
+
+class TestCachedExecute:
+
+    async def test_hit_skips_network(self, aiohttp_server, tmpdir):
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if request.match_info['fsid'] == '0':
+                return web.json_response({"error": {"code": 404, "message": "Not found"}}, status=404)
+
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        http = Http("", 5, 4950, 60, cache=ResponseCache(tmpdir / "cache.sqlite"))
+        endpoints = [(str(server.make_url("/{}".format(i))), i, "location", "detail") for i in range(3)]
+
+        first = await http.endpoint_execute(endpoints)
+        second = await http.endpoint_execute(endpoints)
+        await http.close()
+
+        assert first == second
+        assert second[1:] == [{"fsid": 1}, {"fsid": 2}]
+
+        # Only the error response is fetched again
+        assert len(calls) == 4
+
+
+class TestMemoryCache:
+
+    def test_lru(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set(DEPTH, "v1", {"fsid": 1})
+        cache.set(LOCATION, "v1", {"fsid": 2})
+        assert cache.get(DEPTH, "v1") == {"fsid": 1}
+
+        cache.set(("url", 3, "probability", "depth"), "v1", {"fsid": 3})
+        assert cache.get(LOCATION, "v1") is None
+        assert cache.get(DEPTH, "v1") == {"fsid": 1}
+        assert len(cache) == 2
+
+    def test_ttl(self):
+        cache = MemoryCache(ttl=0.05)
+        cache.set(DEPTH, "v1", {"fsid": 1})
+        time.sleep(0.06)
+        assert cache.get(DEPTH, "v1") is None
+
+    async def test_coalesced(self, aiohttp_server):
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        cache = MemoryCache()
+        http = Http("", 5, 4950, 60, memory_cache=cache)
+        endpoints = [(str(server.make_url("/{}".format(i % 2))), i % 2, "location", "detail") for i in range(6)]
+
+        first = await http.endpoint_execute(endpoints)
+        second = await http.endpoint_execute(endpoints)
+        await http.close()
+
+        assert first == second == [{"fsid": i % 2} for i in range(6)]
+        assert len(calls) == 2
+        assert cache.stats() == {'entries': 2, 'hits': 6, 'misses': 2, 'coalesced': 4, 'hit_rate': 10 / 12}
+
+    async def test_cancelled_caller(self):
+        cache = MemoryCache()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return {"fsid": 1}
+
+        first = asyncio.ensure_future(cache.get_or_fetch(DEPTH, "v1", fetch))
+        second = asyncio.ensure_future(cache.get_or_fetch(DEPTH, "v1", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        # The caller that started the fetch is gone, the other still gets the body
+        assert await second == {"fsid": 1}
+        assert first.cancelled()
+        assert len(calls) == 1
+        assert cache.get(DEPTH, "v1") == {"fsid": 1}
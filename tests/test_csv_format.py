@@ -0,0 +1,133 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# External Imports
+import pandas as pd
+import pytest
+
+# Internal Imports
+from firststreet.api import csv_format
+from firststreet.errors import InvalidArgument
+from firststreet.models.probability import ProbabilityChance, ProbabilityCount, ProbabilityDepth
+
+
+class TestProbabilityFormat:
+
+    def test_depth(self):
+        data = [ProbabilityDepth({'fsid': 1, 'depth': [{'year': 2020, 'data': [
+                    {'returnPeriod': 500, 'data': {'low': 10, 'mid': 12, 'high': 15}},
+                    {'returnPeriod': 100, 'data': {'low': 0, 'mid': 1, 'high': 2}}]}]}),
+                ProbabilityDepth({'fsid': 2, 'valid_id': False, 'error': "Invalid FSID"})]
+
+        df = csv_format.format_probability_depth(data)
+
+        assert list(df.columns) == ['fsid', 'valid_id', 'year', 'returnPeriod', 'low', 'mid', 'high', 'error']
+        assert df['fsid'].tolist() == ['1', '1', '2']
+        assert df['valid_id'].tolist() == [True, True, False]
+        assert [float(v) for v in df['returnPeriod'][:2]] == [500, 100]
+        assert float(df.loc[1, 'high']) == 2
+        assert df.loc[2, 'error'] == "Invalid FSID"
+        assert df.loc[2, 'returnPeriod'] == df.loc[2, 'low'] == df.loc[2, 'year']
+
+    def test_chance(self):
+        data = [ProbabilityChance({'fsid': 1, 'chance': [
+                    {'year': 2020, 'data': [{'threshold': 0, 'data': {'low': 0.1, 'mid': 0.2, 'high': 0.3}}]},
+                    {'year': 2050, 'data': [{'threshold': 0, 'data': {'low': 0.4, 'mid': 0.5, 'high': 0.6}}]}]}),
+                ProbabilityChance({'fsid': 3, 'chance': []})]
+
+        df = csv_format.format_probability_chance(data)
+
+        assert len(df) == 2
+        assert df['year'].tolist() == [str(2020), str(2050)]
+        assert df['mid'].tolist() == [0.2, 0.5]
+
+    def test_count(self):
+        data = [ProbabilityCount({'fsid': 1, 'count': [{'year': 2035, 'data': [
+                    {'returnPeriod': 5, 'data': [{'bin': 0, 'count': {'low': 4, 'mid': 5, 'high': 6}},
+                                                 {'bin': 15, 'count': {'low': 1, 'mid': 2, 'high': 3}}]}]}]})]
+
+        df = csv_format.format_probability_count(data)
+
+        assert df['bin'].tolist() == [str(0), str(15)]
+        assert df['low'].tolist() == [str(4), str(1)]
+        assert df['returnPeriod'].tolist() == [str(5), str(5)]
+
+
+class TestTypedOutput:
+
+    def test_typed_frame(self):
+        df = pd.DataFrame({'fsid': ['1', '2', '3', '4'], 'valid_id': [True, True, False, True],
+                           'year': ['2020', '<NA>', '<NA>', '2050'], 'returnPeriod': [500, 100, None, 20],
+                           'low': ['10', '<NA>', '<NA>', '12'], 'error': [None, None, 'Invalid FSID', None]})
+
+        typed = csv_format.typed_frame(df, "probability", "depth")
+
+        assert str(typed['fsid'].dtype) == 'Int64'
+        assert str(typed['valid_id'].dtype) == 'boolean'
+        assert str(typed['year'].dtype) == 'Int64'
+        assert typed['year'].isna().tolist() == [False, True, True, False]
+        assert str(typed['returnPeriod'].dtype) == 'Int64'
+        assert str(typed['error'].dtype) == 'string'
+
+    def test_typed_frame_schema_stable(self):
+        # The dtypes come from the product, not from the values of a batch
+        first = pd.DataFrame({'fsid': ['1', '2'], 'valid_id': [True, True], 'name': ['01852', '02108'],
+                              'state_fips': ['25', '25'], 'latitude': ['42.6', '42.3']})
+        second = pd.DataFrame({'fsid': ['3', '4'], 'valid_id': [True, False], 'name': ['12345', None],
+                               'state_fips': ['36', None], 'latitude': ['40.7', None]})
+
+        first = csv_format.typed_frame(first, "location", "detail", "zcta")
+        second = csv_format.typed_frame(second, "location", "detail", "zcta")
+
+        assert first.dtypes.tolist() == second.dtypes.tolist()
+        assert str(first['name'].dtype) == 'string'
+        assert first['name'].tolist() == ['01852', '02108']
+        assert second['latitude'].dtype == 'float64'
+
+    def test_typed_frame_categories(self):
+        df = pd.DataFrame({'eventId': ['1', '2', '3'], 'valid_id': [True, True, False],
+                           'type': ['hurricane', 'flood', None], 'name': ['Irene', 'Noname', None]})
+
+        typed = csv_format.typed_frame(df, "historic", "event")
+
+        assert str(typed['type'].dtype) == 'category'
+        assert sorted(typed['type'].cat.categories) == ['flood', 'hurricane']
+        assert typed['type'].isna().tolist() == [False, False, True]
+        assert str(typed['name'].dtype) == 'string'
+
+    def test_invalid_format(self):
+        with pytest.raises(InvalidArgument):
+            csv_format.to_file([], "probability", "depth", file_format="xlsx")
+
+    def test_parquet(self, tmpdir):
+        pytest.importorskip("pyarrow")
+
+        data = [ProbabilityDepth({'fsid': 1, 'depth': [{'year': 2020, 'data': [
+                    {'returnPeriod': 500, 'data': {'low': 10, 'mid': 12, 'high': 15}}]}]})]
+
+        csv_format.to_file(data, "probability", "depth", output_dir=str(tmpdir), file_format="parquet")
+        df = pd.read_parquet(str(tmpdir.listdir()[0]))
+
+        assert df['fsid'].tolist() == [1]
+        assert df['high'].tolist() == [15]
+
+
+class TestCsvWriter:
+
+    def test_chunks(self, tmpdir):
+        depth = [{'year': 2020, 'data': [{'returnPeriod': 500, 'data': {'low': 1, 'mid': 2, 'high': 3}}]}]
+        chunks = [[ProbabilityDepth({'fsid': fsid, 'depth': depth}) for fsid in range(start, start + 3)]
+                  for start in range(0, 9, 3)]
+        chunks[1].append(ProbabilityDepth({'fsid': 99, 'valid_id': False, 'error': "Invalid FSID"}))
+
+        with csv_format.CsvWriter(str(tmpdir)) as writer:
+            for chunk in chunks:
+                csv_format.to_file(chunk, "probability", "depth", file_format=writer)
+
+        df = pd.read_csv(str(writer.path), dtype=str)
+
+        assert writer.rows == 10
+        assert list(df.columns) == ['fsid', 'valid_id', 'year', 'returnPeriod', 'low', 'mid', 'high', 'error']
+        assert df['fsid'].tolist() == ['0', '1', '2', '3', '4', '5', '99', '6', '7', '8']
+        assert df['error'].tolist()[6] == "Invalid FSID"
+        assert len(tmpdir.listdir()) == 1
@@ -0,0 +1,68 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import random
+
+# External Imports
+import pytest
+
+# Internal Imports
+import firststreet
+from firststreet.fake_api import FakeApi, latency_sampler
+
+
+class TestFakeApi:
+
+    async def test_search_items(self, aiohttp_server, tmpdir):
+        server = await aiohttp_server(FakeApi().app())
+
+        async with firststreet.AsyncFirstStreet("key", log=False) as fs:
+            fs.http.options['url'] = str(server.make_url("")).rstrip('/')
+
+            items = [390000257, (40.7, -74.0), "247 Water St, New York, NY"]
+            detail = await fs.location.get_detail(items, "property", csv=True, output_dir=str(tmpdir))
+            county = await fs.location.get_detail(items, "county")
+            depth = await fs.probability.get_depth(items)
+            again = await fs.probability.get_depth(items)
+            events = await fs.historic.get_event([1, 2])
+            tiles = await fs.tile.get_probability_depth([(12, 942, 1715)], 2050, 100)
+
+        assert [d.valid_id for d in detail + county + depth + events] == [True] * 11
+        assert detail[0].fsid == "390000257"
+        assert detail[0].geometry is not None
+        assert [d.to_dict() for d in depth] == [d.to_dict() for d in again]
+        assert [e.eventId for e in events] == ["1", "2"]
+        assert tiles[0].image.startswith(b"\x89PNG")
+        assert len(tmpdir.listdir()) == 1
+
+    async def test_rate_limit(self, aiohttp_client):
+        client = await aiohttp_client(FakeApi(rate_limit=2, rate_period=60).app())
+
+        statuses = []
+        for _ in range(3):
+            response = await client.get("/v1/probability/depth/property/1")
+            statuses.append(response.status)
+
+        assert statuses == [200, 200, 429]
+        assert response.headers['x-ratelimit-limit'] == "2"
+        assert response.headers['x-ratelimit-remaining'] == "0"
+        assert 0 < float(response.headers['x-ratelimit-reset']) <= 60
+
+    async def test_errors(self, aiohttp_client):
+        api = FakeApi(error_rates={503: 1.0})
+        client = await aiohttp_client(api.app())
+
+        response = await client.get("/v1/probability/depth/property/1")
+
+        assert response.status == 503
+        assert (await response.json())['error']['code'] == 503
+        assert api.statuses == {503: 1}
+
+    def test_latency(self):
+        assert latency_sampler(None)(None) == 0.0
+        assert latency_sampler(0.5)(None) == 0.5
+        assert latency_sampler("uniform:1:1")(random.Random(0)) == 1.0
+
+        with pytest.raises(ValueError):
+            latency_sampler("pareto:1")
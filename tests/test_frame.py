@@ -0,0 +1,65 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# External Imports
+import pytest
+from aiohttp import web
+
+# Internal Imports
+import firststreet
+from firststreet.errors import InvalidArgument
+from firststreet.models.frame import ProductFrame
+
+DEPTH = {'fsid': 7,
+         'depth': [{'year': 2020, 'data': [{'returnPeriod': 500, 'data': {'low': 10, 'mid': 12, 'high': 15}},
+                                           {'returnPeriod': 100, 'data': {'low': 1, 'mid': 2, 'high': 3}}]},
+                   {'year': 2050, 'data': [{'returnPeriod': 500, 'data': {'low': 11, 'mid': 13, 'high': 16}}]}]}
+
+
+class TestProductFrame:
+
+    def test_probability_flattened(self):
+        frame = ProductFrame.from_responses([DEPTH, {'fsid': 8, 'valid_id': False, 'error': "Invalid FSID"}],
+                                            "probability", "depth", "property")
+
+        assert len(frame) == 4
+        assert frame.columns == ['fsid', 'valid_id', 'year', 'returnPeriod', 'low', 'mid', 'high', 'error']
+        assert str(frame.df['fsid'].dtype) == 'Int64'
+        assert str(frame.df['mid'].dtype) == 'Int64'
+        assert list(frame['returnPeriod'][:3]) == [500, 100, 500]
+        assert frame.df['valid_id'].tolist() == [True, True, True, False]
+        assert frame.df['year'].isna().tolist() == [False, False, False, True]
+
+    def test_nested_columns(self):
+        frame = ProductFrame.from_responses([{'fsid': 1, 'name': "Boston", 'state': {'fsid': 25, 'name': "MA"}},
+                                             {'fsid': 2, 'valid_id': False, 'error': "Invalid FSID"}],
+                                            "location", "detail", "city")
+
+        assert {'fsid', 'name', 'state.fsid', 'state.name', 'valid_id', 'error'} <= set(frame.columns)
+        assert frame.df['valid_id'].tolist() == [True, False]
+        assert frame.df['state.name'].tolist()[0] == "MA"
+
+
+class TestAsFrame:
+
+    async def test_get_depth(self, aiohttp_server):
+
+        async def handler(request):
+            return web.json_response(dict(DEPTH, fsid=int(request.match_info['fsid'])))
+
+        app = web.Application()
+        app.router.add_get('/v1/probability/depth/property/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        async with firststreet.AsyncFirstStreet("key", log=False) as fs:
+            fs.http.options['url'] = str(server.make_url("")).rstrip('/')
+            frame = await fs.probability.get_depth([1, 2], as_frame=True)
+
+        assert isinstance(frame, ProductFrame)
+        assert frame.df['fsid'].tolist() == [1, 1, 1, 2, 2, 2]
+
+    async def test_csv_rejected(self):
+        fs = firststreet.AsyncFirstStreet("key", log=False)
+
+        with pytest.raises(InvalidArgument):
+            await fs.probability.get_depth([1], csv=True, as_frame=True)
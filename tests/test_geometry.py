@@ -0,0 +1,38 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# External Imports
+import shapely.geometry
+
+# Internal Imports
+from firststreet.api import csv_format
+from firststreet.models.geometry import Geometry
+
+GEOJSON = {'center': {'type': 'Point', 'coordinates': [-71.3, 42.6]},
+           'polygon': {'type': 'Polygon', 'coordinates': [[[-71.4, 42.5], [-71.2, 42.5], [-71.2, 42.7],
+                                                           [-71.4, 42.5]]]}}
+
+
+class TestGeometry:
+
+    def test_lazy(self):
+        geometry = Geometry(GEOJSON)
+        assert geometry._shapes == {}
+
+        center = geometry.center
+        assert isinstance(center, shapely.geometry.Point)
+        assert list(geometry._shapes) == ['center']
+        assert geometry.center is center
+
+        assert isinstance(geometry.polygon, shapely.geometry.Polygon)
+        assert geometry.bbox is None
+
+    def test_empty(self):
+        geometry = Geometry(None)
+
+        assert not hasattr(geometry, 'center')
+        assert csv_format.get_geom_center(geometry) == {"latitude": None, "longitude": None}
+
+    def test_equal(self):
+        assert Geometry(GEOJSON) == Geometry(dict(GEOJSON))
+        assert csv_format.get_geom_center(Geometry(GEOJSON)) == {"latitude": 42.6, "longitude": -71.3}
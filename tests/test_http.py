@@ -3,78 +3,271 @@
 
 # External Imports
 import asyncio
+import gc
+
+import pytest
+from aiohttp import web
+
+# Internal Imports
+import firststreet
+from firststreet.api.api import Api
+from firststreet.errors import InvalidArgument
+from firststreet.http_util import Http
+from firststreet.util import run_until_complete
 
 
 class TestNetworkErrors:
 
     def test_error_400(self, setup_connection):
 
-        loop = asyncio.get_event_loop()
         endpoint = ("https://httpstat.us/400", "test_item", "test_product", "test_subtype")
-        response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
+        response = run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
 
     def test_error_403(self, setup_connection):
 
-        loop = asyncio.get_event_loop()
         endpoint = ("https://httpstat.us/403", "test_item", "test_product", "test_subtype")
-        response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
+        response = run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
 
     def test_error_404(self, setup_connection):
 
-        loop = asyncio.get_event_loop()
         endpoint = ("https://httpstat.us/404", "test_item", "test_product", "test_subtype")
-        response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
+        response = run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
 
     def test_error_500(self, setup_connection):
 
-        loop = asyncio.get_event_loop()
         endpoint = ("https://httpstat.us/500", "test_item", "test_product", "test_subtype")
-        response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
+        response = run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
 
     def test_error_501(self, setup_connection):
 
-        loop = asyncio.get_event_loop()
         endpoint = ("https://httpstat.us/501", "test_item", "test_product", "test_subtype")
-        response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
+        response = run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
 
     def test_error_502(self, setup_connection):
 
-        loop = asyncio.get_event_loop()
         endpoint = ("https://httpstat.us/502", "test_item", "test_product", "test_subtype")
-        response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
+        response = run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
 
     def test_error_503(self, setup_connection):
 
-        loop = asyncio.get_event_loop()
         endpoint = ("https://httpstat.us/503", "test_item", "test_product", "test_subtype")
-        response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
+        response = run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
 
     def test_error_522(self, setup_connection):
 
-        loop = asyncio.get_event_loop()
         endpoint = ("https://httpstat.us/522", "test_item", "test_product", "test_subtype")
-        response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
+        response = run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
 
     def test_error_524(self, setup_connection):
 
-        loop = asyncio.get_event_loop()
         endpoint = ("https://httpstat.us/524", "test_item", "test_product", "test_subtype")
-        response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
+        response = run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
+
+
+class TestSession:
+
+    async def test_session_reused(self, aiohttp_server):
+        connections = set()
+
+        async def handler(request):
+            connections.add(id(request.transport))
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        http = Http("", 5, 4950, 60)
+        endpoints = [(str(server.make_url("/{}".format(i))), i, "test_product", "test_subtype") for i in range(20)]
+
+        first = await http.endpoint_execute(endpoints)
+        session = http._session
+        second = await http.endpoint_execute(endpoints)
+
+        assert http._session is session
+        assert [r['fsid'] for r in first] == list(range(20))
+        assert first == second
+        assert len(connections) <= 5
+
+        await http.close()
+        assert session.closed
+
+    def test_unclosed_client_released(self):
+        fs = firststreet.FirstStreet("key", log=False)
+        fs.open()
+        session = fs.http._session
+
+        del fs
+        gc.collect()
+
+        assert session.closed
+
+
+class TestIterExecute:
+
+    async def test_bounded_window(self, aiohttp_server):
+        active = {'now': 0, 'max': 0}
+
+        async def handler(request):
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+            await asyncio.sleep(0.01)
+            active['now'] -= 1
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        http = Http("", 50, 4950, 60)
+        endpoints = ((str(server.make_url("/{}".format(i))), i, "test_product", "test_subtype") for i in range(30))
+
+        results = [(endpoint[1], result['fsid']) async for endpoint, result in http.iter_execute(endpoints, window=4)]
+        await http.close()
+
+        assert sorted(results) == [(i, i) for i in range(30)]
+        assert active['max'] <= 4
+
+
+class TestDeduplicate:
+
+    async def test_concurrent_batches_coalesced(self, aiohttp_server):
+        calls = []
+
+        async def handler(request):
+            calls.append(request.match_info['fsid'])
+            await asyncio.sleep(0.05)
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        http = Http("", 10, 4950, 60)
+        endpoints = [(str(server.make_url("/{}".format(i))), i, "test_product", "test_subtype") for i in range(5)]
+
+        first, second = await asyncio.gather(http.endpoint_execute(endpoints), http.endpoint_execute(endpoints))
+        await http.close()
+
+        assert first == second == [{"fsid": i} for i in range(5)]
+        assert len(calls) == 5
+        assert http.requests_saved == 5
+
+    async def test_cancelled_batch_leaves_coalesced_batch(self, aiohttp_server):
+        calls = []
+
+        async def handler(request):
+            calls.append(request.match_info['fsid'])
+            await asyncio.sleep(0.2)
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        http = Http("", 10, 4950, 60)
+        endpoints = [(str(server.make_url("/{}".format(i))), i, "test_product", "test_subtype") for i in range(3)]
+
+        first = asyncio.ensure_future(asyncio.wait_for(http.endpoint_execute(endpoints), 0.1))
+        await asyncio.sleep(0.05)
+        second = await http.endpoint_execute(endpoints)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await first
+        await http.close()
+
+        assert second == [{"fsid": i} for i in range(3)]
+        assert len(calls) == 3
+
+    def test_duplicate_search_items(self):
+        class RecordingHttp:
+            options = {'url': "https://api.firststreet.org"}
+            version = "v1"
+            deduplicated = 0
+
+            def __init__(self):
+                self.executed = []
+
+            async def endpoint_execute(self, endpoints):
+                endpoints = list(endpoints)
+                self.executed.extend(endpoints)
+                return [{"fsid": endpoint[1]} for endpoint in endpoints]
+
+        http = RecordingHttp()
+        response = asyncio.run(Api(http).call_api_async([3, 1, 3, 2, 1, 3], "location", "detail", "property"))
+
+        assert [endpoint[1] for endpoint in http.executed] == [3, 1, 2]
+        assert response == [{"fsid": i} for i in [3, 1, 3, 2, 1, 3]]
+        assert http.deduplicated == 3
+
+
+class TestIterableSearchItems:
+
+    async def test_generator_streamed(self, aiohttp_server):
+        pulled = []
+        seen = []
+
+        async def handler(request):
+            seen.append(len(pulled))
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        def cursor():
+            for fsid in [1, 2, 1] + list(range(3, 41)):
+                pulled.append(fsid)
+                yield fsid
+
+        app = web.Application()
+        app.router.add_get('/v1/location/detail/property/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        http = Http("", 2, 4950, 60)
+        http.options['url'] = str(server.make_url(""))
+        response = await Api(http).call_api_async(cursor(), "location", "detail", "property")
+        await http.close()
+
+        # The first requests are sent before the generator is exhausted, and the duplicate shares a request
+        assert min(seen) < len(pulled)
+        assert len(seen) == 40
+        assert response == [{"fsid": fsid} for fsid in [1, 2, 1] + list(range(3, 41))]
+        assert http.deduplicated == 1
+
+    async def test_invalid_items(self):
+        api = Api(Http("", 2, 4950, 60))
+
+        with pytest.raises(InvalidArgument):
+            await api.call_api_async(iter([]), "location", "detail", "property")
+
+        with pytest.raises(InvalidArgument):
+            await api.call_api_async(12, "location", "detail", "property")
+
+        with pytest.raises(InvalidArgument):
+            await api.call_api_async((41.5, -81.6), "location", "detail", "property")
+
+        with pytest.raises(TypeError):
+            await api.call_api_async([1, 41.5], "location", "detail", "property")
+
+        with pytest.raises(TypeError):
+            await api.call_api_async((item for item in [None]), "location", "detail", "property")
+
+        with pytest.raises(TypeError):
+            await api.call_api_async((item for item in ["1 Main St"]), "adaptation", "detail")
+
+        await api._http.close()
@@ -0,0 +1,25 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import subprocess
+import sys
+
+
+def loaded_modules(code):
+    code += "; import sys; print(','.join(m for m in ('pandas', 'shapely', 'tqdm') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.strip().split(",") if result.stdout.strip() else []
+
+
+class TestLazyImports:
+
+    def test_import_defers_heavy_modules(self):
+        assert loaded_modules("import firststreet") == []
+
+    def test_models_defer_shapely(self):
+        code = "from firststreet.models.location import LocationDetailCity; " \
+               "city = LocationDetailCity({'fsid': 1, 'geometry': {'center': {'type': 'Point', " \
+               "'coordinates': [1, 2]}}})"
+        assert loaded_modules(code) == []
+        assert loaded_modules(code + "; city.geometry.center") == ["shapely"]
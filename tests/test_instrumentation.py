@@ -0,0 +1,79 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# External Imports
+from aiohttp import web
+
+# Internal Imports
+from firststreet.http_util import Http
+from firststreet.instrumentation import Histogram, Instrumentation
+
+
+class TestHistogram:
+
+    def test_percentiles_within_precision(self):
+        histogram = Histogram()
+        for value in range(1, 100001):
+            histogram.record(value)
+
+        assert histogram.count == 100000
+        assert histogram.min == 1 and histogram.max == 100000
+        for percentile in (50, 90, 99, 99.9):
+            expected = 100000 * percentile / 100
+            assert abs(histogram.percentile(percentile) - expected) <= expected * 0.02
+
+    def test_small_values_exact(self):
+        histogram = Histogram()
+        for value in (3, 3, 7, 120):
+            histogram.record(value)
+
+        assert histogram.percentile(50) == 3
+        assert histogram.percentile(75) == 7
+        assert histogram.percentile(100) == 120
+
+    def test_merge(self):
+        first, second = Histogram(), Histogram()
+        first.record(10)
+        second.record(5000)
+
+        first.merge(second)
+
+        assert first.count == 2
+        assert first.min == 10 and first.max == 5000
+        assert first.percentile(100) == 5000
+
+
+class TestInstrumentation:
+
+    def test_summary(self):
+        instrumentation = Instrumentation()
+        instrumentation.record('model', 0.002)
+        instrumentation.record('ttfb', 0.010)
+        with instrumentation.time('format'):
+            pass
+
+        summary = instrumentation.summary()
+
+        assert list(summary) == ['ttfb', 'model', 'format']
+        assert summary['ttfb']['count'] == 1
+        assert abs(summary['ttfb']['p50_ms'] - 10) < 0.1
+        assert "model" in instrumentation.report()
+
+    async def test_http_stages(self, aiohttp_server):
+
+        async def handler(request):
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        http = Http("", 5, 4950, 60)
+        endpoints = [(str(server.make_url("/{}".format(i))), i, "test_product", "test_subtype") for i in range(10)]
+        await http.endpoint_execute(endpoints)
+        await http.close()
+
+        stats = http.stats()
+
+        for stage in ('semaphore_wait', 'throttle_wait', 'ttfb', 'body_read', 'json_decode'):
+            assert stats[stage]['count'] == 10
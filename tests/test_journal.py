@@ -0,0 +1,89 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# External Imports
+from aiohttp import web
+
+# Internal Imports
+from firststreet.http_util import Http
+from firststreet.journal import Journal
+
+
+def endpoint(fsid, product="probability"):
+    return "https://api.firststreet.org/v1/{}/depth/{}".format(product, fsid), fsid, product, "depth"
+
+
+class TestJournal:
+
+    def test_resume(self, tmpdir):
+        path = str(tmpdir.join("job.journal"))
+
+        journal = Journal(path)
+        journal.record(endpoint(1), "v1", {'fsid': 1, 'depth': [{'year': 2020}]})
+        journal.record(endpoint(2), "v1", {'fsid': 2, 'valid_id': False, 'error': "Invalid\tFSID\n"})
+        journal.record(endpoint(3), "v1", {'search_item': 3})
+        journal.record(endpoint(4, "tile"), "v1", {'coordinate': 4, 'image': None})
+        journal.close()
+
+        journal = Journal(path, resume=True)
+
+        assert len(journal) == 2
+        assert journal.get(endpoint(2), "v1") == {'fsid': 2, 'valid_id': False, 'error': "Invalid\tFSID\n"}
+        assert journal.get(endpoint(1), "v1") == {'fsid': 1, 'depth': [{'year': 2020}]}
+        assert journal.get(endpoint(3), "v1") is None
+        assert journal.get(endpoint(1), "v2") is None
+        assert journal.replayed == 2
+        journal.close()
+
+        assert len(Journal(path)) == 0
+
+    def test_incomplete_entry_dropped(self, tmpdir):
+        path = str(tmpdir.join("job.journal"))
+
+        journal = Journal(path)
+        journal.record(endpoint(1), "v1", {'fsid': 1})
+        journal.close()
+
+        with open(path, "ab") as fp:
+            fp.write(b'"v1:https://api.firststreet.org/v1/probability/depth/2"\t{"fsi')
+
+        journal = Journal(path, resume=True)
+        journal.record(endpoint(3), "v1", {'fsid': 3})
+
+        assert len(journal) == 2
+        assert journal.get(endpoint(2), "v1") is None
+        assert journal.get(endpoint(3), "v1") == {'fsid': 3}
+        journal.close()
+
+
+class TestResume:
+
+    async def test_completed_endpoints_replayed(self, aiohttp_server, tmpdir):
+        calls = []
+
+        async def handler(request):
+            fsid = int(request.match_info['fsid'])
+            calls.append(fsid)
+            return web.json_response({'fsid': fsid})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        path = str(tmpdir.join("job.journal"))
+        endpoints = [(str(server.make_url("/{}".format(i))), i, "probability", "depth") for i in range(10)]
+
+        # The first run dies after completing half of the endpoints
+        http = Http("", 10, 4950, 60, journal=Journal(path))
+        await http.endpoint_execute(endpoints[:5])
+        await http.close()
+        http.journal.close()
+
+        http = Http("", 10, 4950, 60, journal=Journal(path, resume=True))
+        results = await http.endpoint_execute(endpoints)
+        await http.close()
+        http.journal.close()
+
+        assert [result['fsid'] for result in results] == list(range(10))
+        assert sorted(calls) == list(range(10))
+        assert http.journal.replayed == 5
@@ -0,0 +1,79 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# External Imports
+import urllib.request
+
+from aiohttp import web
+
+# Internal Imports
+from firststreet.http_util import Http
+from firststreet.metrics import Metrics
+from firststreet.retry import RetryPolicy
+
+
+class TestMetrics:
+
+    def test_render(self):
+        metrics = Metrics()
+        metrics.inc('fsf_requests_total', {'product': "probability/depth", 'status': 200}, 3)
+        metrics.inc('fsf_cache_hits_total', {'cache': 'dis"k'})
+        metrics.set('fsf_ratelimit_remaining', 4500.0)
+
+        text = metrics.render()
+
+        assert '# TYPE fsf_requests_total counter' in text
+        assert 'fsf_requests_total{product="probability/depth",status="200"} 3' in text
+        assert 'fsf_cache_hits_total{cache="dis\\"k"} 1' in text
+        assert 'fsf_ratelimit_remaining 4500.0' in text
+
+    def test_serve_and_write(self, tmpdir):
+        metrics = Metrics()
+        metrics.inc('fsf_failures_total', {'product': "location/detail"})
+
+        port = metrics.serve(0)
+        try:
+            with urllib.request.urlopen("http://127.0.0.1:{}/metrics".format(port)) as response:
+                body = response.read().decode()
+        finally:
+            metrics.close()
+
+        path = str(tmpdir.join("fsf.prom"))
+        metrics.write(path)
+
+        assert 'fsf_failures_total{product="location/detail"} 1' in body
+        assert open(path).read() == metrics.render()
+
+    async def test_http_counts(self, aiohttp_server):
+        attempts = {}
+
+        async def handler(request):
+            fsid = int(request.match_info['fsid'])
+            attempts[fsid] = attempts.get(fsid, 0) + 1
+            headers = {'x-ratelimit-remaining': str(100 - sum(attempts.values()))}
+
+            if fsid == 1 and attempts[fsid] == 1:
+                return web.json_response({}, status=503, headers=headers)
+            if fsid == 2:
+                return web.json_response({'error': {'message': "Invalid FSID"}}, status=404, headers=headers)
+
+            return web.json_response({'fsid': fsid}, headers=headers)
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        metrics = Metrics()
+        http = Http("", 1, 4950, 60, retry_policy=RetryPolicy(backoff_base=0.01), metrics=metrics)
+        endpoints = [(str(server.make_url("/{}".format(i))), i, "probability", "depth") for i in range(4)]
+        await http.endpoint_execute(endpoints)
+        await http.close()
+
+        product = "probability/depth"
+        assert metrics.get('fsf_requests_total', {'product': product, 'status': 200}) == 3
+        assert metrics.get('fsf_requests_total', {'product': product, 'status': 503}) == 1
+        assert metrics.get('fsf_errors_total', {'product': product, 'status_class': "4xx"}) == 1
+        assert metrics.get('fsf_errors_total', {'product': product, 'status_class': "5xx"}) == 1
+        assert metrics.get('fsf_retries_total', {'product': product, 'reason': 503}) == 1
+        assert metrics.get('fsf_received_bytes_total', {'product': product}) > 0
+        assert metrics.get('fsf_ratelimit_remaining') == 95
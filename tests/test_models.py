@@ -0,0 +1,36 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# External Imports
+import pytest
+
+# Internal Imports
+from firststreet.models.location import LocationDetailCounty, LocationDetailNeighborhood
+from firststreet.models.tile import ProbabilityDepthTile
+
+
+class TestSlots:
+
+    def test_no_dict(self):
+        county = LocationDetailCounty({'fsid': 25017, 'isCoastal': 1})
+
+        assert not hasattr(county, '__dict__')
+        assert county.fsid == "25017"
+        assert county.isCoastal is True
+
+        with pytest.raises(AttributeError):
+            county.unknown = 1
+
+    def test_fields_in_order(self):
+        neighborhood = LocationDetailNeighborhood({'fsid': 1, 'name': "Back Bay", 'valid_id': False, 'error': "x"})
+
+        assert list(neighborhood.to_dict()) == ['valid_id', 'error', 'fsid', 'city', 'subtype', 'county', 'state',
+                                                'geometry', 'name']
+        assert neighborhood.to_dict()['name'] == "Back Bay"
+        assert neighborhood.to_dict()['valid_id'] is False
+
+    def test_inherited_fields(self):
+        tile = ProbabilityDepthTile({'coordinate': (1, 2, 3)}, 2020, 100)
+
+        assert tile.to_dict() == {'valid_id': True, 'error': None, 'coordinate': (1, 2, 3), 'image': None,
+                                  'year': 2020, 'return_period': 100}
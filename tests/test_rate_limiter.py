@@ -0,0 +1,203 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import asyncio
+import concurrent.futures
+import multiprocessing
+import time
+
+# External Imports
+import pytest
+
+# Internal Imports
+from firststreet import rate_limiter
+from firststreet.rate_limiter import AdaptiveRateLimiter, SharedRateLimiter
+
+
+def acquire_shared(path, count):
+    limiter = SharedRateLimiter(20, 1, path=path, burst=1)
+
+    async def run():
+        for _ in range(count):
+            async with limiter:
+                pass
+
+    asyncio.run(run())
+    limiter.close()
+
+
+class TestAdaptiveRateLimiter:
+
+    def test_initial_rate(self):
+        limiter = AdaptiveRateLimiter(600, 60)
+        assert limiter.rate == 10
+        assert limiter.burst == 10
+
+    def test_speeds_up_with_quota_left(self):
+        limiter = AdaptiveRateLimiter(600, 60)
+        limiter.update({'limit': '600', 'remaining': '500', 'reset': '10'})
+        assert limiter.rate == 500 * 0.9 / 10
+
+    def test_slows_down_before_quota_runs_out(self):
+        limiter = AdaptiveRateLimiter(600, 60)
+        limiter.update({'limit': '600', 'remaining': '20', 'reset': '50'})
+        assert limiter.rate == 20 * 0.9 / 50
+
+    def test_in_flight_requests(self):
+        limiter = AdaptiveRateLimiter(600, 60)
+
+        async def run():
+            for _ in range(3):
+                await limiter.acquire()
+
+        # The response of one of the three requests in flight carries the header
+        asyncio.run(run())
+        limiter.update({'limit': '600', 'remaining': '10', 'reset': '10'})
+        assert limiter.rate == 8 * 0.9 / 10
+
+    def test_epoch_reset(self):
+        limiter = AdaptiveRateLimiter(600, 60)
+        limiter.update({'limit': '600', 'remaining': '100', 'reset': str(time.time() + 20)})
+        assert 4.4 < limiter.rate < 4.6
+
+    def test_missing_headers(self):
+        limiter = AdaptiveRateLimiter(600, 60)
+        limiter.update({'limit': None, 'remaining': None, 'reset': None, 'requestId': None})
+        assert limiter.rate == 10
+
+    def test_exhausted_blocks_until_reset(self):
+        limiter = AdaptiveRateLimiter(600, 60)
+
+        async def run():
+            limiter.update({'limit': '600', 'remaining': '0', 'reset': '0.2'})
+            start = time.monotonic()
+            async with limiter:
+                pass
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) >= 0.19
+
+    def test_acquire_respects_rate(self):
+        limiter = AdaptiveRateLimiter(20, 1, burst=1)
+
+        async def run():
+            start = time.monotonic()
+            for _ in range(5):
+                async with limiter:
+                    pass
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) >= 0.19
+
+
+class TestSharedRateLimiter:
+
+    def test_bucket_shared_between_limiters(self, tmpdir):
+        path = str(tmpdir.join("bucket"))
+        first = SharedRateLimiter(10, 1, path=path, burst=3)
+        second = SharedRateLimiter(10, 1, path=path, burst=3)
+
+        async def run():
+            for _ in range(3):
+                async with first:
+                    pass
+
+            start = time.monotonic()
+            async with second:
+                pass
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) >= 0.08
+        first.close()
+        second.close()
+
+    def test_exhausted_blocks_every_limiter(self, tmpdir):
+        path = str(tmpdir.join("bucket"))
+        first = SharedRateLimiter(600, 60, path=path)
+        second = SharedRateLimiter(600, 60, path=path)
+
+        async def run():
+            first.update({'limit': '600', 'remaining': '0', 'reset': '0.2'})
+            start = time.monotonic()
+            async with second:
+                pass
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) >= 0.19
+
+    def test_default_path_keyed_by_api_key(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(rate_limiter, "DEFAULT_BUCKET_DIR", tmpdir)
+        first = SharedRateLimiter(600, 60, api_key="key-1")
+        second = SharedRateLimiter(600, 60, api_key="key-2")
+
+        assert first.path != second.path
+        assert first.path == SharedRateLimiter(600, 60, api_key="key-1").path
+        assert "key-1" not in first.path
+
+    @pytest.mark.skipif(rate_limiter.fcntl is None, reason="Locks the state file with fcntl")
+    def test_lock_does_not_block_loop(self, tmpdir):
+        path = str(tmpdir.join("bucket"))
+        limiter = SharedRateLimiter(600, 60, path=path)
+        ticks = []
+
+        async def tick():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            # Another process holding the lock, as flock locks each open file separately
+            with open(path, "a+b") as other:
+                rate_limiter.fcntl.flock(other.fileno(), rate_limiter.fcntl.LOCK_EX)
+                acquire = asyncio.ensure_future(limiter.acquire())
+                await tick()
+                assert not acquire.done()
+                rate_limiter.fcntl.flock(other.fileno(), rate_limiter.fcntl.LOCK_UN)
+
+            await acquire
+
+        asyncio.run(run())
+        limiter.close()
+        assert len(ticks) == 5
+
+    @pytest.mark.skipif(rate_limiter.fcntl is None, reason="Locks the state file with fcntl")
+    def test_exhausted_while_locked(self, tmpdir):
+        path = str(tmpdir.join("bucket"))
+        first = SharedRateLimiter(600, 60, path=path)
+        second = SharedRateLimiter(600, 60, path=path)
+
+        async def run():
+            async with first:
+                pass
+
+            with open(path, "a+b") as other:
+                rate_limiter.fcntl.flock(other.fileno(), rate_limiter.fcntl.LOCK_EX)
+                first.update({'limit': '600', 'remaining': '0', 'reset': '0.2'})
+
+            # The block is written with the next token taken by the limiter that saw it
+            start = time.monotonic()
+            async with first:
+                pass
+            async with second:
+                pass
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) >= 0.19
+        first.close()
+        second.close()
+
+    def test_processes_share_rate(self, tmpdir):
+        path = str(tmpdir.join("bucket"))
+        context = multiprocessing.get_context("spawn")
+
+        with concurrent.futures.ProcessPoolExecutor(2, mp_context=context) as pool:
+            # Warm up the workers so the timing leaves out the interpreter start
+            list(pool.map(acquire_shared, [str(tmpdir.join("warm"))] * 2, [1, 1]))
+
+            start = time.monotonic()
+            list(pool.map(acquire_shared, [path] * 2, [5, 5]))
+            elapsed = time.monotonic() - start
+
+        # 10 tokens at 20 per second with a burst of 1
+        assert elapsed >= 0.4
@@ -0,0 +1,97 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import asyncio
+from json.decoder import JSONDecodeError
+
+# External Imports
+from aiohttp import web
+
+# Internal Imports
+from firststreet.http_util import Http
+from firststreet.retry import RetryBudget, RetryPolicy, RetryableStatusError
+
+
+class TestRetryPolicy:
+
+    def test_exponential_backoff(self):
+        policy = RetryPolicy(backoff_base=0.5, jitter=False, budget=RetryBudget(min_retries=100))
+        assert [policy.retry_delay(asyncio.TimeoutError(), i) for i in range(5)] == [0.5, 1, 2, 4, 8]
+        assert policy.retry_delay(asyncio.TimeoutError(), 5) is None
+
+    def test_jitter_bounds(self):
+        policy = RetryPolicy(backoff_base=1, budget=RetryBudget(min_retries=100))
+        for _ in range(50):
+            assert 0 <= policy.retry_delay(JSONDecodeError("", "", 0), 2) <= 4
+
+    def test_backoff_max(self):
+        policy = RetryPolicy(max_retries=20, backoff_max=3, jitter=False, budget=RetryBudget(min_retries=100))
+        assert policy.retry_delay(asyncio.TimeoutError(), 10) == 3
+
+    def test_status_rules(self):
+        policy = RetryPolicy(statuses={503: 1}, jitter=False)
+        assert policy.retry_delay(RetryableStatusError(503), 0) == 0.5
+        assert policy.retry_delay(RetryableStatusError(503), 1) is None
+        assert policy.retry_delay(RetryableStatusError(429), 0) is None
+        assert policy.retry_delay(ValueError(), 0) is None
+
+    def test_retry_after(self):
+        policy = RetryPolicy(jitter=False)
+        assert policy.retry_delay(RetryableStatusError(429, retry_after="7"), 0) == 7
+        assert policy.retry_delay(RetryableStatusError(429, {'reset': '12'}), 0) == 12
+        assert policy.retry_delay(RetryableStatusError(429, retry_after="Wed, 21 Oct 2015 07:28:00 GMT"), 0) == 0
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, min_retries=1)
+        policy = RetryPolicy(budget=budget)
+        assert policy.retry_delay(asyncio.TimeoutError(), 0) is not None
+        assert policy.retry_delay(asyncio.TimeoutError(), 0) is None
+
+        policy.record_request()
+        policy.record_request()
+        assert budget.remaining == 1
+
+
+class TestRetryExecute:
+
+    async def test_retries_unavailable(self, aiohttp_server):
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                return web.json_response({"error": {"code": 503, "message": "Offline"}}, status=503)
+
+            return web.json_response({"fsid": 1})
+
+        app = web.Application()
+        app.router.add_get('/1', handler)
+        server = await aiohttp_server(app)
+
+        http = Http("", 5, 4950, 60, retry_policy=RetryPolicy(backoff_base=0.01))
+        response = await http.endpoint_execute([(str(server.make_url("/1")), 1, "test_product", "test_subtype")])
+        await http.close()
+
+        assert response == [{"fsid": 1}]
+        assert len(calls) == 3
+
+    async def test_exhausted_does_not_abort_batch(self, aiohttp_server):
+
+        async def handler(request):
+            if request.match_info['fsid'] == '0':
+                return web.json_response({"error": {"code": 429, "message": "Limited"}}, status=429,
+                                         headers={'Retry-After': '0'})
+
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        http = Http("", 5, 4950, 60, retry_policy=RetryPolicy(statuses={429: 2}, backoff_base=0.01))
+        endpoints = [(str(server.make_url("/{}".format(i))), i, "test_product", "test_subtype") for i in range(3)]
+        response = await http.endpoint_execute(endpoints)
+        await http.close()
+
+        assert response == [{'search_item': 0}, {"fsid": 1}, {"fsid": 2}]
@@ -0,0 +1,81 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# External Imports
+import asyncio
+
+import pandas as pd
+import pytest
+from aiohttp import web
+
+# Internal Imports
+from firststreet import shard
+from firststreet.errors import InvalidArgument
+from firststreet.http_util import Http
+from firststreet.rate_limiter import AdaptiveRateLimiter
+
+
+def depth_app():
+
+    async def handler(request):
+        fsid = int(request.match_info['fsid'])
+        if fsid % 7 == 0:
+            return web.json_response({'error': {'message': "Invalid FSID"}}, status=404)
+
+        return web.json_response({'fsid': fsid, 'depth': [{'year': 2020, 'data': [
+            {'returnPeriod': 500, 'data': {'low': fsid, 'mid': fsid + 1, 'high': fsid + 2}}]}]})
+
+    app = web.Application()
+    app.router.add_get('/v1/probability/depth/property/{fsid}', handler)
+
+    return app
+
+
+class TestSplit:
+
+    def test_order(self):
+        shards = shard.split(list(range(10)), 3)
+
+        assert [len(s) for s in shards] == [4, 3, 3]
+        assert [item for s in shards for item in s] == list(range(10))
+
+    def test_fewer_items_than_shards(self):
+        assert shard.split([1, 2], 4) == [[1], [2]]
+
+
+class TestWorkerOptions:
+
+    def test_limits_divided(self):
+        http = Http("key", 100, 4990, 60, rate_limiter=AdaptiveRateLimiter(4990, 60, safety=0.8))
+
+        options = shard.worker_options(http, 4)
+        arguments = shard.worker_arguments(options)
+
+        assert options['connection_limit'] == 25
+        assert options['rate_limit'] == 1247
+        assert arguments['rate_limiter'].safety == 0.2
+        assert arguments['retry_policy'] is http.retry_policy
+
+
+class TestSharded:
+
+    async def test_run_product(self, aiohttp_server, tmpdir):
+        server = await aiohttp_server(depth_app())
+
+        http = Http("key", 10, 4950, 60)
+        http.options['url'] = str(server.make_url("")).rstrip("/")
+
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(None, lambda: shard.run_product(
+            http, "probability.get_depth", list(range(1, 21)), 3, output_dir=str(tmpdir), chunk_size=4, log=False,
+            location_type="property"))
+
+        df = pd.read_csv(str(path), dtype=str)
+
+        assert df['fsid'].tolist() == [str(i) for i in range(1, 21)]
+        assert df['valid_id'].tolist() == ['True' if i % 7 else 'False' for i in range(1, 21)]
+        assert [p.basename for p in tmpdir.listdir()] == [path.name]
+
+    def test_run_product_empty(self, tmpdir):
+        with pytest.raises(InvalidArgument):
+            shard.run_product(Http("key", 10, 4950, 60), "probability.get_depth", [], 3, output_dir=str(tmpdir))
@@ -0,0 +1,40 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# External Imports
+from aiohttp import web
+
+# Internal Imports
+from firststreet.http_util import Http
+from firststreet.tracing import Tracer
+
+
+class TestTracer:
+
+    async def test_timings_per_host(self, aiohttp_server):
+
+        async def handler(request):
+            return web.json_response({"fsid": int(request.match_info['fsid'])})
+
+        app = web.Application()
+        app.router.add_get('/{fsid}', handler)
+        server = await aiohttp_server(app)
+
+        timings = []
+        tracer = Tracer(callback=timings.append)
+
+        http = Http("", 2, 4950, 60, tracer=tracer)
+        endpoints = [(str(server.make_url("/{}".format(i))), i, "test_product", "test_subtype") for i in range(20)]
+        await http.endpoint_execute(endpoints)
+        await http.close()
+
+        stats = tracer.stats()[server.host]
+
+        assert len(timings) == 20
+        assert all(timing.status == 200 and timing.ttfb is not None for timing in timings)
+        assert stats['requests'] == 20
+        assert stats['new_connections'] <= 2
+        assert stats['new_connections'] + stats['reused_connections'] == 20
+        assert stats['reuse_rate'] >= 0.9
+        assert stats['connect']['count'] == stats['new_connections']
+        assert stats['ttfb']['count'] == 20
@@ -0,0 +1,99 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Standard Imports
+import gzip
+import types
+
+# External Imports
+import pytest
+
+# Internal Imports
+from firststreet.errors import InvalidArgument
+from firststreet.util import chunked, iter_search_items_from_file, parse_search_item, read_search_items_from_file
+
+LINES = "fsid\n395133768\n10212 BUCKEYE RD, Cleveland, Ohio\n(41.48195701269418, -81.6138601319609)\n\n" \
+        "(12, 942, 1715)\n'1 Main St'\nCleveland\n"
+
+ITEMS = [395133768, "10212 BUCKEYE RD, Cleveland, Ohio", (41.48195701269418, -81.6138601319609), (12, 942, 1715),
+         "1 Main St", "Cleveland"]
+
+
+class TestSearchItemFile:
+
+    def test_parse_search_item(self):
+        assert parse_search_item("395133768") == 395133768
+        assert parse_search_item(" (41.5, -81.6)\n") == (41.5, -81.6)
+        assert parse_search_item("(1, 2, 3)") == (1, 2, 3)
+        assert parse_search_item("10212 BUCKEYE RD, Cleveland, Ohio") == "10212 BUCKEYE RD, Cleveland, Ohio"
+        assert parse_search_item("(Building 2) 1 Main St") == "(Building 2) 1 Main St"
+        assert parse_search_item('"1 Main St"') == "1 Main St"
+        assert parse_search_item("[1, 2]") == [1, 2]
+        assert parse_search_item("  ") is None
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_plain(self, tmpdir, use_mmap):
+        path = tmpdir.join("items.txt")
+        path.write(LINES)
+
+        items = iter_search_items_from_file(str(path), use_mmap=use_mmap)
+
+        assert isinstance(items, types.GeneratorType)
+        assert list(items) == ITEMS
+        assert read_search_items_from_file(str(path), use_mmap=use_mmap) == ITEMS
+
+    def test_gzip(self, tmpdir):
+        # Found by the magic bytes, not the extension
+        path = str(tmpdir.join("items.txt"))
+        with gzip.open(path, "wt") as fp:
+            fp.write(LINES)
+
+        assert read_search_items_from_file(path) == ITEMS
+
+    @pytest.mark.parametrize("header", ["fsid", "lat,lng", "fsid, address"])
+    def test_header_skipped(self, tmpdir, header):
+        path = tmpdir.join("items.txt")
+        path.write(header + "\n395133768\n")
+
+        assert read_search_items_from_file(str(path)) == [395133768]
+
+    def test_address_first_line_kept(self, tmpdir):
+        path = tmpdir.join("items.txt")
+        path.write("10212 BUCKEYE RD, Cleveland, Ohio\n395133768\n")
+
+        assert read_search_items_from_file(str(path)) == ["10212 BUCKEYE RD, Cleveland, Ohio", 395133768]
+
+    def test_empty(self, tmpdir):
+        path = tmpdir.join("items.txt")
+        path.write("")
+
+        assert read_search_items_from_file(str(path)) == []
+        assert read_search_items_from_file(str(path), use_mmap=True) == []
+
+    def test_csv_column(self, tmpdir):
+        path = tmpdir.join("items.csv")
+        path.write('fsid,address,lat,lng\n1,"1 Main St, Cleveland",41.5,-81.6\n2,"2 Main St, Cleveland",,\n')
+
+        assert read_search_items_from_file(str(path), column="fsid") == [1, 2]
+        assert read_search_items_from_file(str(path), column=1) == ["1 Main St, Cleveland", "2 Main St, Cleveland"]
+        assert read_search_items_from_file(str(path), column=(2, 3)) == [(41.5, -81.6)]
+        assert read_search_items_from_file(str(path), column="address") == ["1 Main St, Cleveland",
+                                                                            "2 Main St, Cleveland"]
+        assert read_search_items_from_file(str(path), column=("lat", "lng")) == [(41.5, -81.6)]
+
+        with pytest.raises(InvalidArgument):
+            read_search_items_from_file(str(path), column="zip")
+
+    def test_csv_delimiter(self, tmpdir):
+        path = str(tmpdir.join("items.tsv.gz"))
+        with gzip.open(path, "wt") as fp:
+            fp.write("id\tlat\tlng\n7\t41.5\t-81.6\n")
+
+        assert read_search_items_from_file(path, column=("lat", "lng"), delimiter="\t") == [(41.5, -81.6)]
+
+    def test_chunked(self):
+        assert list(chunked((i for i in range(5)), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(chunked([], 2)) == []
+
+        with pytest.raises(InvalidArgument):
+            next(chunked([1], 0))